@@ -0,0 +1,102 @@
+#在线基线去除 (common/baseline_remover.py) 的检查与吞吐测量
+#
+#用法:
+#   python baseline_remover_check.py [--cycles 20000] [--input x_input_16bit.txt] [--phase 5=0 --phase 7=0]
+#                                    [--max-block 65536] [--bench-samples 16777216] [--block 4096 16384 65536]
+#                                    [--target 100]
+#对照: 同一输入按随机大小 (16 的整数倍) 的块送入 BaselineRemover, 拼接后的输出与连续 din_valid 时
+#      cycle_model.simulate 的 signal_no_baseline 以及 wavelet_model.baseline_removal 三者逐点比较,
+#      并检查输出延迟 (latency) 与逐周期模型一致
+#吞吐: 随机输入按 --block 大小连续送入, 报告每种块大小的 M 采样/s; 块大小不超过 max_block 时每次 push 不分配数组
+#任一输出不一致时返回 1; 最大吞吐低于 --target 时只打印警告 (与机器负载有关)
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from baseline_remover import BaselineRemover, MAX_BLOCK, LANES
+from cycle_model import simulate
+from wavelet_model import baseline_removal
+from tb_io import load_tb_file
+from seed_sweep import gen_stimulus
+from top_cycle_model import parse_phases
+
+
+def run_blocks(br, x, rng, max_cycles):
+    """按 1 ~ max_cycles 个周期的随机块大小送入, 返回拼接后的输出"""
+    parts = []
+    i = 0
+    while i < len(x):
+        k = LANES * int(rng.integers(1, max_cycles + 1))
+        parts.append(br.push(x[i:i + k]).copy())
+        i += k
+    return np.concatenate(parts) if parts else np.empty(0, dtype=np.int32)
+
+
+def report_diff(name, out, ref):
+    """逐点比较, 返回是否一致"""
+    if len(out) != len(ref):
+        print(f"[INFO] {name}: 输出 {len(out)} 点, 逐周期模型 {len(ref)} 点")
+        return False
+    bad = np.flatnonzero(out != ref)
+    if len(bad):
+        print(f"[INFO] {name}: 不一致 {len(bad)} 点, 第一个在 {bad[0]}: {out[bad[0]]} vs {ref[bad[0]]}")
+    return not len(bad)
+
+
+def throughput(br, x, block):
+    br.reset()
+    t = time.perf_counter()
+    for i in range(0, len(x), block):
+        br.push(x[i:i + block])
+    return len(x) / (time.perf_counter() - t) / 1e6
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="BaselineRemover 与逐周期模型对照及吞吐测量")
+    parser.add_argument('--cycles', type=int, default=20000)
+    parser.add_argument('--amplitude', type=float, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--input', default=None, help="x_input_16bit.txt 或 .trc, 不指定时随机生成")
+    parser.add_argument('--phase', action='append', default=[], help="覆盖 L5~L7 的抽取相位, 如 5=0")
+    parser.add_argument('--max-block', type=int, default=MAX_BLOCK)
+    parser.add_argument('--bench-samples', type=int, default=1 << 24, help="吞吐测量的采样数, 0 表示不测量")
+    parser.add_argument('--block', type=int, nargs='+', default=[1 << 12, 1 << 14, 1 << 16])
+    parser.add_argument('--target', type=float, default=100, help="吞吐目标 (M 采样/s)")
+    args = parser.parse_args()
+
+    phases = parse_phases(args.phase)
+    rng = np.random.default_rng(args.seed)
+    if args.input:
+        x = np.asarray(load_tb_file(args.input, dtype=np.int16)).ravel()
+    else:
+        x = gen_stimulus(rng, args.cycles, args.amplitude)
+    n_cyc = len(x) // LANES
+    x = x[:LANES * n_cyc]
+
+    br = BaselineRemover(phases=phases, max_block=args.max_block)
+    res = simulate(np.ones(n_cyc, dtype=bool), x, phases=phases, drain=0)
+    ref = res.signal_no_baseline.ravel()
+    out = run_blocks(br, x, rng, 2 * args.max_block // LANES)
+    golden = baseline_removal(x, phases=phases)
+    lat = int(res.top[0] - res.din[0]) if len(res.top) else None
+    print(f"[INFO] {n_cyc} 个周期, latency {br.latency} 周期 (逐周期模型 {lat}), "
+          f"输出 {len(out)} 点 (逐周期模型 {len(ref)} 点, baseline_removal {len(golden)} 点)")
+    ok = report_diff('BaselineRemover', out, ref) & report_diff('baseline_removal', golden, ref)
+    ok = ok and lat == br.latency
+    print("[PASS] 三者逐点一致" if ok else "[FAIL] 与逐周期模型不一致")
+
+    if args.bench_samples:
+        xb = gen_stimulus(np.random.default_rng(args.seed + 1), args.bench_samples // LANES, args.amplitude)
+        best = 0.0
+        for block in args.block:
+            mss = throughput(br, xb, block)
+            best = max(best, mss)
+            print(f"[INFO] 块大小 {block:>8}: {mss:8.1f} M 采样/s")
+        if best < args.target:
+            print(f"[WARN] 最大吞吐 {best:.1f} M 采样/s 低于目标 {args.target:g}")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,135 @@
+#golden 与 DUT 输出之间的自动对齐: 整数采样延迟 (lag) + 2 倍抽取相位 (phase)
+#lag 的约定: dut[i] 对应 golden[i + lag] (lag > 0 表示 DUT 少了开头的 lag 个点)
+#
+#对每个候选 lag, 重叠部分的均方误差为
+#   mse(lag) = (sum g^2 + sum d^2 - 2 * sum g*d) / overlap
+#其中互相关 sum g*d 用 FFT 一次算出全部 lag, 两个平方和用前缀和得到, 总复杂度 O(n log n)。
+#x_gen 的激励是周期 128 的正弦, 互相关会在每个周期出现几乎相同的峰, 所以用 mse 而不是互相关峰值选择 lag,
+#最后对 mse 最小的几个候选再直接计算一次误差确认
+import numpy as np
+
+from wavelet_model import h_dec, DEC_LEVELS, dec_output_range, decimate_by2
+
+# 至少要有较短序列一半的点参与比较, 避免重叠太少时误差偶然很小
+MIN_OVERLAP = 0.5
+TOP_CANDIDATES = 5
+
+
+def _fft_len(n):
+    """不小于 n 的 2^a * 3^b, FFT 较快"""
+    best = 1 << int(np.ceil(np.log2(max(n, 1))))
+    p3 = 1
+    while p3 < best:
+        p2 = p3
+        while p2 < n:
+            p2 *= 2
+        best = min(best, p2)
+        p3 *= 3
+    return best
+
+
+def _overlap(ng, nd, lag):
+    """给定 lag 时的重叠点数 (可为数组)"""
+    return np.minimum(ng - lag, nd) - np.maximum(0, -lag)
+
+
+def _direct_mse(g, d, lag):
+    n = int(_overlap(len(g), len(d), lag))
+    if n <= 0:
+        return np.inf, 0
+    gs = g[max(lag, 0):max(lag, 0) + n]
+    ds = d[max(-lag, 0):max(-lag, 0) + n]
+    e = gs - ds
+    return float(np.dot(e, e) / n), n
+
+
+def lag_mse(golden, dut, max_lag=None):
+    """
+    全部候选 lag 的均方误差 (FFT 互相关 + 前缀和)
+    返回 (lags, mse, overlap) 三个数组
+    """
+    g = np.asarray(golden, dtype=np.float64)
+    d = np.asarray(dut, dtype=np.float64)
+    ng, nd = len(g), len(d)
+    if max_lag is None:
+        max_lag = max(ng, nd)
+    lags = np.arange(-min(max_lag, nd - 1), min(max_lag, ng - 1) + 1)
+
+    n = _fft_len(ng + nd - 1)
+    corr = np.fft.irfft(np.fft.rfft(g, n) * np.conj(np.fft.rfft(d, n)), n)
+    c = corr[lags % n]                                  # c[lag] = sum_i g[i+lag] * d[i]
+
+    cg = np.concatenate(([0.0], np.cumsum(g * g)))
+    cd = np.concatenate(([0.0], np.cumsum(d * d)))
+    ov = _overlap(ng, nd, lags)
+    g0 = np.maximum(lags, 0)
+    d0 = np.maximum(-lags, 0)
+    sg = cg[g0 + ov] - cg[g0]
+    sd = cd[d0 + ov] - cd[d0]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mse = np.maximum(sg + sd - 2 * c, 0.0) / ov
+    return lags, mse, ov
+
+
+def find_lag(golden, dut, max_lag=None, min_overlap=MIN_OVERLAP, top=TOP_CANDIDATES):
+    """
+    返回 {'lag', 'mse', 'overlap', 'runner_up'} (runner_up 为次优候选的 mse, 用于判断对齐是否可信)
+    """
+    g = np.asarray(golden, dtype=np.float64)
+    d = np.asarray(dut, dtype=np.float64)
+    if len(g) == 0 or len(d) == 0:
+        return {'lag': 0, 'mse': np.inf, 'overlap': 0, 'runner_up': np.inf}
+    lags, mse, ov = lag_mse(g, d, max_lag)
+    valid = ov >= max(1, int(min_overlap * min(len(g), len(d))))
+    mse = np.where(valid & np.isfinite(mse), mse, np.inf)
+    cand = lags[np.argsort(mse, kind='stable')[:top]]
+    exact = sorted((_direct_mse(g, d, int(l)) + (int(l),) for l in cand), key=lambda t: (t[0], abs(t[2])))
+    best = exact[0]
+    return {'lag': best[2], 'mse': best[0], 'overlap': best[1],
+            'runner_up': exact[1][0] if len(exact) > 1 else np.inf}
+
+
+def dec_level_offset(upstream, h, level, offset):
+    """
+    第 level 级分解, 抽取起点 t0 相对默认值偏移 offset (0/1) 个点
+    L5~L7 的 offset 就是 dec_L5~dec_L7 的 phase 参数
+    """
+    if DEC_LEVELS[level]['block'] == 1:
+        t0, _ = dec_output_range(level, len(upstream), phase=0)
+    else:
+        t0, _ = dec_output_range(level, len(upstream))
+    t0 += offset
+    n_out = max((len(upstream) - 1 - t0) // 2 + 1, 0)
+    return decimate_by2(upstream, h, t0, n_out)
+
+
+def discover_alignment(upstream, dut, level, h=h_dec, max_lag=None):
+    """
+    对第 level 级同时搜索抽取相位 (0/1) 和 lag
+    upstream: 上一级 golden 输出 (level=1 时为输入 x)
+    返回 {'phase', 'lag', 'mse', 'overlap', 'runner_up', 'candidates'}
+    phase 的含义: L5~L7 为 dec_L* 的 phase 参数; L1~L4 为相对模型默认抽取起点的偏移 (非 0 说明 RTL 抽取相位与模型不同)
+    """
+    cands = []
+    for p in (0, 1):
+        golden = dec_level_offset(upstream, h, level, p)
+        r = find_lag(golden, dut, max_lag)
+        r['phase'] = p
+        cands.append(r)
+    cands.sort(key=lambda r: (r['mse'], abs(r['lag'])))
+    best = dict(cands[0])
+    best['runner_up'] = min(best['runner_up'], cands[1]['mse'])
+    best['candidates'] = cands
+    return best
+
+
+def default_phase(level):
+    """模型默认相位: L5~L7 为 DEC_LEVELS 中的 phase, L1~L4 为 0 (不偏移)"""
+    return DEC_LEVELS[level].get('phase', 0)
+
+
+def format_alignment(level, r):
+    """单行对齐报告"""
+    conf = r['runner_up'] / r['mse'] if r['mse'] > 0 else np.inf
+    return (f"a{level}: phase={r['phase']} lag={r['lag']:+d} mse={r['mse']:.3e} "
+            f"overlap={r['overlap']} (次优 mse={r['runner_up']:.3e}, 比值 {conf:.1e})")
@@ -0,0 +1,192 @@
+#在线 (采集软件中) 使用的流式基线去除: 与 wavelet_baseline_removal_top 相同的算法和输出对齐
+#   BaselineRemover.push(x) 每次接收 16 的整数倍个 int16 采样 (每 16 点对应 FPGA 的一个 din_valid 周期),
+#   返回这些周期内 FPGA 输出的 signal_no_baseline (baseline_valid 为 1 的周期, 每周期 16 点, int32)
+#输出对齐与顶层相同 (见 cycle_model): 第 c 个输入周期的输出 = 第 c - TOTAL_DELAY - 1 个输入块 - 第 c - latency 个 baseline 块,
+#latency 为第一个 baseline_valid 相对第一个 din_valid 的周期数 (L5/L7 相位为 0 时等于文件头的 155),
+#即前 latency 个周期没有输出, 之后每个输入周期输出一个块, 与连续 din_valid 时 cycle_model.simulate 的结果逐点相同
+#
+#baseline 用等效周期时变滤波器 (equiv_filter) 计算: 每输出点约 16 次乘加, 全部是按 128 点一行的矩阵乘法 (BLAS),
+#与 14 级级联只差浮点累加顺序 (~1e-11), 截断后的整数 baseline 与级联模型相同 (equiv_baseline.py 检查)
+#所有中间数据都放在构造时按 max_block 预先分配的线性缓冲区中 (_Fifo), 每次 push 不再分配数组 (out 给定或
+#输入不超过 max_block 时); 更长的输入按 max_block 分段处理
+#吞吐目标: 单核持续 >= 100 M 采样/s (max_block 默认 64K 点, 缓冲区约 4 MB, 可停留在 L2/L3 中),
+#用 sim/baseline_remover_check.py 测量
+import numpy as np
+
+from wavelet_model import h_dec, h_rec, TOTAL_DELAY, top_latency
+from equiv_filter import EquivFilter
+
+LANES = 16
+MAX_BLOCK = 1 << 16
+
+
+class _Fifo:
+    """
+    一维先进先出缓冲区: 预分配 capacity 个元素, 数据保存在 buf[lo:hi], buf[lo] 是第 base 个元素 (绝对下标)
+    写入前空间不足时把剩余数据整体搬到开头 (capacity 不小于 2 倍最大占用时, 搬移的源与目的不重叠)
+    """
+
+    def __init__(self, capacity, dtype, fill=0):
+        self.buf = np.full(capacity, fill, dtype=dtype)
+        self.lo = self.hi = 0
+        self.base = 0
+
+    @property
+    def end(self):
+        """已写入数据的下一个绝对下标"""
+        return self.base + self.hi - self.lo
+
+    def reserve(self, n):
+        """返回可写入 n 个元素的视图, 写完后调用 commit(n)"""
+        if self.hi + n > len(self.buf):
+            k = self.hi - self.lo
+            if k + n > len(self.buf):
+                raise ValueError(f"缓冲区容量 {len(self.buf)} 不足: 已有 {k} 点, 写入 {n} 点")
+            self.buf[:k] = self.buf[self.lo:self.hi]
+            self.lo, self.hi = 0, k
+        return self.buf[self.hi:self.hi + n]
+
+    def commit(self, n):
+        self.hi += n
+
+    def view(self, i0, i1):
+        """绝对下标 [i0, i1) 的数据"""
+        return self.buf[self.lo + i0 - self.base:self.lo + i1 - self.base]
+
+    def drop_to(self, i):
+        """丢弃绝对下标 i 之前的数据"""
+        if i > self.base:
+            self.lo += i - self.base
+            self.base = i
+
+
+class BaselineRemover:
+    """
+    流式基线去除, 状态 (输入延迟线、滤波器历史、尚未输出的 baseline) 在各次 push 之间保留
+    h / g / phases:  与 baseline_stream 相同
+    max_block:       每段处理的最大输入点数 (16 的整数倍), 决定预分配的缓冲区大小
+    latency:         输出相对输入的周期数 (默认由 wavelet_model.top_latency 得到, 与 FPGA 相同)
+    """
+
+    def __init__(self, h=h_dec, g=h_rec, phases=None, max_block=MAX_BLOCK, latency=None):
+        if max_block <= 0 or max_block % LANES:
+            raise ValueError(f"max_block 必须是 {LANES} 的正整数倍: {max_block}")
+        self.eq = eq = EquivFilter(h, g, phases=phases)
+        self.latency = top_latency(phases) if latency is None else latency
+        self.max_block = max_block
+        P, R, Rg = eq.period, eq.R, eq.Rg
+
+        # 第 c 个周期输出的 baseline 块最晚用到 a7[m + gamma + 1] (m 为该块所在的行), 需要的输入必须已经到达
+        need = -(-(eq.A + P * (eq.gamma + 1) - (LANES - 1)) // LANES)
+        if self.latency < max(need, TOTAL_DELAY + 1):
+            raise ValueError(f"latency {self.latency} 过小: baseline 至少需要 {need} 个周期, "
+                             f"输入延迟线为 {TOTAL_DELAY + 1} 个周期")
+
+        rows = max_block // P + 2
+        hist = (R + 1) * P
+        # 输入: 整数延迟线 (TOTAL_DELAY + 1 个块) 与浮点滤波器输入; a7; 整数 baseline
+        self._x = _Fifo(2 * (max_block + LANES * (TOTAL_DELAY + 1)), np.int16)
+        self._xf = _Fifo(2 * (max_block + hist), np.float64)
+        self._a = _Fifo(2 * (rows + Rg + 1), np.float64)
+        self._b = _Fifo(2 * (max_block + LANES * self.latency + P), np.int16)
+        # 矩阵乘法和整数转换的工作区
+        self._q = np.empty((rows + R, R))
+        self._w = np.empty((rows, Rg))
+        self._rows = np.empty((rows, P))
+        self._ib = np.empty(rows * P, dtype=np.int64)
+        self._out = np.empty(max_block, dtype=np.int32)
+        self.reset()
+
+    def reset(self):
+        """回到复位状态 (延迟线清零, 滤波器历史清零)"""
+        eq = self.eq
+        for f in (self._x, self._xf, self._a, self._b):
+            f.buf[:] = 0
+            f.lo = f.hi = 0
+        # 与 equiv_stream 相同: 输入左侧补 R*P 个 0, a7 左侧补 Rg 个 0
+        self._x.base = 0
+        self._xf.base = -eq.R * eq.period
+        self._xf.hi = eq.R * eq.period
+        self._a.base = -eq.Rg
+        self._a.hi = eq.Rg
+        self._b.base = 0
+        self.s_next = self.m_next = 0
+        self.cycles = 0
+
+    @property
+    def delay(self):
+        """输出相对输入的延迟 (采样点数)"""
+        return LANES * self.latency
+
+    def push(self, x, out=None):
+        """
+        送入 16 的整数倍个 int16 采样, 返回这些周期内的 signal_no_baseline (int32)
+        out 为 None 时结果写在内部缓冲区 (下一次 push 会覆盖), 输入超过 max_block 时另行分配
+        """
+        x = np.asarray(x).ravel()
+        if len(x) % LANES:
+            raise ValueError(f"输入点数必须是 {LANES} 的整数倍: {len(x)}")
+        n_out = LANES * max(self.cycles + len(x) // LANES - max(self.cycles, self.latency), 0)
+        if out is None:
+            out = self._out if len(x) <= self.max_block else np.empty(len(x), dtype=np.int32)
+        elif len(out) < n_out:
+            raise ValueError(f"out 长度 {len(out)} 小于输出点数 {n_out}")
+        k = 0
+        for i in range(0, len(x), self.max_block):
+            k += self._push(x[i:i + self.max_block], out[k:])
+        return out[:k]
+
+    def _push(self, x, out):
+        eq = self.eq
+        P, R, Rg = eq.period, eq.R, eq.Rg
+        n = len(x)
+        self._x.reserve(n)[:] = x
+        self._x.commit(n)
+        np.copyto(self._xf.reserve(n), x)
+        self._xf.commit(n)
+
+        # a7[s] 需要 x[A + P*s - (R*P - 1) .. A + P*s] (见 equiv_stream)
+        n_a = max((self._xf.end - 1 - eq.A) // P + 1 - self.s_next, 0)
+        if n_a:
+            j0 = eq.A + P * self.s_next - R * P + 1
+            q = self._q[:n_a + R - 1]
+            np.matmul(self._xf.view(j0, j0 + P * (n_a + R - 1)).reshape(-1, P), eq.Fr, out=q)
+            a = self._a.reserve(n_a)
+            np.copyto(a, q[R - 1:R - 1 + n_a, 0])
+            for r in range(1, R):
+                a += q[R - 1 - r:R - 1 - r + n_a, r]
+            self._a.commit(n_a)
+            self.s_next += n_a
+            self._xf.drop_to(eq.A + P * self.s_next - R * P + 1)
+
+        # baseline 第 m 行需要 a7[m + gamma + 1 - (Rg-1) .. m + gamma + 1]
+        n_m = max(self.s_next - eq.gamma - 1 - self.m_next, 0)
+        if n_m:
+            i0 = self.m_next + eq.gamma + 1
+            w = self._w[:n_m]
+            for k in range(Rg):
+                w[:, k] = self._a.view(i0 - k, i0 - k + n_m)
+            rows = self._rows[:n_m]
+            np.matmul(w, eq.G, out=rows)
+            self.m_next += n_m
+            self._a.drop_to(self.m_next + eq.gamma + 2 - Rg)
+            # 与 baseline_to_int 相同: 向下取整后保留低 16 位
+            ib = self._ib[:n_m * P]
+            np.floor(rows.ravel(), out=rows.ravel())
+            np.copyto(ib, rows.ravel(), casting='unsafe')
+            np.copyto(self._b.reserve(n_m * P), ib, casting='unsafe')
+            self._b.commit(n_m * P)
+
+        # 顶层对齐: 第 c 个周期输出 x 第 c - TOTAL_DELAY - 1 块 - 第 c - latency 个 baseline 块
+        c0, c1 = self.cycles, self.cycles + n // LANES
+        self.cycles = c1
+        v0 = max(c0, self.latency)
+        k = LANES * max(c1 - v0, 0)
+        if k:
+            d = TOTAL_DELAY + 1
+            xi = self._x.view(LANES * (v0 - d), LANES * (c1 - d))
+            bi = self._b.view(LANES * (v0 - self.latency), LANES * (c1 - self.latency))
+            np.subtract(xi, bi, out=out[:k], dtype=np.int32)
+        self._x.drop_to(max(LANES * (c1 - TOTAL_DELAY - 1), 0))
+        self._b.drop_to(max(LANES * (c1 - self.latency), 0))
+        return k
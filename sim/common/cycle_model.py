@@ -0,0 +1,173 @@
+#wavelet_baseline_removal_top 的逐时钟模型: 按顶层文件头的流水线延迟表给出每一级 dout_valid 的周期以及该周期的数据
+#每一级的延迟 = 算法延迟 (等待历史数据) + 物理延迟 (乘法/加法/截断寄存器):
+#   算法延迟不单独配置, 由 wavelet_model 中 DEC_LEVELS / REC_LEVELS 的 first / phase 决定,
+#   即 "第几个输入到达后才能算出第一个输出", 与 golden 数据的取点位置是同一个定义, 时序与数据不会各自漂移
+#   物理延迟和串行输出的间隔见 wavelet_model.STAGE_TIMING (取自文件头与 reconstruct_L5~L7 的注释)
+#所有计算都以 "有效周期的下标数组" 为单位做向量运算, 不逐周期循环:
+#   某级输入在 in_cyc[k] 周期有效 -> 输出在 in_cyc[k] + phys 周期有效 (k 满足该级的历史/相位条件)
+#   R7/R6/R5 每个输入产生偶/奇两个输出, 分别在 +phys 和 +phys+spacing 周期送出 (L5~L7 的 valid 每隔一个输入翻转)
+#顶层: baseline_valid 比 R1 的 dout_valid 晚一拍, signal_no_baseline = din 延迟 TOTAL_DELAY 拍 - baseline
+#
+#速度: data=False (只算 valid 时序) 连续输入约 1000 万周期/秒;
+#data=True 时 L1~L7 用 dec_segmented、R7~R1 用 rec_segmented 各一次算出全部数据 (与逐级 dec_level / rec_level
+#逐位一致), 单核约 100 万周期/秒: 每周期 16 个采样经过 14 级 float64 乘加, 时间几乎都在这两个后端的乘加上,
+#已接近单核 numpy 的上限。再快只能改用矩阵乘法的等效滤波器 (equiv_filter), 数据与级联不再逐位一致, 这里不采用
+#
+#注意: 文件头的 155 周期对应 L5/L7 的相位为 0 (第 7 个输入到达即输出); wavelet_model 的默认相位 (L5/L7 为 1,
+#由各级 testbench 的结果确定) 会让这两级各多等一个输入周期, 见 latency_table
+import numpy as np
+
+from wavelet_model import (h_dec, h_rec, DEC_LEVELS, REC_LEVELS, dec_segmented, rec_segmented, baseline_to_int,
+                           TOTAL_DELAY, STAGE_TIMING, STAGES, stage_cycles, top_latency)
+
+# 文件头中的累计延迟 (第一个 din_valid 到该级第一个 dout_valid 的周期数), 'top' 为 baseline_valid
+HEADER_LATENCY = {
+    'L1': 4, 'L2': 8, 'L3': 13, 'L4': 20, 'L5': 30, 'L6': 47, 'L7': 78,
+    'R7': 107, 'R6': 124, 'R5': 135, 'R4': 141, 'R3': 146, 'R2': 150, 'R1': 154, 'top': 155,
+}
+
+# valid trace 的列: din_valid, 14 级 dout_valid, baseline_valid (每周期一个 16 位字, 最高位为 din_valid)
+TRACE_COLUMNS = ['din'] + STAGES + ['top']
+
+# 输入结束后继续模拟的周期数, 使流水线中剩余的结果全部输出
+DRAIN_CYCLES = 256
+
+
+# ==========================================
+# 1. 单级时序
+# ==========================================
+
+def _items_per_cycle(name):
+    level = int(name[1])
+    if name[0] == 'L':
+        return max(DEC_LEVELS[level]['block'] // 2, 1)
+    return 1 if 'spacing' in STAGE_TIMING[name] else 2 * REC_LEVELS[level]['block']
+
+
+# ==========================================
+# 2. 整体模型
+# ==========================================
+
+class TopResult:
+    """
+    一次模拟的结果
+    n_cycles:  模拟的周期数 (输入长度 + 排空周期)
+    din:       din_valid 为 1 的周期
+    stages:    {级名: (有效周期 int64 数组, (周期数, 每周期点数) 的 float64 数据)}
+    top:       baseline_valid 为 1 的周期
+    baseline / signal_no_baseline:  (周期数, 16) 的整数输出, 与 top 一一对应
+    """
+
+    def __init__(self, n_cycles, din):
+        self.n_cycles = n_cycles
+        self.din = din
+        self.stages = {}
+        self.top = np.empty(0, dtype=np.int64)
+        self.baseline = np.empty((0, 16), dtype=np.int16)
+        self.signal_no_baseline = np.empty((0, 16), dtype=np.int32)
+
+    def cycles(self, name):
+        if name == 'din':
+            return self.din
+        if name == 'top':
+            return self.top
+        return self.stages[name][0]
+
+    def valid_matrix(self):
+        """(n_cycles, 16) 的 bool 矩阵, 列顺序为 TRACE_COLUMNS"""
+        v = np.zeros((self.n_cycles, len(TRACE_COLUMNS)), dtype=bool)
+        for j, name in enumerate(TRACE_COLUMNS):
+            v[self.cycles(name), j] = True
+        return v
+
+    def valid_words(self):
+        """每周期一个 16 位字, 第 j 列对应第 15-j 位 (与 %b 逐位打印的顺序相同)"""
+        weights = (1 << np.arange(len(TRACE_COLUMNS) - 1, -1, -1)).astype(np.uint32)
+        return self.valid_matrix().astype(np.uint32) @ weights
+
+    def latency_table(self):
+        """每级第一个有效周期相对第一个 din_valid 的延迟, 以及与文件头的差值"""
+        rows = []
+        if not len(self.din):
+            return rows
+        for name in STAGES + ['top']:
+            c = self.cycles(name)
+            lat = int(c[0] - self.din[0]) if len(c) else None
+            ref = HEADER_LATENCY[name]
+            rows.append((name, lat, ref, None if lat is None else lat - ref))
+        return rows
+
+
+def _din_hold(din, c):
+    """第 c 周期 din 总线上的块序号: 无效周期保持上一个有效块, 第一个有效块之前为 -1 (复位值 0)"""
+    return np.searchsorted(din, c, side='right') - 1
+
+
+def simulate(din_valid, x, h=h_dec, g=h_rec, phases=None, timing=None, drain=DRAIN_CYCLES, data=True):
+    """
+    din_valid: 每周期的输入有效标志 (bool 数组)
+    x: int16 采样, 按 16 路一拍排列, 个数不少于 16 * sum(din_valid), 依次在各个有效周期送入
+    phases: {level: phase}, 覆盖 L5~L7 的默认相位
+    data: False 时只计算 valid 时序 (各级数据为空数组), 用于快速检查长时间运行的时序
+    返回 TopResult; 数据为 float64 golden, baseline 按 reconstruct_L1 的截断转为整数
+    """
+    phases = phases or {}
+    din_valid = np.asarray(din_valid, dtype=bool)
+    din = np.flatnonzero(din_valid).astype(np.int64)
+    x = np.asarray(x)[:16 * len(din)]
+    if len(x) < 16 * len(din):
+        raise ValueError(f"输入点数 {len(x)} 少于有效周期数 x 16 = {16 * len(din)}")
+    n_cycles = len(din_valid) + drain
+    res = TopResult(n_cycles, din)
+
+    if data:
+        # 各级数据: L1~L7 与 R7~R1 各用一次分段后端整体计算 (与逐级 dec_level / rec_level 逐位一致)
+        dec = next(dec_segmented([x], h, 7, phases))
+        values = dict(zip(STAGES, dec + next(rec_segmented([dec[-1]], g))))
+
+    # 每一级的输出只依赖更早的输入, 模拟结束后才有效的周期 (及其数据) 是末尾的一段, 逐级推算完再截掉
+    cyc = din
+    for name in STAGES:
+        level = int(name[1])
+        cyc = stage_cycles(name, cyc, phases.get(level), timing)
+        k = _items_per_cycle(name)
+        n_keep = int(np.searchsorted(cyc, n_cycles))
+        y = np.empty((0, k))
+        if data:
+            y = values[name]
+            if len(y) != k * len(cyc):
+                raise AssertionError(f"{name}: 数据点数 {len(y)} 与有效周期数 {len(cyc)} x {k} 不一致")
+            y = y[:k * n_keep].reshape(-1, k)
+        res.stages[name] = (cyc[:n_keep], y)
+
+    r1_cyc, b = res.stages['R1']
+    top = r1_cyc + 1
+    keep = top < n_cycles
+    res.top = top[keep]
+    if not data:
+        return res
+    res.baseline = baseline_to_int(b[keep].ravel()).reshape(-1, 16)
+    blk = _din_hold(din, res.top - 1 - TOTAL_DELAY)
+    res.signal_no_baseline = np.subtract(np.take(x.reshape(-1, 16), np.maximum(blk, 0), axis=0), res.baseline,
+                                         dtype=np.int32)
+    # 第一个有效块之前 din_aligned 为复位值 0
+    res.signal_no_baseline[blk < 0] = -res.baseline[blk < 0]
+    return res
+
+
+# ==========================================
+# 3. 与 testbench 的逐周期比较
+# ==========================================
+
+def compare_valid(model_words, dut_words):
+    """
+    逐周期比较两个 valid 字序列 (valid_words 的格式), 只比较两者都覆盖的周期
+    返回 (比较的周期数, {列名: (不一致的周期数, 第一个不一致的周期或 None)})
+    """
+    n = min(len(model_words), len(dut_words))
+    diff = np.asarray(model_words[:n], dtype=np.uint32) ^ np.asarray(dut_words[:n], dtype=np.uint32)
+    out = {}
+    for j, name in enumerate(TRACE_COLUMNS):
+        bad = np.flatnonzero((diff >> (len(TRACE_COLUMNS) - 1 - j)) & 1)
+        out[name] = (len(bad), int(bad[0]) if len(bad) else None)
+    return n, out
@@ -0,0 +1,155 @@
+#baseline 通路 (7 级分解 + 7 级重构) 的等效周期时变滤波器
+#分解 L1~L7 与重构 R7~R1 都是线性运算, 整体是周期为 P = 2^7 = 128 的线性时变系统:
+#   a7[s] = sum_k f[k] * x[A + P*s - k]                  f = h * h↑2 * h↑4 * ... * h↑64   (890 抽头)
+#   b[i]  = sum_s gt[i + C - P*s] * a7[s]                gt = g * g↑2 * ... * g↑64
+#A = sum_l 2^(l-1) * t0_l (各级 dec_output_range 的起点), C = sum_l 2^l * n0_l (各级 rec_input_range 的起点)
+#合并后 b[i] = sum_n K[i mod P, n] * x[i + A + C - n], K[p] = (gt 中下标 ≡ p + C (mod P) 的抽头) * f
+#K 即 baseline 的等效冲激响应 (每个输出相位一个滤波器), 可缓存到 golden_cache
+#
+#快速计算不直接用 K (每个输出约 1779 次乘加), 而是利用 K 的分解 (经过 a7 这一个点/周期):
+#   输入按 P 点一行排成矩阵 X, a7 = X @ F 的 7 条对角线之和 (F 为 f 按 P 点分相后的 7 x 128 矩阵)
+#   输出按 P 点一行排成矩阵 B = W @ G, W 为 a7 的 8 点滑动窗口, G 为 gt 分相后的 8 x 128 矩阵
+#每个相位的子滤波器只有 7~8 个抽头, 直接用矩阵乘法 (BLAS) 比 FFT 分段卷积更快
+#与级联模型只差浮点累加顺序 (float64, 相对误差 ~1e-15), 整数 baseline 只在恰好接近整数的点上可能差 1
+import numpy as np
+
+from wavelet_model import (h_dec, h_rec, DEC_LEVELS, dec_output_range, rec_input_range)
+
+LEVELS = 7
+
+
+def cascade_filter(h, levels=LEVELS):
+    """h * h↑2 * ... * h↑2^(levels-1): 多级 2 倍抽取 (或插值) 的等效单级滤波器"""
+    h = np.asarray(h, dtype=np.float64)
+    out = np.ones(1)
+    for l in range(levels):
+        up = np.zeros((len(h) - 1) * (1 << l) + 1)
+        up[::1 << l] = h
+        out = np.convolve(out, up)
+    return out
+
+
+def dec_offset(levels=LEVELS, phases=None):
+    """a{levels}[0] 对应的输入位置 A = sum_l 2^(l-1) * t0_l"""
+    phases = phases or {}
+    return sum(dec_output_range(l, 0, phases.get(l))[0] << (l - 1) for l in range(1, levels + 1))
+
+
+def rec_offset(levels=LEVELS):
+    """重构链的偏移 C = sum_l 2^l * n0_l: b[i] = sum_s gt[i + C - 2^levels * s] * a{levels}[s]"""
+    return sum(rec_input_range(l, 0)[0] << l for l in range(1, levels + 1))
+
+
+class EquivFilter:
+    """
+    等效滤波器
+    f / gt:  分解 / 重构的等效单级滤波器
+    A / C:   见文件头; lead = A + C, 即 b[i] 用到的最新输入为 x[i + lead]
+    period:  2^levels
+    """
+
+    def __init__(self, h=h_dec, g=h_rec, levels=LEVELS, phases=None):
+        self.levels = levels
+        self.period = 1 << levels
+        self.f = cascade_filter(h, levels)
+        self.gt = cascade_filter(g, levels)
+        self.A = dec_offset(levels, phases)
+        self.C = rec_offset(levels)
+        self.lead = self.A + self.C
+        P = self.period
+
+        # 分解: Fr[r, c] = f[P*r + P-1-c], 与输入矩阵的一行 (P 个连续点, 最新在最后) 对应
+        self.R = -(-len(self.f) // P)
+        fm = np.zeros(self.R * P)
+        fm[:len(self.f)] = self.f
+        self.Fr = fm.reshape(self.R, P)[:, ::-1].T.copy()
+
+        # 重构: G[k, p] = gt[P*k + p + delta - P], 输出第 m 行 = sum_k a7[m + gamma + 1 - k] * G[k]
+        self.gamma, delta = divmod(self.C, P)
+        self.Rg = -(-(len(self.gt) + delta) // P) + 1
+        gm = np.zeros(self.Rg * P)
+        gm[P - delta:P - delta + len(self.gt)] = self.gt
+        self.G = gm.reshape(self.Rg, P)
+
+    def response(self):
+        """
+        等效冲激响应 K, 形状 (period, len(f) + len(gt) - 1):
+        b[i] = sum_n K[i % period, n] * x[i + lead - n]
+        """
+        P = self.period
+        K = np.empty((P, len(self.f) + len(self.gt) - 1))
+        for p in range(P):
+            gp = np.zeros_like(self.gt)
+            gp[(p + self.C) % P::P] = self.gt[(p + self.C) % P::P]
+            K[p] = np.convolve(gp, self.f)
+        return K
+
+
+def equivalent_response(h=h_dec, g=h_rec, levels=LEVELS, phases=None, cache=None):
+    """
+    返回 (EquivFilter, K); cache 为 GoldenCache 时 K 按 (系数, 各级参数) 缓存
+    """
+    eq = EquivFilter(h, g, levels, phases)
+    if cache is None:
+        return eq, eq.response()
+    phases = phases or {}
+    params = {str(l): dict(DEC_LEVELS[l], **({'phase': int(phases[l])} if l in phases else {}))
+              for l in range(1, levels + 1)}
+    key = cache.key(kind='equiv', h=np.asarray(h, dtype=np.float64).tolist(),
+                    g=np.asarray(g, dtype=np.float64).tolist(), levels=levels, params=params)
+    K = cache.get(key)
+    if K is None:
+        K = cache.put(key, eq.response().ravel())
+    return eq, np.asarray(K).reshape(eq.period, -1)
+
+
+# ==========================================
+# 分块计算 (overlap-save)
+# ==========================================
+
+def equiv_stream(chunks, eq=None):
+    """
+    对输入块序列逐块计算浮点 baseline, 与 baseline_stream 的输出首尾相接后逐点对应
+    每块保留 R*P 点输入历史与 Rg 点 a7 历史 (overlap-save), 内存与数据长度无关
+    输出按 period 点整行给出, 末尾可能比级联模型少或多不足一个周期的点
+    """
+    eq = eq or EquivFilter()
+    P, R, Rg = eq.period, eq.R, eq.Rg
+    # 输入左侧补 R*P 个 0, a7 左侧补 Rg 个 0, 使开头的窗口不越界 (对应抽头为 0 或不会被用到)
+    x_buf, x_base = np.zeros(R * P), -R * P
+    a_buf, a_base = np.zeros(Rg), -Rg
+    s_next = m_next = 0
+    for x in chunks:
+        x_buf = np.concatenate((x_buf, np.asarray(x, dtype=np.float64).ravel()))
+        x_end = x_base + len(x_buf)
+
+        # a7[s] 需要 x[A + P*s - (R*P - 1) .. A + P*s]
+        n_a = max((x_end - 1 - eq.A) // P + 1 - s_next, 0)
+        a = np.zeros(n_a)
+        if n_a:
+            j0 = eq.A + P * s_next - R * P + 1 - x_base
+            Q = x_buf[j0:j0 + P * (n_a + R - 1)].reshape(-1, P) @ eq.Fr
+            for r in range(R):
+                a += Q[R - 1 - r:R - 1 - r + n_a, r]
+        s_next += n_a
+        keep = eq.A + P * s_next - R * P + 1 - x_base
+        x_buf, x_base = x_buf[keep:], x_base + keep
+
+        # 输出第 m 行需要 a7[m + gamma + 1 - (Rg-1) .. m + gamma + 1]
+        a_buf = np.concatenate((a_buf, a))
+        n_m = max(s_next - eq.gamma - 1 - m_next, 0)
+        i0 = m_next + eq.gamma + 1 - a_base
+        W = np.stack([a_buf[i0 - k:i0 - k + n_m] for k in range(Rg)], axis=1)
+        m_next += n_m
+        keep = m_next + eq.gamma + 2 - Rg - a_base
+        a_buf, a_base = a_buf[keep:], a_base + keep
+        yield (W @ eq.G).ravel()
+
+
+def equiv_baseline(x, eq=None, chunk_blocks=1 << 12):
+    """整段输入的浮点 baseline (按 chunk_blocks 行分块计算), x 可为 np.memmap"""
+    eq = eq or EquivFilter()
+    step = chunk_blocks * eq.period
+    chunks = (x[i:i + step] for i in range(0, len(x), step))
+    parts = list(equiv_stream(chunks, eq))
+    return np.concatenate(parts) if parts else np.empty(0)
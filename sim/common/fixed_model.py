@@ -0,0 +1,230 @@
+#定点数据通路 (wavelet_baseline_removal_top 的 Q2.23 / 48 位版本) 的整数精确模型
+#与 RTL 相同的定点约定:
+#   系数 Q2.23 (COEF_WIDTH=25, COEF_FRAC=23), 中间结果 INTERNAL_WIDTH=48 位, 带 INTERNAL_FRAC=23 位小数
+#   L1:     x (Q16.0) * h (Q2.23) 直接得到 Q.23, 不移位
+#   L2~L7, R7~R2:  sum(a * h) 为 Q.46, 取 [COEF_FRAC + INTERNAL_WIDTH - 1 : COEF_FRAC] 位, 即算术右移 23 位后保留低 48 位
+#   R1:     sum(r1 * h) 右移 2*COEF_FRAC = 46 位, 保留低 DATA_WIDTH 位 (baseline, Q16.0)
+#取点位置与 wavelet_model 的 dec_output_range / rec_input_range 完全相同, 只是每个输出都按定点截断
+#
+#48 位中间值乘 25 位系数最多 73 位, 超出 int64。这里把被乘数拆成 a = hi * 2^k + lo (0 <= lo < 2^k):
+#   floor(sum(a*h) / 2^s) = floor((sum(hi*h) + floor(sum(lo*h) / 2^k)) / 2^(s-k))      (k <= s)
+#两部分的乘积和都在 int64 范围内, 结果与任意精度整数运算逐位一致 (向下取整的嵌套等于一次向下取整);
+#s < k (L1 不移位) 时结果的高位按 2^64 回绕, 之后只保留低 internal_width 位, 与 RTL 的位截取一致
+import os
+import re
+
+import numpy as np
+
+from wavelet_model import h_dec, dec_output_range, rec_input_range, CHUNK_SIZE, TOTAL_DELAY, top_latency
+
+TOP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scr', 'wavelet_baseline_removal_top.v')
+
+# 与 wavelet_baseline_removal_top 的参数相同
+# rounding: 'trunc' 向下取整 (RTL 的位截取) / 'round' 加半个 LSB 后向下取整
+# overflow: 'wrap' 只保留低位 (RTL 的位截取) / 'saturate' 饱和到可表示范围
+FIXED_DEFAULT = {
+    'coef_width': 25,
+    'coef_frac': 23,
+    'internal_width': 48,
+    'internal_frac': 23,
+    'data_width': 16,
+    'rounding': 'trunc',
+    'overflow': 'wrap',
+}
+
+_Q_RE = re.compile(r"(DEC_H\d+)\s*=\s*(\d+)'sb([01]+)")
+
+
+def fixed_config(**kw):
+    """在 FIXED_DEFAULT 基础上覆盖部分参数, 并检查 int64 拆分计算所需的位宽"""
+    unknown = set(kw) - set(FIXED_DEFAULT)
+    if unknown:
+        raise ValueError(f"未知的定点参数: {sorted(unknown)}")
+    cfg = dict(FIXED_DEFAULT, **kw)
+    if cfg['rounding'] not in ('trunc', 'round'):
+        raise ValueError(f"未知的舍入方式: {cfg['rounding']}")
+    if cfg['overflow'] not in ('wrap', 'saturate'):
+        raise ValueError(f"未知的溢出方式: {cfg['overflow']}")
+    # 8 个 hi*h / lo*h 相加: (internal_width - k) + coef_width + 3 位 / k + coef_width + 3 位, k 取 coef_frac
+    if max(cfg['internal_width'] - cfg['coef_frac'], cfg['coef_frac']) + cfg['coef_width'] + 3 > 63:
+        raise ValueError("位宽过大, 超出 int64 拆分计算的范围")
+    if cfg['internal_frac'] > cfg['coef_frac']:
+        raise ValueError("internal_frac 不能大于 coef_frac (L1 的乘积只有 coef_frac 位小数)")
+    if cfg['internal_width'] > 63 or cfg['data_width'] > 32:
+        raise ValueError("internal_width 不能超过 63 位, data_width 不能超过 32 位")
+    return cfg
+
+
+def quantize_coefs(h, width=25, frac=23):
+    """浮点系数 -> Q(width-frac).frac 整数 (四舍五入), 超出位宽时报错"""
+    q = np.round(np.asarray(h, dtype=np.float64) * (1 << frac)).astype(np.int64)
+    lim = 1 << (width - 1)
+    if np.any(q < -lim) or np.any(q >= lim):
+        raise ValueError(f"系数超出 {width} 位有符号范围")
+    return q
+
+
+def read_q_coefs(path=TOP_FILE):
+    """读取顶层文件中 (注释掉的) DEC_H0~DEC_H7 的 Q2.23 二进制常数, 返回 int64 数组"""
+    with open(path, encoding='utf-8', errors='replace') as f:
+        found = {name: (int(width), bits) for name, width, bits in _Q_RE.findall(f.read())}
+    out = []
+    for name in sorted(found, key=lambda k: int(k[5:])):
+        width, bits = found[name]
+        v = int(bits, 2)
+        out.append(v - (1 << width) if v >> (width - 1) else v)
+    return np.array(out, dtype=np.int64)
+
+
+# ==========================================
+# 1. 乘加 + 移位 + 位宽限制
+# ==========================================
+
+def _limit(v, width, overflow):
+    """把整数限制到 width 位有符号: wrap 取低位, saturate 饱和"""
+    lim = 1 << (width - 1)
+    if overflow == 'saturate':
+        return np.clip(v, -lim, lim - 1)
+    return ((v + lim) & ((1 << width) - 1)) - lim
+
+
+def split_words(x, k):
+    """a = hi * 2^k + lo, 0 <= lo < 2^k (对一维输入拆一次, 之后两部分分别开窗)"""
+    x = np.ascontiguousarray(x, dtype=np.int64)
+    return x >> k, x & ((1 << k) - 1)
+
+
+def mac_shift(hi, lo, h, shift, k, rounding='trunc'):
+    """
+    (n, taps) 的 hi / lo 窗口 (split_words 的两部分) 与 taps 个整数系数逐行乘加, 再右移 shift 位
+    整数加法与累加顺序无关, 结果等于 (sum(a*h) [+ 半个 LSB]) >> shift
+    shift < k 时结果为 (sum(hi*h) << (k - shift)) + (sum(lo*h) >> shift), 超出 64 位的高位按补码回绕
+    """
+    bias = 1 << (shift - 1) if rounding == 'round' and shift > 0 else 0
+    if k > shift:
+        return ((hi @ h) << (k - shift)) + ((lo @ h + bias) >> shift)
+    carry = (lo @ h + (bias & ((1 << k) - 1))) >> k
+    return (hi @ h + (bias >> k) + carry) >> (shift - k)
+
+
+def _windows(parts, start, n, taps, stride):
+    """对 split_words 的两部分取相同的 (n, taps) 窗口视图"""
+    step = parts[0].strides[0]
+    return [np.lib.stride_tricks.as_strided(p[start:], shape=(n, taps), strides=(stride * step, step),
+                                            writeable=False) for p in parts]
+
+
+# ==========================================
+# 2. 分解 / 重构
+# ==========================================
+
+def decimate_by2_fixed(data, hq, t0, n_out, shift, width, cfg, chunk=CHUNK_SIZE):
+    """decimate_by2 的定点版本: y[m] = (sum_j hq[j] * data[t0 + 2m - j]) >> shift, 限制到 width 位"""
+    parts = split_words(data, cfg['coef_frac'])
+    h = np.asarray(hq, dtype=np.int64)
+    taps = len(h)
+    out = np.empty(max(n_out, 0), dtype=np.int64)
+    if n_out <= 0:
+        return out
+    if t0 < taps - 1 or t0 + 2 * (n_out - 1) >= len(parts[0]):
+        raise ValueError(f"输出范围越界: t0={t0}, n_out={n_out}, len={len(parts[0])}")
+
+    hr = h[::-1].copy()
+    for m0 in range(0, n_out, chunk):
+        m1 = min(m0 + chunk, n_out)
+        hi, lo = _windows(parts, t0 + 2 * m0 - (taps - 1), m1 - m0, taps, 2)
+        y = mac_shift(hi, lo, hr, shift, cfg['coef_frac'], cfg['rounding'])
+        out[m0:m1] = _limit(y, width, cfg['overflow'])
+    return out
+
+
+def upsample_by2_fixed(data, gq, n0, n_in, shift, width, cfg, chunk=CHUNK_SIZE):
+    """upsample_by2 的定点版本: out[2m+e] = (sum_k gq[2k+e] * data[n0 + m - k]) >> shift"""
+    parts = split_words(data, cfg['coef_frac'])
+    g = np.asarray(gq, dtype=np.int64)
+    taps = len(g) // 2
+    out = np.empty(2 * max(n_in, 0), dtype=np.int64)
+    if n_in <= 0:
+        return out
+    if n0 < taps - 1 or n0 + n_in > len(parts[0]):
+        raise ValueError(f"输入范围越界: n0={n0}, n_in={n_in}, len={len(parts[0])}")
+
+    pair = out.reshape(n_in, 2)
+    ge = [g[e::2][::-1].copy() for e in range(2)]
+    for m0 in range(0, n_in, chunk):
+        m1 = min(m0 + chunk, n_in)
+        hi, lo = _windows(parts, n0 + m0 - (taps - 1), m1 - m0, taps, 1)
+        for e in range(2):
+            y = mac_shift(hi, lo, ge[e], shift, cfg['coef_frac'], cfg['rounding'])
+            pair[m0:m1, e] = _limit(y, width, cfg['overflow'])
+    return out
+
+
+def dec_cascade_fixed(data, cfg=None, h=h_dec, levels=7, phases=None):
+    """
+    定点分解 a1 ~ a{levels}, 返回 int64 数组列表 (带 internal_frac 位小数)
+    data: int16 采样 (Q16.0)
+    """
+    cfg = cfg or fixed_config()
+    phases = phases or {}
+    hq = quantize_coefs(h, cfg['coef_width'], cfg['coef_frac'])
+    res = []
+    x, frac = np.asarray(data, dtype=np.int64), 0
+    for level in range(1, levels + 1):
+        t0, n_out = dec_output_range(level, len(x), phases.get(level))
+        shift = frac + cfg['coef_frac'] - cfg['internal_frac']
+        x = decimate_by2_fixed(x, hq, t0, n_out, shift, cfg['internal_width'], cfg)
+        frac = cfg['internal_frac']
+        res.append(x)
+    return res
+
+
+def rec_cascade_fixed(a, cfg=None, h=h_dec, levels=7):
+    """
+    从定点 a{levels} 重构, 返回 [r{levels-1}, ..., r1, baseline]
+    r 为 int64 (internal_frac 位小数), baseline 为 data_width 位整数 (Q16.0, 与 reconstruct_L1 相同)
+    """
+    cfg = cfg or fixed_config()
+    gq = quantize_coefs(h, cfg['coef_width'], cfg['coef_frac'])[::-1].copy()
+    res = []
+    x = np.asarray(a, dtype=np.int64)
+    for level in range(levels, 0, -1):
+        n0, n_in = rec_input_range(level, len(x))
+        if level > 1:
+            shift, width = cfg['coef_frac'], cfg['internal_width']
+        else:
+            shift, width = cfg['internal_frac'] + cfg['coef_frac'], cfg['data_width']
+        x = upsample_by2_fixed(x, gq, n0, n_in, shift, width, cfg)
+        res.append(x)
+    return res
+
+
+def baseline_fixed(data, cfg=None, h=h_dec, phases=None):
+    """
+    定点 baseline (data_width 位整数) 与顶层输出 signal_no_baseline (int64), 连续 din_valid
+    对齐与 wavelet_model.baseline_removal 相同: 输出第 i 点 = x[i + shift] - baseline[i],
+    shift = 16 * (latency - TOTAL_DELAY - 1), 共 (输入周期数 - latency) 块
+    """
+    cfg = cfg or fixed_config()
+    x = np.asarray(data).ravel()
+    n = len(x) // 16 * 16
+    latency = top_latency(phases)
+    shift = 16 * (latency - TOTAL_DELAY - 1)
+    a = dec_cascade_fixed(x[:n], cfg, h, phases=phases)[-1]
+    b = rec_cascade_fixed(a, cfg, h)[-1][:max(n - 16 * latency, 0)]
+    return b, x[shift:shift + len(b)].astype(np.int64) - b
+
+
+def to_float(v, cfg=None):
+    """定点中间值 -> 浮点 (除以 2^internal_frac)"""
+    cfg = cfg or fixed_config()
+    return np.asarray(v, dtype=np.float64) / (1 << cfg['internal_frac'])
+
+
+def peak_bits(v):
+    """表示数组中所有值所需的有符号位数 (含符号位)"""
+    v = np.asarray(v, dtype=np.int64)
+    if not v.size:
+        return 0
+    m = max(int(v.max()), -int(v.min()) - 1, 0)
+    return m.bit_length() + 1
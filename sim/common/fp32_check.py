@@ -0,0 +1,88 @@
+#FP32 运算单元 (fp32_add_sub / fp32_mult) 测试结果的向量化分类
+#判定规则与原 compare_results 逐条相同, 只是对整批结果用掩码一次完成:
+#   1. 期望值 (float64 精确结果按 RNE 转为 float32, NaN 统一为 7fc00000) 与硬件输出逐位相同 -> 通过
+#   2. 任一边为 NaN: 两边都是 NaN 通过, 否则 NaN 不匹配
+#   3. 任一边为 Inf: 两边都是 Inf 且同号通过, 异号为 Inf 符号不匹配, 只有一边为 Inf 为 Inf 不匹配
+#   4. 期望值非 0 时相对误差 < 1e-6 通过; 期望值为 0 时绝对误差 < 1e-9 通过; 其余为数值不匹配
+#float64 的 a+b / a-b / a*b (a, b 为 float32) 再舍入到 float32 与 IEEE 单精度运算结果相同, 不存在二次舍入问题
+import numpy as np
+
+from fp32_softfloat import CANONICAL_NAN
+
+REL_TOL = 1e-6
+ZERO_TOL = 1e-9
+
+# 分类代码
+EXACT = 0
+BOTH_NAN = 1
+INF_MATCH = 2
+REL_MATCH = 3
+ZERO_MATCH = 4
+NAN_MISMATCH = 5
+INF_SIGN_MISMATCH = 6
+INF_MISMATCH = 7
+VALUE_MISMATCH = 8
+
+CLASS_NAMES = {
+    EXACT: "Exact binary match",
+    BOTH_NAN: "Both NaN",
+    INF_MATCH: "Inf match",
+    REL_MATCH: "Match (RelErr)",
+    ZERO_MATCH: "Zero match",
+    NAN_MISMATCH: "NaN mismatch",
+    INF_SIGN_MISMATCH: "Inf sign mismatch",
+    INF_MISMATCH: "Inf mismatch",
+    VALUE_MISMATCH: "Value mismatch",
+}
+N_CLASSES = len(CLASS_NAMES)
+FIRST_FAIL = NAN_MISMATCH
+
+
+def bits_to_float(bits):
+    """uint32 位模式 -> float32"""
+    return np.asarray(bits, dtype=np.uint32).view(np.float32)
+
+
+def expected_bits(ref):
+    """float64 精确结果 -> 期望的 float32 位模式 (RNE, 溢出为 Inf, NaN 为 7fc00000)"""
+    ref = np.asarray(ref, dtype=np.float64)
+    with np.errstate(over='ignore', invalid='ignore'):
+        bits = ref.astype(np.float32).view(np.uint32)
+    return np.where(np.isnan(ref), np.uint32(CANONICAL_NAN), bits)
+
+
+def classify(ref, hw_bits):
+    """
+    ref: float64 精确结果, hw_bits: 硬件输出的 uint32 位模式
+    返回 (分类代码 int8 数组, 相对误差 float64 数组)
+    """
+    ref = np.asarray(ref, dtype=np.float64)
+    hw_bits = np.asarray(hw_bits, dtype=np.uint32)
+    nan_r, inf_r = np.isnan(ref), np.isinf(ref)
+    with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+        hw = bits_to_float(hw_bits).astype(np.float64)
+        nan_h, inf_h = np.isnan(hw), np.isinf(hw)
+        diff = np.abs(ref - hw)
+        rel = np.where(ref != 0, diff / np.abs(ref), 0.0)
+    code = np.select(
+        [expected_bits(ref) == hw_bits,
+         nan_r & nan_h,
+         nan_r | nan_h,
+         inf_r & inf_h & (np.signbit(ref) == np.signbit(hw)),
+         inf_r & inf_h,
+         inf_r | inf_h,
+         (ref != 0) & (rel < REL_TOL),
+         (ref == 0) & (diff < ZERO_TOL)],
+        [EXACT, BOTH_NAN, NAN_MISMATCH, INF_MATCH, INF_SIGN_MISMATCH, INF_MISMATCH, REL_MATCH, ZERO_MATCH],
+        default=VALUE_MISMATCH).astype(np.int8)
+    return code, rel
+
+
+def class_counts(code):
+    """各分类的数量, 返回长度为 N_CLASSES 的 int64 数组 (可直接累加)"""
+    return np.bincount(np.asarray(code, dtype=np.int64).ravel(), minlength=N_CLASSES)
+
+
+def format_counts(counts):
+    """按分类逐行输出数量 (跳过为 0 的分类)"""
+    return "\n".join(f"  {CLASS_NAMES[k]:<20}: {int(c)}" for k, c in enumerate(counts) if c)
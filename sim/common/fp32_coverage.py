@@ -0,0 +1,313 @@
+#FP32 加减法/乘法测试向量的功能覆盖率模型
+#对整个向量文件一次性向量化计算各覆盖点的桶号 (np.bincount 计数), 结果存入可合并的 json 数据库
+#
+#覆盖点 (add = fp32_add_sub, 每对操作数按 ADD 和 SUB 各采样一次; mult = fp32_mult):
+#   operands    两个操作数的类别组合 (zero / sub / norm / inf / nan, 5x5)
+#   exp_diff    [add] 指数差 (非规约数按指数 1 计): 0..26 逐个, 27-47, 48+ (对阶全部移出)
+#   eff_op      [add] 有效运算: 同号相加 / 异号相减
+#   norm_shift  [add] 归一化移位: carry (结果进位), 0, 1..23 (抵消后左移), 24+, zero (完全抵消)
+#   exp_sum     [mult] ea+eb-127 (乘积进位前的指数)
+#   mant_carry  [mult] 尾数乘积 >= 2 (需要右移 1 位)
+#   grs         精确结果相对 FP32 最低位的 guard/round/sticky 组合 (8 种)
+#   result      结果类别: zero / underflow (|r| < 2^-126) / normal / overflow / inf / nan
+#   special     NaN/Inf 传播: none / nan_a / nan_b / nan_both / inf_finite / inf_inf_same / inf_inf_opp / inf_zero
+#精确结果: 加减法用 float64 TwoSum (和 + 误差项, 无舍入损失), 乘法直接用 float64 (两个 float32 之积精确)
+import json
+import os
+
+import numpy as np
+
+from tb_io import iter_tb_file
+from fp32_stimulus import STRATA
+
+DB_VERSION = 1
+UNITS = ('add', 'mult')
+
+_CLASSES = ('zero', 'sub', 'norm', 'inf', 'nan')
+_GRS = tuple(f"G{g}R{r}S{s}" for g in (0, 1) for r in (0, 1) for s in (0, 1))
+_SPECIAL = ('none', 'nan_a', 'nan_b', 'nan_both', 'inf_finite', 'inf_inf_same', 'inf_inf_opp', 'inf_zero')
+
+BINS = {
+    'add': {
+        'operands': tuple(f"{x}x{y}" for x in _CLASSES for y in _CLASSES),
+        'exp_diff': tuple(str(i) for i in range(27)) + ('27-47', '48+'),
+        'eff_op': ('add', 'sub'),
+        'norm_shift': ('carry',) + tuple(str(i) for i in range(24)) + ('24+', 'zero'),
+        'grs': _GRS,
+        'result': ('zero', 'underflow', 'normal', 'overflow', 'inf', 'nan'),
+        'special': _SPECIAL[:7],
+    },
+    'mult': {
+        'operands': tuple(f"{x}x{y}" for x in _CLASSES for y in _CLASSES),
+        'exp_sum': ('<-23', '-23..-1', '0', '1..10', '11..243', '244..253', '254', '>=255'),
+        'mant_carry': ('no', 'yes'),
+        'grs': _GRS,
+        'result': ('zero', 'underflow', 'normal', 'overflow', 'inf', 'nan'),
+        'special': _SPECIAL,
+    },
+}
+
+# 覆盖点 -> 最能补齐该覆盖点的 fp32_stimulus 分层, 用于 suggest_weights
+HOLE_STRATA = {
+    'operands': 'special', 'exp_diff': 'exp_diff', 'eff_op': 'random', 'norm_shift': 'cancel',
+    'exp_sum': 'range', 'mant_carry': 'random', 'grs': 'round', 'result': 'range', 'special': 'special',
+}
+
+# 每次读取的行数 (偶数, 保证操作数对不跨块)
+CHUNK_ROWS = 1 << 20
+
+
+# ==========================================
+# 1. 字段与类别
+# ==========================================
+
+def _fields(x):
+    """uint32 位模式 -> (sign, exp, frac, class), class 为 _CLASSES 中的编号"""
+    x = np.asarray(x, dtype=np.uint32).astype(np.int64)
+    sign = x >> 31
+    exp = (x >> 23) & 0xFF
+    frac = x & 0x7FFFFF
+    cls = np.select([(exp == 0) & (frac == 0), exp == 0, exp < 255, frac == 0], [0, 1, 2, 3], default=4)
+    return sign, exp, frac, cls
+
+
+def _to_f64(bits):
+    with np.errstate(invalid='ignore'):
+        return np.asarray(bits, dtype=np.uint32).view(np.float32).astype(np.float64)
+
+
+def _grs(s, err):
+    """
+    精确结果 s + err (err 为 TwoSum 误差项, 乘法为 0) 相对 FP32 最低位的 guard/round/sticky, 返回 0..7
+    FP32 最低位: 规约数为 2^(E-24) (s = m * 2^E, 0.5 <= |m| < 1), 非规约数为 2^-149
+    """
+    s = np.where(np.isfinite(s), s, 0.0)             # 无穷/NaN 的结果在调用方被屏蔽
+    _, E = np.frexp(s)
+    q = np.ldexp(np.abs(s), -np.maximum(E - 24, -149))
+    f4 = (q - np.floor(q)) * 4
+    k = np.floor(f4).astype(np.int64)
+    exact = f4 == k
+    below = (err != 0) & (np.signbit(err) != np.signbit(s))   # 真值比 s 略小
+    k = np.where(below & exact, (k - 1) % 4, k)
+    sticky = (~exact | (err != 0)).astype(np.int64)
+    return (k << 1) | sticky
+
+
+def _result_class(r, nan, inf):
+    """r: float64 精确结果; nan/inf: 结果为 NaN / 由 Inf 操作数得到 Inf 的掩码"""
+    with np.errstate(over='ignore'):
+        over = np.isinf(r.astype(np.float32)) & ~inf
+    return np.select([nan, inf, r == 0, over, np.abs(r) < 2.0 ** -126], [5, 4, 0, 3, 1], default=2)
+
+
+def _special(cls_a, cls_b, sa, sb, inf_zero_valid):
+    """NaN/Inf 传播类别 (对应 _SPECIAL 的编号); sa/sb 为参与运算的有效符号"""
+    nan_a, nan_b = cls_a == 4, cls_b == 4
+    inf_a, inf_b = cls_a == 3, cls_b == 3
+    zero = (cls_a == 0) | (cls_b == 0)
+    return np.select(
+        [nan_a & nan_b, nan_a, nan_b,
+         inf_a & inf_b & (sa == sb), inf_a & inf_b,
+         inf_zero_valid & (inf_a | inf_b) & zero, inf_a | inf_b],
+        [3, 1, 2, 5, 6, 7, 4], default=0)
+
+
+# ==========================================
+# 2. 各运算单元的采样
+# ==========================================
+
+def _count(idx, n_bins):
+    idx = np.asarray(idx, dtype=np.int64)
+    return np.bincount(idx[idx >= 0], minlength=n_bins)
+
+
+def sample_add(a, b, op):
+    """a, b: uint32 位模式, op: 0 加 / 1 减 (可为数组); 返回 {覆盖点: 计数数组}"""
+    sa, ea, _, ca = _fields(a)
+    sb, eb, _, cb = _fields(b)
+    op = np.broadcast_to(np.asarray(op, dtype=np.int64), sa.shape)
+    sb = sb ^ op
+    x, y = _to_f64(a), np.where(op == 1, -1.0, 1.0) * _to_f64(b)
+    finite = (ca < 3) & (cb < 3)
+
+    with np.errstate(invalid='ignore', over='ignore'):
+        s = x + y
+        bb = s - x
+        err = (x - (s - bb)) + (y - bb)
+    err = np.where(finite, err, 0.0)
+
+    d = np.abs(np.maximum(ea, 1) - np.maximum(eb, 1))
+    exp_diff = np.where(finite, np.select([d <= 26, d <= 47], [d, 27], default=28), -1)
+    eff_op = np.where(finite, (sa != sb).astype(np.int64), -1)
+
+    big = np.maximum(np.abs(x), np.abs(y))
+    _, e_big = np.frexp(big)
+    _, e_res = np.frexp(s)
+    shift = e_big - e_res
+    norm = np.select([s == 0, shift < 0, shift <= 23], [26, 0, shift + 1], default=25)
+    norm = np.where(finite & (big != 0), norm, -1)
+
+    nan = (ca == 4) | (cb == 4) | ((ca == 3) & (cb == 3) & (sa != sb))
+    inf = ~nan & ((ca == 3) | (cb == 3))
+    result = _result_class(np.where(finite, s, 0.0), nan, inf)
+    with np.errstate(over='ignore'):
+        rounds = finite & (s != 0) & ~np.isinf(s.astype(np.float32))
+    grs = np.where(rounds, _grs(s, err), -1)
+
+    pts = BINS['add']
+    return {
+        'operands': _count(ca * 5 + cb, len(pts['operands'])),
+        'exp_diff': _count(exp_diff, len(pts['exp_diff'])),
+        'eff_op': _count(eff_op, 2),
+        'norm_shift': _count(norm, len(pts['norm_shift'])),
+        'grs': _count(grs, 8),
+        'result': _count(result, len(pts['result'])),
+        'special': _count(_special(ca, cb, sa, sb, False), len(pts['special'])),
+    }
+
+
+def sample_mult(a, b):
+    """a, b: uint32 位模式; 返回 {覆盖点: 计数数组}"""
+    sa, ea, fa, ca = _fields(a)
+    sb, eb, fb, cb = _fields(b)
+    x, y = _to_f64(a), _to_f64(b)
+    finite = (ca < 3) & (cb < 3)
+    nonzero = finite & (ca != 0) & (cb != 0)
+    with np.errstate(invalid='ignore', over='ignore'):
+        p = x * y
+
+    es = np.maximum(ea, 1) + np.maximum(eb, 1) - 127
+    exp_sum = np.select([es < -23, es < 0, es == 0, es <= 10, es <= 243, es <= 253, es == 254],
+                        [0, 1, 2, 3, 4, 5, 6], default=7)
+    exp_sum = np.where(nonzero, exp_sum, -1)
+    ma = np.where(ea > 0, fa | 0x800000, fa)
+    mb = np.where(eb > 0, fb | 0x800000, fb)
+    carry = np.where(nonzero & (ca == 2) & (cb == 2), (ma * mb >= (1 << 47)).astype(np.int64), -1)
+
+    nan = (ca == 4) | (cb == 4) | (((ca == 3) & (cb == 0)) | ((ca == 0) & (cb == 3)))
+    inf = ~nan & ((ca == 3) | (cb == 3))
+    result = _result_class(np.where(finite, p, 0.0), nan, inf)
+    with np.errstate(over='ignore'):
+        rounds = nonzero & ~np.isinf(p.astype(np.float32))
+    grs = np.where(rounds, _grs(p, np.zeros_like(p)), -1)
+
+    pts = BINS['mult']
+    return {
+        'operands': _count(ca * 5 + cb, len(pts['operands'])),
+        'exp_sum': _count(exp_sum, len(pts['exp_sum'])),
+        'mant_carry': _count(carry, 2),
+        'grs': _count(grs, 8),
+        'result': _count(result, len(pts['result'])),
+        'special': _count(_special(ca, cb, sa, sb, True), len(pts['special'])),
+    }
+
+
+def sample_file(path, unit, chunk_rows=CHUNK_ROWS):
+    """
+    读取 testbench 输入文件 (每行一个 32 位字, 两行为一对), 返回 ({覆盖点: 计数数组}, 采样数)
+    add 每对按 ADD 和 SUB 各计一次, 与 tb_fp32_add_sub.v 的激励方式相同
+    """
+    if unit not in UNITS:
+        raise ValueError(f"未知的运算单元: {unit}")
+    chunk_rows += chunk_rows % 2
+    total = {k: np.zeros(len(v), dtype=np.int64) for k, v in BINS[unit].items()}
+    n = 0
+    for words in iter_tb_file(path, dtype='raw', chunk_rows=chunk_rows):
+        w = words.ravel()
+        w = w[:len(w) // 2 * 2]
+        a, b = w[0::2], w[1::2]
+        if unit == 'add':
+            parts = [sample_add(a, b, 0), sample_add(a, b, 1)]
+            n += 2 * len(a)
+        else:
+            parts = [sample_mult(a, b)]
+            n += len(a)
+        for c in parts:
+            for k, v in c.items():
+                total[k] += v
+    return total, n
+
+
+# ==========================================
+# 3. 覆盖率数据库
+# ==========================================
+
+class CoverageDB:
+    """
+    {unit: {'samples': n, 'points': {coverpoint: {bin: count}}}} 形式的计数库
+    计数只做累加, 因此多个 db (不同种子/不同机器) 可以任意顺序合并
+    """
+
+    def __init__(self, units=None, sources=None):
+        self.units = units or {}
+        self.sources = sources or []
+
+    @classmethod
+    def load(cls, path):
+        """读取 json, 文件不存在时返回空库"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            d = json.load(f)
+        if d.get('version') != DB_VERSION:
+            raise ValueError(f"不支持的覆盖率库版本: {d.get('version')}")
+        return cls(d['units'], d.get('sources', []))
+
+    def save(self, path):
+        """先写临时文件再替换, 中途中断不会损坏已有的库"""
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, 'w') as f:
+            json.dump({'version': DB_VERSION, 'units': self.units, 'sources': self.sources}, f, indent=1)
+        os.replace(tmp, path)
+
+    def add(self, unit, counts, samples, source=None):
+        """counts: {覆盖点: 计数数组} (桶顺序同 BINS[unit])"""
+        u = self.units.setdefault(unit, {'samples': 0, 'points': {}})
+        u['samples'] += int(samples)
+        for point, c in counts.items():
+            bins = u['points'].setdefault(point, {})
+            for label, v in zip(BINS[unit][point], c):
+                bins[label] = bins.get(label, 0) + int(v)
+        if source is not None:
+            self.sources.append({'unit': unit, 'source': source, 'samples': int(samples)})
+
+    def merge(self, other):
+        for unit, u in other.units.items():
+            mine = self.units.setdefault(unit, {'samples': 0, 'points': {}})
+            mine['samples'] += u['samples']
+            for point, bins in u['points'].items():
+                dst = mine['points'].setdefault(point, {})
+                for label, v in bins.items():
+                    dst[label] = dst.get(label, 0) + v
+        self.sources += other.sources
+        return self
+
+    def holes(self, unit):
+        """未命中的桶, 返回 [(覆盖点, 桶)], 未采样过的覆盖点全部算作未命中"""
+        points = self.units.get(unit, {}).get('points', {})
+        return [(point, label) for point, labels in BINS[unit].items()
+                for label in labels if not points.get(point, {}).get(label, 0)]
+
+    def report(self, unit, show_holes=True):
+        u = self.units.get(unit, {'samples': 0, 'points': {}})
+        lines = [f"[{unit}] samples: {u['samples']}"]
+        holes = self.holes(unit)
+        total = sum(len(v) for v in BINS[unit].values())
+        for point, labels in BINS[unit].items():
+            miss = [l for p, l in holes if p == point]
+            hit = len(labels) - len(miss)
+            lines.append(f"  {point:<11} {hit:>3}/{len(labels):<3} ({100.0 * hit / len(labels):5.1f}%)"
+                         + (f"  未命中: {', '.join(miss)}" if show_holes and miss else ""))
+        lines.append(f"  {'total':<11} {total - len(holes):>3}/{total:<3} ({100.0 * (total - len(holes)) / total:5.1f}%)")
+        return "\n".join(lines)
+
+
+def suggest_weights(db, unit, base=0.05):
+    """
+    按未命中的桶给 fp32_stimulus 的各分层分配权重 (每个未命中桶对应的分层 +1, 其余分层保留 base)
+    返回的 dict 可直接传给 fp32_stimulus.gen_pairs / iter_pairs 的 weights
+    """
+    w = dict.fromkeys(STRATA, base)
+    for point, _ in db.holes(unit):
+        w[HOLE_STRATA[point]] += 1.0
+    return w
@@ -0,0 +1,73 @@
+#FP32 数据通路的逐位仿真: 用 fp32_softfloat 按 RTL 的乘法器/加法树结构计算 a1~a7
+#与 wavelet_model 的 float64 golden 共用抽取位置 (dec_output_range), 只是每个乘积和每次加法之后都按 FP32 舍入:
+#   p_j = fp32_mult(x[t-j], DEC_Hj)
+#   y   = ((p0+p1)+(p2+p3)) + ((p4+p5)+(p6+p7))      (decompose_L*.v 中 sum0/sum1/sum2 三级加法器)
+#系数取 float32(h), 与 generate_verilog_coeffs_fp32.py 写入 coef_params.vh 的值相同
+import os
+import re
+
+import numpy as np
+
+from wavelet_model import h_dec, dec_output_range, CHUNK_SIZE
+from fp32_softfloat import fp32_mult, fp32_add_sub
+
+COEF_PARAMS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scr', 'coef_params.vh')
+
+_PARAM_RE = re.compile(r"parameter\s+(DEC_H\d+)\s*=\s*32'h([0-9a-fA-F]{8})")
+
+
+def read_coef_params(path=COEF_PARAMS):
+    """读取 coef_params.vh 中的 DEC_H0~DEC_H7, 返回按序号排列的 uint32 位模式数组"""
+    with open(path) as f:
+        found = dict(_PARAM_RE.findall(f.read()))
+    names = sorted(found, key=lambda k: int(k[5:]))
+    return np.array([int(found[k], 16) for k in names], dtype=np.uint32)
+
+
+def _fir_tree_fp32(win, h, rounding):
+    """(n, 8) 的 uint32 窗口 (最新一点在最后) 做 8 抽头乘加, 返回 uint32 结果"""
+    p = fp32_mult(win[:, ::-1], h, rounding=rounding)
+    s = fp32_add_sub(p[:, 0::2], p[:, 1::2], rounding=rounding)
+    s = fp32_add_sub(s[:, 0::2], s[:, 1::2], rounding=rounding)
+    return fp32_add_sub(s[:, 0], s[:, 1], rounding=rounding)
+
+
+def decimate_by2_fp32(data, h, t0, n_out, rounding='rtl', chunk=CHUNK_SIZE):
+    """
+    decimate_by2 的 FP32 版本, data 先转为 float32 (int16 输入可精确表示)
+    rounding: 传给 fp32_softfloat ('rtl' / 'rne' / 'trunc')
+    返回 float32 数组
+    """
+    x = np.ascontiguousarray(np.asarray(data, dtype=np.float32).view(np.uint32))
+    hb = np.asarray(h, dtype=np.float32).view(np.uint32)
+    taps = len(hb)
+    out = np.empty(max(n_out, 0), dtype=np.uint32)
+    if n_out <= 0:
+        return out.view(np.float32)
+    if t0 < taps - 1 or t0 + 2 * (n_out - 1) >= len(x):
+        raise ValueError(f"输出范围越界: t0={t0}, n_out={n_out}, len={len(x)}")
+
+    step = x.strides[0]
+    for m0 in range(0, n_out, chunk):
+        m1 = min(m0 + chunk, n_out)
+        start = t0 + 2 * m0 - (taps - 1)
+        win = np.lib.stride_tricks.as_strided(
+            x[start:], shape=(m1 - m0, taps), strides=(2 * step, step), writeable=False)
+        out[m0:m1] = _fir_tree_fp32(win, hb, rounding)
+    return out.view(np.float32)
+
+
+def dec_level_fp32(data, h, level, phase=None, rounding='rtl'):
+    """第 level 级分解 (FP32 仿真)"""
+    t0, n_out = dec_output_range(level, len(data), phase)
+    return decimate_by2_fp32(data, h, t0, n_out, rounding)
+
+
+def dec_cascade_fp32(data, h=h_dec, levels=7, rounding='rtl'):
+    """依次计算 a1 ~ a{levels} 的 FP32 仿真结果, 返回 float32 数组列表"""
+    res = []
+    x = data
+    for level in range(1, levels + 1):
+        x = dec_level_fp32(x, h, level, rounding=rounding)
+        res.append(x)
+    return res
@@ -0,0 +1,202 @@
+#FP32 乘法/加减法的 NumPy 整数仿真 (逐位精确)
+#用 uint32/uint64 数组复现 scr/fp32_mult.v 与 scr/fp32_add_sub.v 的数据通路，整批向量一次计算
+#
+#可选策略:
+#   rounding:  'rtl'   完全按 RTL 实现 (乘法: round&sticky 才进位; 加法: 对阶移出的位直接丢弃, 结果截断)
+#              'rne'   IEEE 754 就近舍入 (偶数)
+#              'trunc' IEEE 754 向零截断 (对阶时保留 sticky)
+#   subnormal: 'rtl'   与 RTL 相同, 指数域为 0 时尾数按 0.m、指数按 0 参与运算
+#              'ftz'   输入非规约数先清零 (保留符号)
+#   nan:       'canonical' 所有 NaN 结果输出 0x7FC00000 (RTL 行为)
+#              'propagate' 输入含 NaN 时输出第一个 NaN 操作数 (置 quiet 位)
+#结果下溢一律清零, 与 RTL 相同 (不产生非规约数结果)
+import numpy as np
+
+CANONICAL_NAN = 0x7FC00000
+
+ROUNDING_MODES = ('rtl', 'rne', 'trunc')
+SUBNORMAL_MODES = ('rtl', 'ftz')
+NAN_MODES = ('canonical', 'propagate')
+
+
+def as_bits(x):
+    """float32 数组按位解释为 uint32, 其余类型直接转为 uint32"""
+    x = np.asarray(x)
+    if x.dtype == np.float32:
+        return x.view(np.uint32)
+    if x.dtype.kind == 'f':
+        return x.astype(np.float32).view(np.uint32)
+    return x.astype(np.uint32)
+
+
+def _check(rounding, subnormal, nan):
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"未知的舍入模式: {rounding}")
+    if subnormal not in SUBNORMAL_MODES:
+        raise ValueError(f"未知的非规约数策略: {subnormal}")
+    if nan not in NAN_MODES:
+        raise ValueError(f"未知的 NaN 策略: {nan}")
+
+
+def _unpack(x, subnormal):
+    """拆分符号/指数/尾数 (全部为 int64, 尾数含隐含位)"""
+    x = x.astype(np.int64)
+    if subnormal == 'ftz':
+        x = np.where((x & 0x7F800000) == 0, x & 0x80000000, x)
+    sign = x >> 31
+    exp = (x >> 23) & 0xFF
+    frac = x & 0x7FFFFF
+    man = np.where(exp != 0, frac | 0x800000, frac)
+    is_zero = (x & 0x7FFFFFFF) == 0
+    is_inf = (exp == 0xFF) & (frac == 0)
+    is_nan = (exp == 0xFF) & (frac != 0)
+    return x, sign, exp, man, is_zero, is_inf, is_nan
+
+
+def _nan_result(a, b, nan_a, nan_b, nan):
+    """输入含 NaN 时的输出"""
+    if nan == 'canonical':
+        return np.full(a.shape, CANONICAL_NAN, dtype=np.int64)
+    return np.where(nan_a, a, b) | 0x00400000
+
+
+def _bitlen(v):
+    """非负整数数组的位宽 (v < 2^53), 0 的位宽为 0"""
+    _, e = np.frexp(v.astype(np.float64))
+    return e.astype(np.int64)
+
+
+def _round_inc(lsb, rnd, sticky, rounding):
+    if rounding == 'rtl':
+        return rnd & sticky
+    if rounding == 'rne':
+        return rnd & (sticky | lsb)
+    return np.zeros_like(rnd)
+
+
+# ==========================================
+# 1. 乘法 (fp32_mult)
+# ==========================================
+
+def fp32_mult(a, b, rounding='rtl', subnormal='rtl', nan='canonical'):
+    """
+    a, b: uint32 位模式或 float32 数组 (可广播)
+    返回 uint32 结果数组
+    """
+    _check(rounding, subnormal, nan)
+    a, b = np.broadcast_arrays(as_bits(a), as_bits(b))
+    a, sa, ea, ma, zero_a, inf_a, nan_a = _unpack(a, subnormal)
+    b, sb, eb, mb, zero_b, inf_b, nan_b = _unpack(b, subnormal)
+    sign = sa ^ sb
+
+    # Stage 2/3: 24x24 乘积, 按 bit47 归一化并取出 round/sticky
+    prod = (ma * mb).astype(np.uint64)
+    hi = (prod >> np.uint64(47)).astype(np.int64) & 1
+    sh = (23 + hi).astype(np.uint64)
+    man = (prod >> sh).astype(np.int64) & 0xFFFFFF
+    rnd = (prod >> (sh - np.uint64(1))).astype(np.int64) & 1
+    sticky = ((prod & ((np.uint64(1) << (sh - np.uint64(1))) - np.uint64(1))) != 0).astype(np.int64)
+    exp = ea + eb - 127 + hi
+
+    # Stage 4: 舍入, 1.111..1 进位时指数加 1
+    inc = _round_inc(man & 1, rnd, sticky, rounding)
+    carry = inc & (man == 0xFFFFFF)
+    frac = np.where(inc == 1, man + 1, man) & 0x7FFFFF
+    exp = exp + carry
+
+    # Stage 5: 特殊值, 优先级与 RTL 相同
+    is_nan = nan_a | nan_b
+    is_inf = inf_a | inf_b
+    is_zero = zero_a | zero_b
+    res = np.select(
+        [is_nan, is_inf & is_zero, is_inf, is_zero, exp >= 255, exp <= 0],
+        [_nan_result(a, b, nan_a, nan_b, nan),
+         CANONICAL_NAN,
+         (sign << 31) | 0x7F800000,
+         sign << 31,
+         (sign << 31) | 0x7F800000,
+         sign << 31],
+        default=(sign << 31) | ((exp & 0xFF) << 23) | frac)
+    return res.astype(np.uint32)
+
+
+# ==========================================
+# 2. 加减法 (fp32_add_sub)
+# ==========================================
+
+def fp32_add_sub(a, b, op=0, rounding='rtl', subnormal='rtl', nan='canonical'):
+    """
+    op=0: a+b, op=1: a-b (可为数组)
+    返回 uint32 结果数组
+    """
+    _check(rounding, subnormal, nan)
+    a, b, op = np.broadcast_arrays(as_bits(a), as_bits(b), np.asarray(op, dtype=np.int64))
+    a, sa, ea, ma, zero_a, inf_a, nan_a = _unpack(a, subnormal)
+    b, sb, eb, mb, zero_b, inf_b, nan_b = _unpack(b, subnormal)
+    sb = sb ^ (op & 1)
+
+    # Stage 2: 对阶, 尾数扩展为 48 位 ({man, 24'h0}), 较小的一方右移
+    a_big = ea >= eb
+    exp = np.where(a_big, ea, eb)
+    shift = np.minimum(np.abs(ea - eb), 63).astype(np.uint64)
+    A = (ma << 24).astype(np.uint64)
+    B = (mb << 24).astype(np.uint64)
+    small = np.where(a_big, B, A)
+    aligned = small >> shift
+    if rounding != 'rtl':
+        # IEEE 模式: 移出的位并入最低位作为 sticky
+        lost = (small & ((np.uint64(1) << shift) - np.uint64(1))) != 0
+        aligned = aligned | lost.astype(np.uint64)
+    A = np.where(a_big, A, aligned).astype(np.int64)
+    B = np.where(a_big, aligned, B).astype(np.int64)
+
+    # Stage 3: 同号相加, 异号大减小
+    same = sa == sb
+    R = np.where(same, A + B, np.abs(A - B))
+    sign = np.where(same | (A >= B), sa, sb)
+
+    # Stage 4: 归一化
+    lead = _bitlen(R) - 1                      # 最高位 1 所在位置 (0..48), R=0 时为 -1
+    if rounding == 'rtl':
+        clz = 48 - lead
+        # RTL 在 9 位无符号域内计算/比较 exp_adjusted, 负数会回绕成大数
+        exp9 = np.where(clz == 0, exp + 1, exp - (clz - 1)) & 0x1FF
+        frac = (R >> np.clip(25 - clz, 0, 63)) & 0x7FFFFF
+        normal = (sign << 31) | ((exp9 & 0xFF) << 23) | frac
+        value = np.select(
+            [(R == 0) | (clz > 24), exp9 == 0, exp9 >= 255],
+            [0, 0, (sign << 31) | 0x7F800000],
+            default=normal)
+        both_zero = np.where(op == 1, sa & sb, sa | sb) << 31
+    else:
+        shr = lead - 23
+        man = np.where(shr >= 0, R >> np.clip(shr, 0, 63), R << np.clip(-shr, 0, 63))
+        rnd = np.where(shr >= 1, (R >> np.clip(shr - 1, 0, 63)) & 1, 0)
+        sticky = np.where(shr >= 2, (R & ((1 << np.clip(shr - 1, 0, 62)) - 1)) != 0, False).astype(np.int64)
+        inc = _round_inc(man & 1, rnd, sticky, rounding)
+        man = man + inc
+        carry = man >> 24
+        e = exp + (lead - 47) + carry
+        frac = (man >> carry) & 0x7FFFFF
+        normal = (sign << 31) | ((e & 0xFF) << 23) | frac
+        value = np.select(
+            [R == 0, e <= 0, e >= 255],
+            [0, sign << 31, (sign << 31) | 0x7F800000],
+            default=normal)
+        both_zero = (sa & sb) << 31
+
+    # 特殊值, 优先级: NaN > Inf > 0+0 > 正常数值
+    is_nan = nan_a | nan_b
+    res = np.select(
+        [is_nan,
+         inf_a & inf_b & (sa != sb),
+         inf_a,
+         inf_b,
+         zero_a & zero_b],
+        [_nan_result(a, b, nan_a, nan_b, nan),
+         CANONICAL_NAN,
+         (sa << 31) | 0x7F800000,
+         (sb << 31) | 0x7F800000,
+         both_zero],
+        default=value)
+    return res.astype(np.uint32)
@@ -0,0 +1,195 @@
+#FP32 运算单元 (fp32_add_sub / fp32_mult) 测试激励的向量化生成
+#直接按位生成符号/指数/尾数 (uint32 数组), 并按分层 (strata) 分配样本, 使对阶移位、抵消、舍入边界、
+#非规约数和特殊值都能稳定覆盖; random.uniform(-3e38, 3e38) 这类按数值均匀取样几乎只落在最大的几个指数上
+#
+#分层 (每对操作数属于其中一层, 各层比例由 weights 指定):
+#   random     符号/指数 (1..254)/尾数 全部独立均匀
+#   exp_diff   两个操作数的指数差在 0..max_exp_diff 内均匀 (覆盖加法对阶移出 0~48 位以及全部移出)
+#   cancel     同指数或相差 1, 尾数只差低若干位, 符号相反 (加法大量抵消, 归一化左移)
+#   round      尾数低 k 位为 0...0 / 1...1 / 10...0 / 01...1, 指数差 0..26 (落在 round/sticky 位附近)
+#   subnormal  至少一个操作数为非规约数, 另一个为小指数或非规约数
+#   special    至少一个操作数取自 SPECIAL_VALUES (±0, ±Inf, NaN, 最大/最小规约数, 非规约数边界, ±1)
+#   range      乘法指数和接近上溢 (ea+eb≈381) 或下溢 (ea+eb≈127), 以及加法在最大指数处上溢
+import numpy as np
+
+from ieee754_codec import format_words
+
+SPECIAL_VALUES = np.array([
+    0x00000000, 0x80000000,        # ±0
+    0x7F800000, 0xFF800000,        # ±Inf
+    0x7FC00000, 0x7F800001,        # qNaN / sNaN
+    0xFFC00000,                    # -qNaN
+    0x7F7FFFFF, 0xFF7FFFFF,        # ±最大规约数
+    0x00800000, 0x80800000,        # ±最小规约数
+    0x007FFFFF, 0x00000001,        # 最大/最小非规约数
+    0x3F800000, 0xBF800000,        # ±1.0
+    0x3FFFFFFF,                    # 略小于 2.0
+], dtype=np.uint32)
+
+DEFAULT_WEIGHTS = {
+    'random': 0.25,
+    'exp_diff': 0.20,
+    'cancel': 0.10,
+    'round': 0.15,
+    'subnormal': 0.10,
+    'special': 0.05,
+    'range': 0.15,
+}
+
+MAX_EXP_DIFF = 50
+# 每次生成的操作数对数
+CHUNK_PAIRS = 1 << 20
+
+_MAN_MASK = np.uint32(0x7FFFFF)
+
+
+def pack(sign, exp, man):
+    """符号 (0/1)、指数 (0..255)、尾数 (23 位) -> uint32 位模式"""
+    return ((np.asarray(sign, dtype=np.uint32) << np.uint32(31)) |
+            (np.asarray(exp, dtype=np.uint32) << np.uint32(23)) |
+            (np.asarray(man, dtype=np.uint32) & _MAN_MASK))
+
+
+def _sign(rng, n):
+    return rng.integers(0, 2, n, dtype=np.uint32)
+
+
+def _man(rng, n):
+    return rng.integers(0, 1 << 23, n, dtype=np.uint32)
+
+
+def _exp(rng, n, lo=1, hi=254):
+    return rng.integers(lo, hi + 1, n, dtype=np.int64)
+
+
+def _offset_exp(rng, ea, d):
+    """ea 加上随机符号的差值 d, 截断到规约数范围 1..254"""
+    s = np.where(rng.integers(0, 2, len(ea)) == 1, 1, -1)
+    return np.clip(ea + s * d, 1, 254)
+
+
+def _low_pattern(rng, n):
+    """尾数低 k 位的边界模式 (k = 1..23): 0...0 / 1...1 / 10...0 / 01...1, 高位随机"""
+    k = rng.integers(1, 24, n, dtype=np.uint32)
+    low = (np.uint32(1) << k) - np.uint32(1)
+    half = np.uint32(1) << (k - np.uint32(1))
+    kind = rng.integers(0, 4, n)
+    pat = np.select([kind == 0, kind == 1, kind == 2], [np.uint32(0), low, half], default=half - np.uint32(1))
+    return (_man(rng, n) & ~low) | pat.astype(np.uint32)
+
+
+def _gen_random(rng, n):
+    return pack(_sign(rng, n), _exp(rng, n), _man(rng, n)), pack(_sign(rng, n), _exp(rng, n), _man(rng, n))
+
+
+def _gen_exp_diff(rng, n, max_exp_diff=MAX_EXP_DIFF):
+    ea = _exp(rng, n)
+    eb = _offset_exp(rng, ea, rng.integers(0, max_exp_diff + 1, n))
+    return pack(_sign(rng, n), ea, _man(rng, n)), pack(_sign(rng, n), eb, _man(rng, n))
+
+
+def _gen_cancel(rng, n):
+    sa, ea, ma = _sign(rng, n), _exp(rng, n, 2, 253), _man(rng, n)
+    eb = ea + rng.integers(-1, 2, n)
+    k = rng.integers(0, 24, n, dtype=np.uint32)
+    mb = ma ^ (_man(rng, n) & ((np.uint32(1) << k) - np.uint32(1)))
+    return pack(sa, ea, ma), pack(sa ^ np.uint32(1), eb, mb)
+
+
+def _gen_round(rng, n):
+    ea = _exp(rng, n)
+    eb = _offset_exp(rng, ea, rng.integers(0, 27, n))
+    return pack(_sign(rng, n), ea, _low_pattern(rng, n)), pack(_sign(rng, n), eb, _low_pattern(rng, n))
+
+
+def _gen_subnormal(rng, n):
+    a = pack(_sign(rng, n), 0, np.maximum(_man(rng, n), 1))
+    eb = np.where(rng.integers(0, 4, n) == 0, 0, _exp(rng, n, 1, 30))
+    b = pack(_sign(rng, n), eb, _man(rng, n))
+    swap = rng.integers(0, 2, n) == 1
+    return np.where(swap, b, a), np.where(swap, a, b)
+
+
+def _gen_special(rng, n):
+    a = SPECIAL_VALUES[rng.integers(0, len(SPECIAL_VALUES), n)]
+    _, b = _gen_random(rng, n)
+    both = rng.integers(0, 2, n) == 1
+    b = np.where(both, SPECIAL_VALUES[rng.integers(0, len(SPECIAL_VALUES), n)], b)
+    swap = rng.integers(0, 2, n) == 1
+    return np.where(swap, b, a), np.where(swap, a, b)
+
+
+def _gen_range(rng, n):
+    kind = rng.integers(0, 3, n)
+    ea = np.select([kind == 0, kind == 1], [_exp(rng, n, 127, 254), _exp(rng, n, 1, 126)], default=_exp(rng, n, 250, 254))
+    target = np.select([kind == 0, kind == 1], [381, 127], default=ea)
+    eb = np.clip(target - ea + rng.integers(-3, 4, n), 1, 254)
+    sa = _sign(rng, n)
+    sb = np.where(kind == 2, sa, _sign(rng, n))         # 加法上溢: 同号
+    return pack(sa, ea, _man(rng, n)), pack(sb, eb, _man(rng, n))
+
+
+STRATA = {
+    'random': _gen_random,
+    'exp_diff': _gen_exp_diff,
+    'cancel': _gen_cancel,
+    'round': _gen_round,
+    'subnormal': _gen_subnormal,
+    'special': _gen_special,
+    'range': _gen_range,
+}
+
+
+def parse_weights(text):
+    """'random=0.3,cancel=0.2' -> dict, 未列出的分层权重为 0"""
+    weights = {}
+    for item in filter(None, (s.strip() for s in text.split(','))):
+        name, _, w = item.partition('=')
+        if name not in STRATA:
+            raise ValueError(f"未知的分层: {name} (可选: {', '.join(STRATA)})")
+        weights[name] = float(w)
+    return weights
+
+
+def gen_pairs(n, rng, weights=None):
+    """
+    生成 n 对操作数, 返回 (a, b, strata) : 两个 uint32 位模式数组和每对所属分层的编号 (STRATA 中的顺序)
+    各分层的数量按 weights 做多项分布抽样, 然后整体打乱顺序
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    names = list(STRATA)
+    p = np.array([max(float(weights.get(k, 0.0)), 0.0) for k in names])
+    if p.sum() <= 0:
+        raise ValueError("分层权重之和必须大于 0")
+    counts = rng.multinomial(n, p / p.sum())
+    a, b, tag = [], [], []
+    for i, (name, c) in enumerate(zip(names, counts)):
+        if c:
+            x, y = STRATA[name](rng, int(c))
+            a.append(x)
+            b.append(y)
+            tag.append(np.full(c, i, dtype=np.uint8))
+    order = rng.permutation(n)
+    return (np.concatenate(a)[order].astype(np.uint32), np.concatenate(b)[order].astype(np.uint32),
+            np.concatenate(tag)[order])
+
+
+def iter_pairs(n, seed=42, weights=None, chunk_pairs=CHUNK_PAIRS):
+    """分块生成 n 对操作数, 每次返回 (a, b, strata); 结果只取决于 seed 和 chunk_pairs"""
+    rng = np.random.default_rng(seed)
+    for start in range(0, n, chunk_pairs):
+        yield gen_pairs(min(chunk_pairs, n - start), rng, weights)
+
+
+def write_pairs(f, a, b):
+    """把操作数对按 a, b 交替写成每行一个 32 位二进制字 (testbench 的 $fscanf("%b") 格式)"""
+    words = np.empty(2 * len(a), dtype=np.uint32)
+    words[0::2] = a
+    words[1::2] = b
+    f.write(format_words(words, 'b'))
+
+
+def strata_counts(tags):
+    """各分层的样本数, 返回 {name: count}"""
+    c = np.bincount(np.asarray(tags, dtype=np.int64), minlength=len(STRATA))
+    return dict(zip(STRATA, c.tolist()))
@@ -0,0 +1,278 @@
+#golden 参考输出的磁盘缓存 (按内容寻址)
+#每一级的输出以 .npy 保存, 文件名为以下内容的 SHA-256:
+#   模型版本 MODEL_VERSION + 输入数据字节 + 滤波器系数 + 各级参数 (DEC_LEVELS)
+#命中时以 mmap 方式打开, 不占用内存; 总大小超过上限时按最近使用时间 (mtime) 淘汰最旧的文件
+#
+#缓存目录: 环境变量 WAVELET_GOLDEN_CACHE, 默认 ~/.cache/wavelet_golden
+#容量上限: 环境变量 WAVELET_GOLDEN_CACHE_MB, 默认 4096 MB
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from wavelet_model import MODEL_VERSION, DEC_LEVELS, h_dec, dec_stream
+from tb_io import iter_tb_file
+
+DEFAULT_MAX_MB = 4096
+
+
+def _default_root():
+    return os.environ.get('WAVELET_GOLDEN_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'wavelet_golden'))
+
+
+def _default_max_bytes():
+    return int(float(os.environ.get('WAVELET_GOLDEN_CACHE_MB', DEFAULT_MAX_MB)) * (1 << 20))
+
+
+def hash_file(path, block=1 << 22):
+    """文件内容的 SHA-256"""
+    d = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            b = f.read(block)
+            if not b:
+                break
+            d.update(b)
+    return d.hexdigest()
+
+
+def hash_array(x):
+    """数组内容 (含 dtype/shape) 的 SHA-256"""
+    x = np.ascontiguousarray(x)
+    d = hashlib.sha256()
+    d.update(f"{x.dtype.str}{x.shape}".encode())
+    d.update(x.view(np.uint8).reshape(-1))
+    return d.hexdigest()
+
+
+class _NpyWriter:
+    """分块追加写入 1 维 .npy: 先写长度为 0 的文件头, 提交时回填长度 (文件头长度与元素个数无关)"""
+
+    def __init__(self, cache, key, dtype=np.float64):
+        self.cache = cache
+        self.key = key
+        self.dtype = np.dtype(dtype).newbyteorder('<')
+        self.n = 0
+        self.tmp = cache.path(key) + f'.tmp-{os.getpid()}-{id(self)}'
+        self._f = open(self.tmp, 'wb')
+        self._write_header()
+
+    def _write_header(self):
+        np.lib.format.write_array_header_1_0(
+            self._f, {'descr': self.dtype.str, 'fortran_order': False, 'shape': (self.n,)})
+
+    def write(self, x):
+        x = np.ascontiguousarray(x, dtype=self.dtype)
+        self._f.write(x.tobytes())
+        self.n += x.size
+
+    def commit(self, evict=True):
+        """
+        写完后原子地放入缓存, 返回 mmap 数组
+        evict=False 时不做容量淘汰, 由调用方在一组文件都提交后统一调用 cache.evict(keep=全部键)
+        """
+        end = self._f.tell()
+        self._f.seek(0)
+        self._write_header()
+        self._f.seek(end)
+        self._f.close()
+        os.replace(self.tmp, self.cache.path(self.key))
+        if evict:
+            self.cache.evict(keep=self.key)
+        return self.cache.get(self.key)
+
+    def abort(self):
+        if not self._f.closed:
+            self._f.close()
+        if os.path.exists(self.tmp):
+            os.remove(self.tmp)
+
+
+class GoldenCache:
+    """
+    内容寻址的 .npy 缓存
+    root: 缓存目录; max_bytes: 容量上限 (字节)
+    """
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or _default_root()
+        self.max_bytes = _default_max_bytes() if max_bytes is None else int(max_bytes)
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def key(**parts):
+        """由若干参数 (可 JSON 序列化) 生成缓存键, 自动带上 MODEL_VERSION"""
+        parts = dict(parts, model_version=MODEL_VERSION)
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.root, key + '.npy')
+
+    def get(self, key):
+        """命中返回只读 mmap 数组并刷新使用时间, 否则返回 None"""
+        p = self.path(key)
+        try:
+            arr = np.load(p, mmap_mode='r')
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        try:
+            os.utime(p)
+        except OSError:
+            pass
+        return arr
+
+    def put(self, key, arr, evict=True):
+        """保存整个数组, 返回 mmap 数组; evict 同 _NpyWriter.commit"""
+        w = self.writer(key, np.asarray(arr).dtype)
+        try:
+            w.write(np.asarray(arr).ravel())
+        except BaseException:
+            w.abort()
+            raise
+        return w.commit(evict)
+
+    def writer(self, key, dtype=np.float64):
+        """分块写入, 结束时调用 commit(), 放弃时调用 abort()"""
+        return _NpyWriter(self, key, dtype)
+
+    def entries(self):
+        """[(mtime, size, path)], 按使用时间从旧到新"""
+        out = []
+        for name in os.listdir(self.root):
+            if not name.endswith('.npy'):
+                continue
+            p = os.path.join(self.root, name)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, p))
+        return sorted(out)
+
+    def evict(self, keep=None):
+        """总大小超过上限时删除最久未使用的文件 (keep 为一个键或键的列表, 这些文件不删除)"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if isinstance(keep, str):
+            keep = [keep]
+        keep_paths = {self.path(k) for k in keep or ()}
+        for _, size, p in entries:
+            if total <= self.max_bytes:
+                break
+            if p in keep_paths:
+                continue
+            try:
+                os.remove(p)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, p in self.entries():
+            os.remove(p)
+
+
+# ==========================================
+# 分解级联的缓存
+# ==========================================
+
+def level_key(input_digest, h, level, phases=None, dtype=np.float64, g=None):
+    """
+    第 level 级输出的缓存键: 与输入内容、系数、计算精度以及 L1~L{level} 的参数 (含相位覆盖) 有关
+    float64 不写入键中, 已有的缓存仍然有效; g 不为 None 时为该级细节系数 d{level} (高通 g) 的键
+    """
+    phases = phases or {}
+    params = {}
+    for lv in range(1, level + 1):
+        p = dict(DEC_LEVELS[lv])
+        if lv in phases and 'phase' in p:
+            p['phase'] = int(phases[lv])
+        params[str(lv)] = p
+    extra = {} if np.dtype(dtype) == np.float64 else {'dtype': np.dtype(dtype).name}
+    if g is not None:
+        extra['g'] = np.asarray(g, dtype=np.float64).tolist()
+    return GoldenCache.key(kind='dec', input=input_digest,
+                           h=np.asarray(h, dtype=np.float64).tolist(),
+                           level=level, params=params, **extra)
+
+
+def cached_dec_cascade(x, h=h_dec, levels=7, cache=None):
+    """
+    与 dec_cascade 相同, 返回 [a1, ..., a{levels}] (命中时为 mmap 数组)
+    x: 内存中的输入数组
+    """
+    cache = cache or GoldenCache()
+    digest = hash_array(np.asarray(x, dtype=np.float64))
+    keys = [level_key(digest, h, lv) for lv in range(1, levels + 1)]
+    hits = [cache.get(k) for k in keys]
+    if all(a is not None for a in hits):
+        return hits
+    outs = [[] for _ in keys]
+    for out in dec_stream([x], h, levels):
+        for o, y in zip(outs, out):
+            o.append(y)
+    res = [cache.put(k, np.concatenate(o), evict=False) for k, o in zip(keys, outs)]
+    # 同一输入的各级一起保留, 否则单个输入超过上限时后写的级会淘汰先写的级, 每次都不能全部命中
+    cache.evict(keep=keys)
+    return res
+
+
+def _slice_levels(arrays, chunk, levels=None):
+    """
+    把各级 mmap 数组切成与 dec_stream 相同形式的分段: 第 l 级每次约 chunk/2^l 点
+    arrays 为 [a1..a{levels}, d1..d{levels}] 时, d{l} 与 a{l} 的分段长度相同
+    """
+    levels = levels or len(arrays)
+    steps = [max(1, chunk >> (i % levels + 1)) for i in range(len(arrays))]
+    n_iter = max(-(-len(a) // s) for a, s in zip(arrays, steps)) if arrays else 0
+    for i in range(n_iter):
+        yield [a[i * s:(i + 1) * s] for a, s in zip(arrays, steps)]
+
+
+def cached_dec_stream(input_path, h=h_dec, levels=7, cache=None, chunk_rows=1 << 14, invalid=0, phases=None,
+                      dtype=np.float64, g=None, backend=dec_stream):
+    """
+    与 dec_stream(iter_tb_file(input_path)) 等价的分段输出 (g 不为 None 时后半为 d1~d{levels})
+    backend: 未命中时使用的计算后端 (wavelet_model.DEC_BACKENDS 之一, 结果逐位相同, 不影响缓存键)
+    命中: 直接切片 mmap 的缓存, 不再读取/解析输入
+    未命中: 流式计算, 同时写入缓存; 调用方提前结束 (关闭生成器, 如不匹配预算用完或 DUT 输出较短) 时
+          把剩余输入算完写入缓存后再返回, 下次即可命中; 计算出错时丢弃未写完的缓存
+    """
+    cache = cache or GoldenCache()
+    digest = hash_file(input_path)
+    keys = [level_key(digest, h, lv, phases, dtype) for lv in range(1, levels + 1)]
+    if g is not None:
+        keys += [level_key(digest, h, lv, phases, dtype, g) for lv in range(1, levels + 1)]
+    hits = [cache.get(k) for k in keys]
+    if all(a is not None for a in hits):
+        yield from _slice_levels(hits, chunk_rows * 16, levels)
+        return
+
+    writers = [cache.writer(k, dtype) for k in keys]
+    done = False
+    try:
+        chunks = (x.ravel() for x in iter_tb_file(input_path, invalid=invalid, chunk_rows=chunk_rows))
+        outs = backend(chunks, h, levels, phases, dtype, g)
+        try:
+            for out in outs:
+                for w, y in zip(writers, out):
+                    w.write(y)
+                yield out
+        except GeneratorExit:
+            for out in outs:
+                for w, y in zip(writers, out):
+                    w.write(y)
+            done = True
+            raise
+        done = True
+    finally:
+        for w in writers:
+            if done:
+                w.commit(evict=False)
+            else:
+                w.abort()
+        if done:
+            # 所有级都提交后再淘汰, 同一输入的各级一起保留 (见 cached_dec_cascade)
+            cache.evict(keep=keys)
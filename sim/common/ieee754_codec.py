@@ -0,0 +1,271 @@
+#IEEE-754 / 定宽整数的数组级文本编解码
+#替代各脚本中逐个元素调用 struct.pack/unpack 的转换函数 (float_to_ieee754_binary, bin32_ieee_to_float ...)
+#整批数组通过 ndarray.view(np.uint32) 取位模式, 编码查表得到 ASCII 字符, 解码按 8 个字符一组做 uint64 位运算,
+#没有 Python 级别的逐元素循环
+#
+#文本格式与 testbench 一致:
+#   'b': 定宽二进制 ($fwrite "%b" / $fscanf "%b"), 32 位浮点为 32 个字符, 16 位整数为 16 个字符
+#   'h': 定宽十六进制, 小写 ($fwrite "%h"), 32 位浮点为 8 个字符, 16 位整数为 4 个字符 ("%04x")
+import numpy as np
+
+from fp32_softfloat import as_bits
+
+_ASCII_0 = ord('0')
+
+# 每个字节 -> 8 个 '0'/'1' 字符, 按 uint64 存放以便一次取出 8 个字节
+_BIN_TABLE = np.array(
+    [np.frombuffer(format(i, '08b').encode(), dtype=np.uint64)[0] for i in range(256)],
+    dtype=np.uint64)
+# 每个字节 -> 2 个十六进制字符, 按 uint16 存放
+_HEX_TABLE = np.array(
+    [np.frombuffer(format(i, '02x').encode(), dtype=np.uint16)[0] for i in range(256)],
+    dtype=np.uint16)
+
+
+def default_width(fmt, bits=32):
+    """一个字的字符数"""
+    if fmt == 'b':
+        return bits
+    if fmt == 'h':
+        return (bits + 3) // 4
+    raise ValueError(f"未知的文本格式: {fmt}")
+
+
+def _to_words(x):
+    """float 数组取 FP32 位模式, 整数数组按补码截取为 uint32"""
+    x = np.asarray(x)
+    if x.dtype.kind == 'f':
+        with np.errstate(over='ignore'):
+            return as_bits(x).ravel()
+    return x.astype(np.int64).astype(np.uint32).ravel()
+
+
+# ==========================================
+# 1. 数组 -> 字符矩阵
+# ==========================================
+
+def words_to_chars(x, fmt='b', width=None):
+    """
+    x: float 数组 (按 FP32 编码) 或整数数组 (按补码取低位)
+    返回 (n, width) 的 uint8 ASCII 矩阵
+    """
+    if width is None:
+        width = default_width(fmt)
+    w = _to_words(x)
+    be = w.astype('>u4').view(np.uint8).reshape(-1, 4)
+    if fmt == 'b':
+        if not 0 < width <= 32:
+            raise ValueError(f"二进制宽度必须在 1..32 之间: {width}")
+        chars = np.take(_BIN_TABLE, be).view(np.uint8).reshape(-1, 32)
+        return chars[:, 32 - width:]
+    if fmt == 'h':
+        if not 0 < width <= 8:
+            raise ValueError(f"十六进制宽度必须在 1..8 之间: {width}")
+        chars = np.take(_HEX_TABLE, be).view(np.uint8).reshape(-1, 8)
+        return chars[:, 8 - width:]
+    raise ValueError(f"未知的文本格式: {fmt}")
+
+
+def format_words(x, fmt='b', width=None, lanes=1, sep=','):
+    """
+    生成 testbench 文本: 每行 lanes 个定宽字, 行内以 sep 分隔, 行尾换行
+    返回一维 uint8 数组 (ASCII), 可直接 f.write() 到以 'wb' 打开的文件, 需要 bytes 时调用 .tobytes()
+    """
+    chars = words_to_chars(x, fmt, width)
+    n, w = chars.shape
+    if n % lanes:
+        raise ValueError(f"数据个数 {n} 不是通道数 {lanes} 的整数倍")
+    out = np.empty((n // lanes, lanes, w + 1), dtype=np.uint8)
+    # 按 w 字节的 void 整体拷贝, 比逐字节赋值快
+    out[:, :, :w].view(f'V{w}')[...] = np.ascontiguousarray(chars).view(f'V{w}').reshape(-1, lanes, 1)
+    out[:, :, w] = ord(sep)
+    out[:, -1, w] = ord('\n')
+    return out.reshape(-1)
+
+
+# ==========================================
+# 2. 字符矩阵 -> 数组
+# ==========================================
+
+def _rep(byte, dtype):
+    """把一个字节复制到 dtype 的每个字节上 (SWAR 常数)"""
+    n = np.dtype(dtype).itemsize
+    return dtype(int.from_bytes(bytes([byte]) * n, 'little'))
+
+
+def _contiguous_digits(chars, full):
+    """(..., width) 字符 -> 连续的 (N, full) 字符矩阵, 左侧以 '0' 补齐到 full 位"""
+    width = chars.shape[-1]
+    if width == full:
+        if chars.strides[-1] != 1:
+            chars = np.ascontiguousarray(chars)
+        return np.ascontiguousarray(chars.view(f'V{full}')).view(np.uint8).reshape(-1, full)
+    buf = np.full((chars.size // width, full), _ASCII_0, dtype=np.uint8)
+    buf[:, full - width:] = chars.reshape(-1, width)
+    return buf
+
+
+def _decode_bin(chars):
+    width = chars.shape[-1]
+    if not 0 < width <= 32:
+        raise ValueError(f"二进制宽度必须在 1..32 之间: {width}")
+    full = 16 if width <= 16 else 32
+    buf = _contiguous_digits(chars, full)
+    # 每 8 个字符作为一个 uint64, 异或 '0' 后每个字节为 0/1
+    bits = buf.view(np.uint64) ^ _rep(_ASCII_0, np.uint64)
+    bits8 = bits.view(np.uint8).reshape(-1, full)
+    bad = None
+    if bits8.size and bits8.max() > 1:
+        bad = (bits8 > 1).any(axis=1)
+    packed = np.packbits(bits8.reshape(-1))
+    words = packed.view('>u2' if full == 16 else '>u4').astype(np.uint32)
+    return words, bad
+
+
+def _decode_hex(chars):
+    width = chars.shape[-1]
+    if not 0 < width <= 8:
+        raise ValueError(f"十六进制宽度必须在 1..8 之间: {width}")
+    full = 4 if width <= 4 else 8
+    U = np.uint32 if full == 4 else np.uint64
+    v = _contiguous_digits(chars, full).view(U).ravel()
+    one, six = _rep(0x01, U), U(6)
+    # 每个字节独立换算: '0'-'9' -> 0-9, 'a'-'f'/'A'-'F' -> 10-15 (bit6 为字母标志)
+    nib = (v & _rep(0x0F, U)) + ((v >> six) & one) * U(9)
+    # 校验: 把 nib 重新编码成小写字符, 与原字符 (仅字母转小写) 比较
+    lower = v | ((v >> U(1)) & _rep(0x20, U))
+    enc = nib + _rep(0x30, U) + (((nib + _rep(0x06, U)) >> U(4)) & one) * U(0x27)
+    bad = (enc != lower) | ((nib & _rep(0xF0, U)) != 0)
+    bad = bad if bad.any() else None
+    # 相邻两个半字节合并为一个字节, 再把偶数字节收拢到低位
+    if full == 8:
+        t = ((nib << U(4)) + (nib >> U(8))) & U(0x00FF00FF00FF00FF)
+        t = (t | (t >> U(8))) & U(0x0000FFFF0000FFFF)
+        t = (t | (t >> U(16))) & U(0xFFFFFFFF)
+        words = t.astype(np.uint32).byteswap()
+    else:
+        t = ((nib << U(4)) + (nib >> U(8))) & U(0x00FF00FF)
+        t = (t | (t >> U(8))) & U(0xFFFF)
+        words = t.astype(np.uint16).byteswap().astype(np.uint32)
+    return words, bad
+
+
+def chars_to_words(chars, fmt='b', invalid=None):
+    """
+    chars: (..., width) 的 uint8 ASCII 数组 (可以是文本缓冲区上的跨步视图)
+    invalid: None 时遇到非法字符 (如仿真中的 x/z) 抛出 ValueError, 否则该字以 invalid 代替
+    返回 chars.shape[:-1] 形状的 uint32 数组 (按原始位模式, 不做符号扩展)
+    """
+    chars = np.asarray(chars, dtype=np.uint8)
+    shape = chars.shape[:-1]
+    if fmt == 'b':
+        words, bad = _decode_bin(chars)
+    elif fmt == 'h':
+        words, bad = _decode_hex(chars)
+    else:
+        raise ValueError(f"未知的文本格式: {fmt}")
+    if bad is not None:
+        if invalid is None:
+            i = int(np.argmax(bad))
+            token = chars.reshape(-1, chars.shape[-1])[i].tobytes().decode(errors='replace')
+            raise ValueError(f"第 {i} 个字包含非法字符: {token}")
+        words[bad] = invalid
+    return words.reshape(shape)
+
+
+_TRAILING = (ord('\n'), ord('\r'), ord(' '), ord('\t'))
+_SEPARATORS = (ord(','), ord(' '), ord('\t'))
+
+
+def _first_newline(a):
+    """第一个 '\\n' 的位置, 没有时返回 -1"""
+    limit = 4096
+    while True:
+        hit = np.flatnonzero(a[:limit] == ord('\n'))
+        if hit.size:
+            return int(hit[0])
+        if limit >= a.size:
+            return -1
+        limit *= 4
+
+
+def parse_words(buf, fmt='b', width=None, invalid=None):
+    """
+    解析定宽文本 (每个字后面跟一个分隔符: ',' 或换行), 返回 (行数, 每行个数) 的 uint32 数组
+    buf: bytes / bytearray / mmap / uint8 数组, 允许 '\\r\\n' 换行, 最后一行可以没有换行, 末尾空行会被忽略
+    行尾换行前可以多一个分隔符 (如 $fwrite("%h ", ...) 逐个写出后再写 "\\n", 每行以空格结尾)
+    """
+    if width is None:
+        width = default_width(fmt)
+    a = buf if isinstance(buf, np.ndarray) else np.frombuffer(buf, dtype=np.uint8)
+    # 去掉文件末尾多余的空行/空白
+    end = a.size
+    while end and a[end - 1] in _TRAILING:
+        end -= 1
+    a = a[:end]
+    if a.size == 0:
+        return np.empty((0, 0), dtype=np.uint32)
+    nl = _first_newline(a)
+    if nl < 0:
+        nl = a.size
+    crlf = int(nl > 0 and a[nl - 1] == ord('\r'))
+    line = nl + 1
+    body = nl - crlf + 1                       # 行内有效字节, 行尾 '\r' 或 '\n' 当作最后一个分隔符
+    extra = body % (width + 1)
+    if extra and not (extra == 1 and nl - crlf > 0 and a[nl - crlf - 1] in _SEPARATORS):
+        raise ValueError("文本不是定宽格式 (字宽与每行长度不一致)")
+    lanes = body // (width + 1)
+    body = lanes * (width + 1)                 # 每行以分隔符结尾时, 该分隔符与换行一起跳过
+
+    n_full = a.size // line
+    rows = a[:n_full * line].reshape(n_full, line)
+    if n_full and np.any(rows[:, -1] != ord('\n')):
+        raise ValueError("文本不是定宽格式 (各行长度不一致)")
+    out = chars_to_words(rows[:, :body].reshape(n_full, lanes, width + 1)[:, :, :width], fmt, invalid)
+
+    rest = a[n_full * line:]
+    if rest.size:
+        # 最后一行没有换行符 (末尾的空白分隔符已随空行一起去掉, 逗号仍可能保留)
+        if rest.size == body and rest[-1] in _SEPARATORS:
+            rest = rest[:-1]
+        if rest.size != body - 1:
+            raise ValueError("文本不是定宽格式 (最后一行长度不一致)")
+        tail = np.append(rest, np.uint8(ord('\n'))).reshape(1, lanes, width + 1)[:, :, :width]
+        out = np.concatenate([out, chars_to_words(tail, fmt, invalid)])
+    return out
+
+
+# ==========================================
+# 3. 常用封装
+# ==========================================
+
+def words_to_float32(words):
+    """uint32 位模式 -> float32 (零拷贝)"""
+    return np.ascontiguousarray(words, dtype=np.uint32).view(np.float32)
+
+
+def words_to_int16(words):
+    """16 位补码 -> int16"""
+    return np.asarray(words).astype(np.uint16).view(np.int16)
+
+
+def float32_to_bin(x):
+    """float 数组 -> 32 位二进制字符串数组 (dtype 'S32')"""
+    return np.ascontiguousarray(words_to_chars(x, 'b')).view('S32').ravel()
+
+
+def float32_to_hex(x):
+    """float 数组 -> 8 位十六进制字符串数组 (dtype 'S8')"""
+    return np.ascontiguousarray(words_to_chars(x, 'h')).view('S8').ravel()
+
+
+def bin_to_float32(strs, invalid=None):
+    """32 位二进制字符串 (str/bytes 序列) -> float32 数组"""
+    a = np.asarray(strs, dtype='S32')
+    return words_to_float32(chars_to_words(a.view(np.uint8).reshape(-1, 32), 'b', invalid))
+
+
+def hex_to_float32(strs, invalid=None):
+    """8 位十六进制字符串 (str/bytes 序列) -> float32 数组"""
+    a = np.char.zfill(np.asarray(strs, dtype='S8'), 8)
+    return words_to_float32(chars_to_words(a.view(np.uint8).reshape(-1, 8), 'h', invalid))
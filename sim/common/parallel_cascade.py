@@ -0,0 +1,157 @@
+#分解级联的多核分片计算: 输入切成若干分片并行计算, 拼接结果与串行 dec_cascade 逐位一致
+#
+#拼接的依据 (与 equiv_filter 相同的取点关系): 第 l 级第 j 个输出对应输入位置 A_l + 2^l * j,
+#用到输入 x[A_l + 2^l*j - 7*(2^l - 1) .. A_l + 2^l*j], 其中 A_l = sum_k 2^(k-1) * t0_k
+#分片起点 c 取 2^levels (且不小于 16) 的整数倍时, 对 x[c:] 运行同样的级联, 各级的块边界和 L5~L7 的抽取相位
+#都与全局对齐, 分片内第 l 级第 m 个输出就是全局第 c/2^l + m 个输出 (分片开头的点只作为历史, 与 RTL 的 x_hist 相同)
+#因此分片 [c, c') 只需额外读入其后约 A_levels (约 7 * 2^7) 个输入 (即下一分片的预热前缀),
+#保留各级前 (c' - c) / 2^l 个输出即可; 最后一个分片保留全部输出
+#L1~L4 按块输出 (不足一块的尾部不输出), 额外读入的点数按各级实际输出点数确定, 见 shard_overlap
+#
+#线程池: numpy 的逐元素运算释放 GIL, 分片输入是原数组的切片 (不拷贝), 最后按级拼接一次
+#进程池: 分片数据和结果需要在进程间传递 (序列化), 适合线程扩展受 GIL 限制 (小分片、调用次数多) 的情况
+#
+#dec_parallel_stream 是与 dec_stream 接口相同的流式版本 (wavelet_model.DEC_BACKENDS 的 'parallel'):
+#输入块攒够 batch 点后整批并行计算, 批与批之间的拼接方式与分片相同 (批的起点对齐, 向后多读 overlap 点)
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
+
+from wavelet_model import h_dec, dec_cascade, dec_cascade_bands, dec_output_range
+
+LEVELS = 7
+# 流式后端每批的输入点数 (再切成 jobs x 4 个分片)
+PARALLEL_BATCH = 1 << 22
+
+
+def shard_align(levels=LEVELS):
+    """分片起点需要对齐的输入点数"""
+    return max(16, 1 << levels)
+
+
+def level_lengths(n, levels=LEVELS, phases=None):
+    """长度为 n 的输入经过级联后各级的输出点数"""
+    phases = phases or {}
+    res = []
+    for l in range(1, levels + 1):
+        n = dec_output_range(l, n, phases.get(l))[1]
+        res.append(n)
+    return res
+
+
+def shard_overlap(levels=LEVELS, phases=None):
+    """
+    分片末尾需要额外读入的输入点数 (shard_align 的整数倍)
+    从 A_levels 开始增加, 直到一个对齐长度的分片加上它后各级输出不少于 align / 2^l 点
+    (分片长度每增加 align, 各级输出恰好增加 align / 2^l 点, 因此对任意对齐长度都成立)
+    """
+    phases = phases or {}
+    align = shard_align(levels)
+    a = sum(dec_output_range(l, 0, phases.get(l))[0] << (l - 1) for l in range(1, levels + 1))
+    ov = -(-a // align) * align
+    while any(m < align >> l for l, m in enumerate(level_lengths(align + ov, levels, phases), 1)):
+        ov += align
+    return ov
+
+
+def plan_shards(n, jobs, shard=None, levels=LEVELS):
+    """
+    把 n 个输入点切成分片, 返回起点列表 [c_0=0, c_1, ..., n]
+    shard: 每片的输入点数 (按对齐向下取整), 默认每个进程/线程约 4 片, 使负载均衡
+    """
+    align = shard_align(levels)
+    if shard is None:
+        shard = n // max(4 * jobs, 1)
+    shard = max(shard // align * align, align)
+    starts = list(range(0, n, shard))
+    if len(starts) > 1 and n - starts[-1] < shard // 2:
+        starts.pop()            # 最后一片太短时并入前一片
+    return starts + [n]
+
+
+def _make_pool(pool, jobs):
+    if pool not in ('thread', 'process'):
+        raise ValueError(f"未知的 pool: {pool}")
+    return (ThreadPoolExecutor if pool == 'thread' else ProcessPoolExecutor)(max_workers=jobs)
+
+
+def _shard_task(task):
+    """计算一个分片, 返回各级 (以及细节系数) 输出的列表"""
+    x, h, g, levels, phases, dtype = task
+    if g is None:
+        return dec_cascade(x, h, levels, dtype=dtype, phases=phases)
+    a, d = dec_cascade_bands(x, h, g, levels, dtype=dtype, phases=phases)
+    return a + d
+
+
+def dec_cascade_parallel(data, h=h_dec, levels=LEVELS, phases=None, dtype=np.float64, g=None,
+                         jobs=None, shard=None, pool='thread', executor=None):
+    """
+    与 dec_cascade 结果逐位一致的并行版本, 返回 [a1, ..., a{levels}]
+    g 不为 None 时返回 ([a1, ...], [d1, ...]) (与 dec_cascade_bands 相同)
+    jobs: 线程/进程数 (默认 CPU 核数); shard: 每片输入点数; pool: 'thread' / 'process'
+    executor: 已创建的线程/进程池 (多次调用时复用), 为 None 时按 pool 临时创建
+    """
+    x = np.asarray(data)
+    n = len(x)
+    jobs = jobs or os.cpu_count() or 1
+    phases = phases or {}
+    overlap = shard_overlap(levels, phases)
+    starts = plan_shards(n, jobs, shard, levels)
+    # 读入范围已到达输入末尾的分片直接作为最后一片 (末尾不足的输出与串行结果相同)
+    k = next((k for k, c in enumerate(starts[1:], 1) if c + overlap >= n), len(starts) - 1)
+    starts = starts[:k] + [n]
+    n_shards = len(starts) - 1
+    if n_shards <= 1 or jobs <= 1:
+        out = _shard_task((x, h, g, levels, phases, dtype))
+        return out if g is None else (out[:levels], out[levels:])
+
+    tasks = [(x[c0:min(c1 + overlap, n)], h, g, levels, phases, dtype) for c0, c1 in zip(starts, starts[1:])]
+    if executor is not None:
+        parts = list(executor.map(_shard_task, tasks))
+    else:
+        with _make_pool(pool, jobs) as ex:
+            parts = list(ex.map(_shard_task, tasks))
+
+    # 前面各片只保留自己范围内的输出, 最后一片包含全部剩余输入, 保留全部输出
+    res = []
+    for k in range(len(parts[0])):
+        l = k % levels + 1
+        keep = [(c1 - c0) >> l for c0, c1 in zip(starts[:-1], starts[1:-1])]
+        for p, m in zip(parts, keep):
+            if len(p[k]) < m:
+                raise AssertionError(f"分片输出不足: 第 {l} 级需要 {m} 点, 只有 {len(p[k])} 点")
+        res.append(np.concatenate([p[k][:m] for p, m in zip(parts, keep)] + [parts[-1][k]]))
+    return res if g is None else (res[:levels], res[levels:])
+
+
+def dec_parallel_stream(chunks, h=h_dec, levels=LEVELS, phases=None, dtype=np.float64, g=None,
+                        jobs=None, shard=None, pool='thread', batch=PARALLEL_BATCH):
+    """
+    与 dec_stream 接口相同、结果逐位一致的并行后端: 每批产出 [a1段, ..., a{levels}段] (给出 g 时后接 d1~d{levels})
+    输入块攒够 batch + overlap 点后, 计算前 batch 点对应的输出 (batch 按 shard_align 对齐), 结束时计算剩余全部输入
+    各段的切分与 dec_stream 不同, 但首尾相接后与 dec_stream 的结果逐位相同
+    """
+    jobs = jobs or os.cpu_count() or 1
+    phases = phases or {}
+    align = shard_align(levels)
+    batch = max(batch // align * align, align)
+    overlap = shard_overlap(levels, phases)
+    kw = dict(h=h, levels=levels, phases=phases, dtype=dtype, g=g, jobs=jobs, shard=shard)
+
+    def run(x, ex, final):
+        out = dec_cascade_parallel(x, executor=ex, **kw)
+        out = out if g is None else out[0] + out[1]
+        if final:
+            return out
+        return [y[:batch >> (k % levels + 1)] for k, y in enumerate(out)]
+
+    buf = np.empty(0, dtype=dtype)
+    with _make_pool(pool, jobs) as ex:
+        for x in chunks:
+            buf = np.concatenate((buf, np.asarray(x, dtype=dtype).ravel()))
+            while len(buf) >= batch + overlap:
+                yield run(buf[:batch + overlap], ex, False)
+                buf = buf[batch:]
+        yield run(buf, ex, True)
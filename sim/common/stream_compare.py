@@ -0,0 +1,232 @@
+#分块流式比较: golden 模型输出与 Verilog 输出逐块对比, 内存占用与数据总长度无关
+#两路输入都是生成器 (每次给出任意长度的一段), 内部只缓存尚未配对的部分
+#统计: 最大绝对误差及其位置, MSE, FP32 ULP 距离直方图, 前 N 个不匹配点的记录
+#可设置不匹配预算, 用完后提前停止 (不再读取后面的数据)
+import numpy as np
+
+# ULP 直方图的桶数: 第 k 个桶统计 bit_length(ulp) == k 的点,
+# 即 k=0: 完全一致, k=1: 1 ulp, k=2: 2~3 ulp, k=3: 4~7 ulp ... 最后一桶为 NaN/Inf 不一致
+ULP_BINS = 34
+ULP_NAN_BIN = ULP_BINS - 1
+
+
+def float32_ordered(x):
+    """float32 位模式映射为单调递增的整数, 两个数之差即为 ULP 距离"""
+    i = np.asarray(x, dtype=np.float32).view(np.int32).astype(np.int64)
+    return np.where(i < 0, -(i & 0x7FFFFFFF), i)
+
+
+def ulp_distance(golden, dut):
+    """golden 按 RNE 转为 float32 后与 dut (float32) 之间的 ULP 距离 (int64)"""
+    with np.errstate(over='ignore', invalid='ignore'):
+        g = np.asarray(golden).astype(np.float32)
+    return np.abs(float32_ordered(g) - float32_ordered(dut))
+
+
+class StreamCompare:
+    """
+    累积比较统计
+    atol: 绝对误差阈值, 超过即为不匹配; None 表示不检查绝对误差 (只按 max_ulp 判断, 用于 float32 golden)
+    max_ulp: 不为 None 时, ULP 距离超过它也算不匹配
+    n_records: 保留前多少个不匹配点的详细记录
+    budget: 不匹配点数达到 budget 后停止 (stopped=True), None 表示比较到底
+    """
+
+    def __init__(self, atol=1e-4, max_ulp=None, n_records=20, budget=None):
+        self.atol = atol
+        self.max_ulp = max_ulp
+        self.n_records = n_records
+        self.budget = budget
+
+        self.count = 0
+        self.mismatches = 0
+        self.max_err = 0.0
+        self.max_err_index = -1
+        self.sum_sq = 0.0
+        self.ulp_hist = np.zeros(ULP_BINS, dtype=np.int64)
+        self.records = []
+        self.stopped = False
+
+        self._pending = {'golden': [], 'dut': []}
+        self._n_pending = {'golden': 0, 'dut': 0}
+
+    # ---------- 输入 ----------
+
+    @property
+    def pending_golden(self):
+        return self._n_pending['golden']
+
+    @property
+    def pending_dut(self):
+        return self._n_pending['dut']
+
+    def _push(self, key, x):
+        x = np.asarray(x).ravel()
+        if x.size:
+            self._pending[key].append(x)
+            self._n_pending[key] += x.size
+
+    def _take(self, key, n):
+        parts = self._pending[key]
+        buf = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        rest = buf[n:]
+        self._pending[key] = [rest] if rest.size else []
+        self._n_pending[key] = rest.size
+        return buf[:n]
+
+    def feed(self, golden=None, dut=None):
+        """
+        送入任意长度的 golden 段和/或 dut 段, 两边都到齐的部分立即比较
+        返回 False 表示已达到不匹配预算, 调用方应停止读取
+        """
+        if self.stopped:
+            return False
+        if golden is not None:
+            self._push('golden', golden)
+        if dut is not None:
+            self._push('dut', dut)
+        n = min(self.pending_golden, self.pending_dut)
+        if n:
+            self._compare(self._take('golden', n), self._take('dut', n))
+        return not self.stopped
+
+    # ---------- 比较 ----------
+
+    def _compare(self, g, d):
+        g = g.astype(np.float64)
+        d32 = d.astype(np.float32)
+        d = d32.astype(np.float64)
+        if self.budget is not None and self.mismatches >= self.budget:
+            self.stopped = True
+            return
+
+        with np.errstate(invalid='ignore', over='ignore'):
+            err = np.abs(g - d)
+        nan_g, nan_d = np.isnan(g), np.isnan(d)
+        bad_nan = nan_g != nan_d                    # 只有一边是 NaN
+        both_nan = nan_g & nan_d
+        err = np.where(both_nan | (g == d), 0.0, err)   # 相同的 ±Inf 相减为 NaN, 按一致处理
+        ulp = ulp_distance(g, d32)
+
+        finite = np.isfinite(err)
+        special = bad_nan | ((np.isinf(g) | np.isinf(d)) & (g != d))   # NaN/Inf 不一致
+        mis = special.copy()
+        if self.atol is not None:
+            mis |= err > self.atol
+        if self.max_ulp is not None:
+            mis |= ~both_nan & (ulp > self.max_ulp)
+
+        # 达到预算时只统计到预算用完的那个点
+        n = len(g)
+        if self.budget is not None:
+            left = self.budget - self.mismatches
+            cum = np.cumsum(mis)
+            if cum.size and cum[-1] >= left:
+                n = int(np.searchsorted(cum, left)) + 1
+                self.stopped = True
+                g, d, err, ulp, mis, special, finite, both_nan = (
+                    a[:n] for a in (g, d, err, ulp, mis, special, finite, both_nan))
+
+        if n == 0:
+            return
+        ok = finite & ~special
+        e = np.where(ok, err, 0.0)
+        i = int(np.argmax(e))
+        if e[i] > self.max_err or self.max_err_index < 0:
+            self.max_err = float(e[i])
+            self.max_err_index = self.count + i
+        self.sum_sq += float(np.dot(e, e))
+
+        bins = np.frexp(np.where(ok, ulp, 0).astype(np.float64))[1]
+        bins = np.where(special, ULP_NAN_BIN, np.minimum(bins, ULP_NAN_BIN - 1))
+        bins = np.where(both_nan, 0, bins)
+        self.ulp_hist += np.bincount(bins, minlength=ULP_BINS)
+
+        idx = np.flatnonzero(mis)
+        if len(self.records) < self.n_records:
+            for k in idx[:self.n_records - len(self.records)]:
+                self.records.append((self.count + int(k), float(g[k]), float(d[k]), float(err[k]), int(ulp[k])))
+        self.mismatches += len(idx)
+        self.count += n
+
+    # ---------- 结果 ----------
+
+    @property
+    def mse(self):
+        return self.sum_sq / self.count if self.count else 0.0
+
+    @property
+    def passed(self):
+        return self.count > 0 and self.mismatches == 0
+
+    def summary(self):
+        last = int(np.flatnonzero(self.ulp_hist)[-1]) + 1 if self.ulp_hist.any() else 0
+        return {
+            'count': self.count,
+            'mismatches': self.mismatches,
+            'max_abs_err': self.max_err,
+            'max_err_index': self.max_err_index,
+            'mse': self.mse,
+            'ulp_hist': self.ulp_hist[:last].tolist(),
+            'records': list(self.records),
+            'stopped': self.stopped,
+            'unmatched_golden': self.pending_golden,
+            'unmatched_dut': self.pending_dut,
+        }
+
+    def _criteria(self):
+        items = [] if self.atol is None else [f"> {self.atol:g}"]
+        if self.max_ulp is not None:
+            items.append(f"> {self.max_ulp} ulp")
+        return " or ".join(items) or "NaN/Inf only"
+
+    def report(self, name=''):
+        """文本报告, 格式与各验证脚本的打印保持一致"""
+        title = f"Validation Results{' (' + name + ')' if name else ''}:"
+        lines = ["-" * 40, title,
+                 f"Compared Samples: {self.count}",
+                 f"Max Absolute Error: {self.max_err:.8f} (at sample {self.max_err_index})",
+                 f"Mean Squared Error: {self.mse:.10f}",
+                 f"Mismatches ({self._criteria()}): {self.mismatches}"]
+        if self.stopped:
+            lines.append(f"⚠️ 不匹配点数达到预算 {self.budget}, 提前停止")
+        lines.append("ULP 距离分布:")
+        for k, c in enumerate(self.ulp_hist):
+            if not c:
+                continue
+            if k == ULP_NAN_BIN:
+                label = "NaN/Inf"
+            elif k == 0:
+                label = "0"
+            elif k == 1:
+                label = "1"
+            else:
+                label = f"{1 << (k - 1)}~{(1 << k) - 1}"
+            lines.append(f"  {label:>22} ulp: {c}")
+        if self.records:
+            lines.append(f"前 {len(self.records)} 个不匹配点:")
+            for idx, g, d, e, u in self.records:
+                lines.append(f"  Sample {idx}: Python={g:.6f}, Verilog={d:.6f}, Abs Error={e:.6e}, ULP={u}")
+        lines.append("-" * 40)
+        return "\n".join(lines)
+
+
+def compare_streams(golden_chunks, dut_chunks, **kw):
+    """
+    从两个生成器交替读取并比较, 哪一路缓存少就读哪一路, 任一路结束或预算用完即停止
+    关键字参数同 StreamCompare, 返回 StreamCompare 对象
+    """
+    cmp = StreamCompare(**kw)
+    golden_chunks, dut_chunks = iter(golden_chunks), iter(dut_chunks)
+    while not cmp.stopped:
+        if cmp.pending_golden <= cmp.pending_dut:
+            x = next(golden_chunks, None)
+            if x is None:
+                break
+            cmp.feed(golden=x)
+        else:
+            y = next(dut_chunks, None)
+            if y is None:
+                break
+            cmp.feed(dut=y)
+    return cmp
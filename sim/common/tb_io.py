@@ -0,0 +1,244 @@
+#testbench 定宽文本文件的快速读取
+#x_input_ieee754.txt / x_input_16bit.txt / aN_out_ieee754.txt / mult_out.txt 等文件每行若干个定宽字 (%b 或 %04x/%h),
+#以逗号或空格分隔。这里直接对内存映射的文件按固定步长取字符, 整块解码为 float32/int16 数组,
+#不再为每个样本创建 Python 字符串/浮点对象; 同时支持二进制 trace 文件 (见文件末尾)
+import os
+
+import numpy as np
+
+from ieee754_codec import default_width, format_words, parse_words, words_to_float32, words_to_int16
+
+# 分块解析时每块的行数
+CHUNK_ROWS = 1 << 16
+
+_SEPARATORS = b', \t\r\n'
+
+
+def open_tb_file(path):
+    """以只读内存映射打开文件, 返回 uint8 数组 (空文件返回空数组)"""
+    if os.path.getsize(path) == 0:
+        return np.empty(0, dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r')
+
+
+def detect_format(buf):
+    """
+    根据第一个字判断格式, 返回 (fmt, width)
+        32/16 个 '0'/'1' 字符 -> ('b', 32/16)
+        不超过 8 个十六进制字符 -> ('h', 字符数)
+    """
+    head = bytes(buf[:64])
+    end = len(head)
+    for c in _SEPARATORS:
+        i = head.find(bytes([c]))
+        if 0 <= i < end:
+            end = i
+    token = head[:end]
+    if len(token) in (16, 32) and set(token) <= set(b'01'):
+        return 'b', len(token)
+    if 0 < len(token) <= 8 and set(token.lower()) <= set(b'0123456789abcdef'):
+        return 'h', len(token)
+    raise ValueError(f"无法识别的数据格式: {token!r}")
+
+
+def _convert(words, fmt, width, dtype):
+    """按字宽把原始位模式转换为 float32 (32 位) 或 int16 (16 位)"""
+    if dtype == 'raw':
+        return words
+    bits = width if fmt == 'b' else 4 * width
+    if dtype is None:
+        dtype = {32: np.float32, 16: np.int16}.get(bits, np.uint32)
+    dtype = np.dtype(dtype)
+    if dtype == np.float32:
+        return words_to_float32(words)
+    if dtype == np.int16:
+        return words_to_int16(words)
+    return words.astype(dtype)
+
+
+def iter_tb_file(path, fmt=None, width=None, dtype=None, invalid=None, chunk_rows=CHUNK_ROWS):
+    """
+    分块读取, 每次返回 (行数, 每行个数) 的数组, 内存占用与文件长度无关
+    fmt/width: 为 None 时自动识别
+    dtype: None 时按字宽自动选择 float32/int16, 'raw' 返回 uint32 位模式
+    invalid: 非法字 (x/z 等) 的替代值, None 时抛出 ValueError
+    """
+    if is_trace_file(path):
+        data, _ = read_trace(path)
+        step = max(1, int(chunk_rows))
+        for start in range(0, len(data), step):
+            yield _convert_trace(data[start:start + step], dtype)
+        return
+    a = open_tb_file(path)
+    if a.size == 0:
+        return
+    if fmt is None:
+        fmt, width = detect_format(a)
+    nl = np.flatnonzero(a[:1 << 20] == ord('\n'))
+    line = int(nl[0]) + 1 if nl.size else a.size
+    step = line * max(1, int(chunk_rows))
+    for start in range(0, a.size, step):
+        words = parse_words(a[start:start + step], fmt, width, invalid)
+        if words.size == 0:
+            continue
+        yield _convert(words, fmt, width, dtype)
+
+
+def load_tb_file(path, fmt=None, width=None, dtype=None, invalid=None, chunk_rows=CHUNK_ROWS):
+    """
+    读取整个文件, 返回 (行数, 每行个数) 的数组, 参数同 iter_tb_file
+    例: load_tb_file('x_input_16bit.txt') -> int16, load_tb_file('a1_out_ieee754.txt') -> float32
+    二进制 trace 文件直接返回 memmap (不做拷贝)
+    """
+    if is_trace_file(path):
+        return _convert_trace(read_trace(path)[0], dtype)
+    chunks = list(iter_tb_file(path, fmt, width, dtype, invalid, chunk_rows))
+    if not chunks:
+        return np.empty((0, 0), dtype=np.uint32 if dtype == 'raw' else (dtype or np.float32))
+    if len(chunks) == 1:
+        return chunks[0]
+    return np.concatenate(chunks)
+
+
+# ==========================================
+# 二进制 trace 文件
+# ==========================================
+#文本 %b 每个 FP32 字占 33 字节, 二进制只需 4 字节, 且可以 np.memmap 零拷贝读取
+#格式 (全部小端):
+#   0  4s  魔数 b'WTRC'
+#   4  u2  版本号 (1)
+#   6  u2  数据类型代码 (TRACE_DTYPES)
+#   8  u4  每块的通道数 lanes (对应文本文件每行的字数)
+#   12 i4  分解层级 (0 为输入 x, N 为 aN, -1 未指定)
+#   16 u8  块数 (对应文本文件行数)
+#   24 8x  保留
+#   32 ... 负载, blocks x lanes 个小端字
+TRACE_MAGIC = b'WTRC'
+TRACE_VERSION = 1
+TRACE_HEADER = np.dtype([('magic', 'S4'), ('version', '<u2'), ('dtype', '<u2'), ('lanes', '<u4'),
+                         ('level', '<i4'), ('blocks', '<u8'), ('reserved', 'V8')])
+TRACE_DTYPES = {1: np.dtype('<f4'), 2: np.dtype('<i2'), 3: np.dtype('<u4')}
+_TRACE_CODES = {v.newbyteorder('='): k for k, v in TRACE_DTYPES.items()}
+
+
+def is_trace_file(path):
+    """根据魔数判断是否为二进制 trace 文件"""
+    with open(path, 'rb') as f:
+        return f.read(4) == TRACE_MAGIC
+
+
+def _convert_trace(data, dtype):
+    """
+    trace 数据的类型转换, None 保持原类型, 'raw' 返回 uint32 位模式
+    (与文本文件的 'raw' 相同: int16 取 16 位补码, 不做符号扩展, 如 -1 -> 0x0000ffff)
+    """
+    if dtype is None:
+        return data
+    if dtype == 'raw':
+        if data.dtype == np.float32:
+            return data.view(np.uint32)
+        if data.dtype == np.int16:
+            return data.view(np.uint16).astype(np.uint32)
+        return data.astype(np.uint32)
+    return data.astype(dtype)
+
+
+class TraceWriter:
+    """
+    按块追加写入二进制 trace, 关闭时回填块数, 可作为 with 语句使用
+    w = TraceWriter(path, lanes=16, dtype=np.int16, level=0); w.write(blocks); w.close()
+    """
+
+    def __init__(self, path, lanes, dtype=np.float32, level=-1):
+        dtype = np.dtype(dtype).newbyteorder('=')
+        if dtype not in _TRACE_CODES:
+            raise ValueError(f"trace 不支持的数据类型: {dtype}")
+        self.path = path
+        self.lanes = int(lanes)
+        self.dtype = dtype
+        self.level = int(level)
+        self.blocks = 0
+        self._f = open(path, 'wb')
+        self._f.write(self._header().tobytes())
+
+    def _header(self):
+        h = np.zeros((), dtype=TRACE_HEADER)
+        h['magic'] = TRACE_MAGIC
+        h['version'] = TRACE_VERSION
+        h['dtype'] = _TRACE_CODES[self.dtype]
+        h['lanes'] = self.lanes
+        h['level'] = self.level
+        h['blocks'] = self.blocks
+        return h
+
+    def write(self, data):
+        """data: 任意形状, 元素个数必须是 lanes 的整数倍"""
+        data = np.asarray(data)
+        if data.size % self.lanes:
+            raise ValueError(f"数据个数 {data.size} 不是通道数 {self.lanes} 的整数倍")
+        self._f.write(np.ascontiguousarray(data, dtype=self.dtype.newbyteorder('<')).tobytes())
+        self.blocks += data.size // self.lanes
+
+    def close(self):
+        if self._f is None:
+            return
+        self._f.seek(0)
+        self._f.write(self._header().tobytes())
+        self._f.close()
+        self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_trace(path, data, lanes=None, level=-1):
+    """一次写入整个数组, lanes 为 None 时取 data 的最后一维"""
+    data = np.asarray(data)
+    if lanes is None:
+        lanes = data.shape[-1] if data.ndim > 1 else 1
+    with TraceWriter(path, lanes, data.dtype, level) as w:
+        w.write(data)
+
+
+def read_trace(path):
+    """
+    内存映射读取 trace, 返回 (data, info)
+    data: (blocks, lanes) 的只读 memmap, info: {'lanes', 'blocks', 'level', 'dtype'}
+    """
+    h = np.fromfile(path, dtype=TRACE_HEADER, count=1)
+    if h.size == 0 or h['magic'][0] != TRACE_MAGIC:
+        raise ValueError(f"不是 trace 文件: {path}")
+    if h['version'][0] != TRACE_VERSION:
+        raise ValueError(f"不支持的 trace 版本: {h['version'][0]}")
+    code = int(h['dtype'][0])
+    if code not in TRACE_DTYPES:
+        raise ValueError(f"未知的 trace 数据类型代码: {code}")
+    dtype = TRACE_DTYPES[code]
+    info = {'lanes': int(h['lanes'][0]), 'blocks': int(h['blocks'][0]),
+            'level': int(h['level'][0]), 'dtype': dtype.newbyteorder('=')}
+    shape = (info['blocks'], info['lanes'])
+    if info['blocks'] == 0:
+        return np.empty(shape, dtype=dtype), info
+    data = np.memmap(path, dtype=dtype, mode='r', offset=TRACE_HEADER.itemsize, shape=shape)
+    return data, info
+
+
+def trace_to_text(src, dst, fmt='b', width=None, dtype=None, sep=',', chunk_rows=CHUNK_ROWS):
+    """
+    把 trace 转成 testbench 读取的定宽文本 (供 Verilog $fscanf), 每块一行
+    dtype: 编码前的类型转换, 例如 int16 的输入 trace 以 np.float32 写成 x_input_ieee754.txt
+    width: None 时按元素位宽取默认值 (int16 -> %b 16 位 / %04x, 其余 32 位)
+    """
+    data, info = read_trace(src)
+    bits = 8 * np.dtype(dtype or info['dtype']).itemsize
+    if width is None:
+        width = default_width(fmt, bits)
+    with open(dst, 'wb') as f:
+        for start in range(0, info['blocks'], chunk_rows):
+            block = data[start:start + chunk_rows]
+            if dtype is not None:
+                block = block.astype(dtype)
+            f.write(format_words(block, fmt, width, lanes=info['lanes'], sep=sep))
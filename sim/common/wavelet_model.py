@@ -0,0 +1,700 @@
+#sym4 小波分解/重构的 Python 黄金模型 (向量化版本)
+#所有 decompose_L*_verification.py 共用此模块，替代原先逐块 for 循环的 dec_L1~dec_L7
+#同时提供 reconstruct_L1~L7 以及 wavelet_baseline_removal_top 的参考模型
+#分解可同时给出细节 (高通) 系数 d1~d7: 与近似系数在同一次遍历中用同一个窗口视图计算 (见 decimate_by2_bands)
+#分解部分可选计算精度 (dtype): float64 为默认的 golden; float32 时每次乘法和每次加法后都按 float32 舍入,
+#加法树结构与 decompose_L*.v 相同, 级间也以 float32 传递, 可以对 Verilog 输出做逐位或 1 ULP 的比较
+import numpy as np
+
+# 模型版本号: 改动任何会影响输出数值的实现时加 1, 使 golden_cache 中的旧结果失效
+MODEL_VERSION = 1
+
+# ==========================================
+# 1. 滤波器系数
+# ==========================================
+
+# sym4 分解低通系数 (与 coef_params.vh 中 DEC_H0~DEC_H7 一致)
+h_dec = np.array([
+    -0.07576571478927333, -0.02963552764599851, 0.49761866763201545, 0.80373875180591614,
+    0.29785779560527736, -0.09921954357684722, -0.012603967262037833, 0.032223100604042759
+])
+
+# 重构系数: REC_H{i} = DEC_H{7-i} (与 generate_verilog_coeffs_fp32 写出的顺序一致)
+h_rec = h_dec[::-1].copy()
+
+# sym4 分解高通系数 (与 pywt 的 dec_hi 以及 coef_params.vh 中的 DEC_HI_0~DEC_HI_7 一致):
+# g[k] = (-1)^(k+1) * h[7-k]
+g_dec = h_dec[::-1] * np.where(np.arange(len(h_dec)) % 2, 1.0, -1.0)
+
+# ==========================================
+# 2. 各级参数
+# ==========================================
+# block: 每个有效周期输入的点数
+# first: 从第几个块开始输出 (前面的块只用于填充 7 点历史)
+# phase: L5~L7 每 2 个点输出 1 个点的相位初值 (与原 dec_L5~dec_L7 中的 phase 变量含义相同)
+#
+# 原模型中每个输出都是 y = sum(window[::-1] * h)，window 的最新一点为 x[t]，
+# 因此每级都可以统一写成 y[m] = sum_j h[j] * x[t0 + 2m - j]，只是 t0 不同:
+#   L1: x_hist = data[9:16],  从第1块开始  -> t0 = 16
+#   L2: x_hist = data[1:8],   从第1块开始  -> t0 = 8
+#   L3: x_hist = data[1:8],   从第2块开始  -> t0 = 8
+#   L4: x_hist = data[1:8],   从第4块开始  -> t0 = 8
+#   L5~L7: x_hist = data[0:7], 从 i=7 开始, phase 翻转后为 1 才输出 -> t0 = 7 + phase
+DEC_LEVELS = {
+    1: {'block': 16, 'first': 1},
+    2: {'block': 8,  'first': 1},
+    3: {'block': 4,  'first': 2},
+    4: {'block': 2,  'first': 4},
+    5: {'block': 1,  'first': 7, 'phase': 1},
+    6: {'block': 1,  'first': 7, 'phase': 0},
+    7: {'block': 1,  'first': 7, 'phase': 1},
+}
+
+# 分解模型可选的计算精度 (命令行 --model 的取值)
+GOLDEN_DTYPES = {'f64': np.float64, 'f32': np.float32}
+
+# 每次处理的输出点数，控制临时数组 (n×8) 的大小，使其停留在缓存中
+CHUNK_SIZE = 1 << 16
+
+# dec_segmented 每小段的输入点数 (各级都在缓存中完成后再读下一段)
+SEGMENT_SIZE = 1 << 14
+# dec_segmented 中各级攒够多少输入点才计算一次
+SEGMENT_MIN_BATCH = 1 << 14
+# rec_segmented 每小段的 a7 点数 (R1 输出为其 128 倍, 约 1 MB)
+REC_SEGMENT_SIZE = 1 << 10
+
+
+def dec_output_range(level, n, phase=None):
+    """
+    根据输入长度 n 计算某一级的第一个输出位置 t0 和输出点数 n_out
+    phase 仅对 L5~L7 有效，为 None 时使用 DEC_LEVELS 中的默认值
+    """
+    cfg = DEC_LEVELS[level]
+    block = cfg['block']
+    if block > 1:
+        t0 = cfg['first'] * block
+        n_out = (block // 2) * (n // block - cfg['first'])
+    else:
+        if phase is None:
+            phase = cfg['phase']
+        t0 = cfg['first'] + phase
+        n_out = (n - t0 + 1) // 2
+    return t0, max(n_out, 0)
+
+
+# ==========================================
+# 3. 共用的 2 倍抽取引擎
+# ==========================================
+
+def _fir_tree(win, h, out):
+    """
+    对 (n, 8) 的窗口做 8 抽头乘加，累加顺序与 np.sum(window[::-1] * h) 相同:
+    ((p0+p1)+(p2+p3)) + ((p4+p5)+(p6+p7))，其中 p_j = x[t-j] * h[j]
+    这也是 decompose_L*.v 中 sum0 -> sum1 -> dout 的加法树; win/h 为 float32 时每个乘积和每次相加都按 float32 舍入
+    """
+    p = win[:, ::-1] * h
+    s = p[:, 0::2] + p[:, 1::2]
+    s = s[:, 0::2] + s[:, 1::2]
+    np.add(s[:, 0], s[:, 1], out=out)
+
+
+def _dec_windows(x, taps, t0, n_out, chunk):
+    """按 chunk 分段给出 (m0, m1, 窗口), 窗口为步长 2 的 (m1-m0, taps) 视图 (不拷贝数据)"""
+    if t0 < taps - 1 or t0 + 2 * (n_out - 1) >= len(x):
+        raise ValueError(f"输出范围越界: t0={t0}, n_out={n_out}, len={len(x)}")
+    step = x.strides[0]
+    for m0 in range(0, n_out, chunk):
+        m1 = min(m0 + chunk, n_out)
+        start = t0 + 2 * m0 - (taps - 1)
+        yield m0, m1, np.lib.stride_tricks.as_strided(
+            x[start:], shape=(m1 - m0, taps), strides=(2 * step, step), writeable=False)
+
+
+def decimate_by2(data, h, t0, n_out, out=None, chunk=CHUNK_SIZE, dtype=np.float64):
+    """
+    2 倍抽取 FIR: y[m] = sum_j h[j] * data[t0 + 2m - j],  m = 0 .. n_out-1
+    使用步长为 2 的窗口视图 (不拷贝数据)，按 chunk 分段写入预分配的 out
+    dtype: 计算精度, 输入和系数先转换 (舍入) 到该精度
+    """
+    x = np.ascontiguousarray(data, dtype=dtype)
+    h = np.asarray(h, dtype=dtype)
+    if out is None:
+        out = np.empty(n_out, dtype=dtype)
+    if n_out <= 0:
+        return out
+    for m0, m1, win in _dec_windows(x, len(h), t0, n_out, chunk):
+        _fir_tree(win, h, out[m0:m1])
+    return out
+
+
+def decimate_by2_bands(data, h, g, t0, n_out, chunk=CHUNK_SIZE, dtype=np.float64):
+    """
+    低通 h / 高通 g 两个频带的 2 倍抽取, 返回 (a, d), 两者与分别调用 decimate_by2 的结果逐位一致
+    两个频带在同一个窗口段上连续计算, 输入只转换和分段一次, 窗口段在缓存中时完成两次乘加
+    """
+    x = np.ascontiguousarray(data, dtype=dtype)
+    h = np.asarray(h, dtype=dtype)
+    g = np.asarray(g, dtype=dtype)
+    a = np.empty(max(n_out, 0), dtype=dtype)
+    d = np.empty(max(n_out, 0), dtype=dtype)
+    if n_out <= 0:
+        return a, d
+    for m0, m1, win in _dec_windows(x, len(h), t0, n_out, chunk):
+        _fir_tree(win, h, a[m0:m1])
+        _fir_tree(win, g, d[m0:m1])
+    return a, d
+
+
+def dec_level(data, h, level, phase=None, dtype=np.float64):
+    """第 level 级分解，一次向量化调用"""
+    t0, n_out = dec_output_range(level, len(data), phase)
+    return decimate_by2(data, h, t0, n_out, dtype=dtype)
+
+
+def dec_level_bands(data, h, g, level, phase=None, dtype=np.float64):
+    """第 level 级分解, 同时返回近似和细节系数 (a, d), 取点位置相同"""
+    t0, n_out = dec_output_range(level, len(data), phase)
+    return decimate_by2_bands(data, h, g, t0, n_out, dtype=dtype)
+
+
+# ==========================================
+# 4. 各级模型 (接口与原 dec_L1~dec_L7 保持一致)
+# ==========================================
+
+def dec_L1(data, h):
+    return dec_level(data, h, 1)
+
+def dec_L2(data, h):
+    return dec_level(data, h, 2)
+
+def dec_L3(data, h):
+    return dec_level(data, h, 3)
+
+def dec_L4(data, h):
+    return dec_level(data, h, 4)
+
+def dec_L5(data, h, phase=DEC_LEVELS[5]['phase']):
+    return dec_level(data, h, 5, phase)
+
+def dec_L6(data, h, phase=DEC_LEVELS[6]['phase']):
+    return dec_level(data, h, 6, phase)
+
+def dec_L7(data, h, phase=DEC_LEVELS[7]['phase']):
+    return dec_level(data, h, 7, phase)
+
+
+def dec_cascade(data, h=h_dec, levels=7, dtype=np.float64, phases=None):
+    """
+    依次计算 a1 ~ a{levels}，返回列表 [a1, a2, ...]
+    dtype=np.float32 时每级输出为 float32, 直接作为下一级的输入 (与硬件级间的 FP32 数据相同)
+    phases: {level: phase}, 覆盖 L5~L7 的默认相位
+    """
+    phases = phases or {}
+    res = []
+    x = data
+    for level in range(1, levels + 1):
+        x = dec_level(x, h, level, phases.get(level), dtype=dtype)
+        res.append(x)
+    return res
+
+
+def dec_cascade_bands(data, h=h_dec, g=g_dec, levels=7, dtype=np.float64, phases=None):
+    """
+    依次计算各级近似与细节系数, 返回 ([a1, ..., a{levels}], [d1, ..., d{levels}])
+    d{l} 由 a{l-1} (d1 由输入) 与 a{l} 在同一次遍历中得到; a 与 dec_cascade 逐位一致
+    """
+    phases = phases or {}
+    approx, detail = [], []
+    x = data
+    for level in range(1, levels + 1):
+        x, d = dec_level_bands(x, h, g, level, phases.get(level), dtype=dtype)
+        approx.append(x)
+        detail.append(d)
+    return approx, detail
+
+
+# ==========================================
+# 5. 重构模型 (reconstruct_L1 ~ reconstruct_L7)
+# ==========================================
+# 每个输入点 a[n] 产生一对输出 (偶/奇)，与 RTL 中 mult_even_s1 / mult_odd_s1 相同:
+#   r[2m]   = a[n]*REC_H0 + a[n-1]*REC_H2 + a[n-2]*REC_H4 + a[n-3]*REC_H6
+#   r[2m+1] = a[n]*REC_H1 + a[n-1]*REC_H3 + a[n-2]*REC_H5 + a[n-3]*REC_H7
+# 其中 n = block*first + m。RTL 在 has_data 拉高 (3 个历史点已就绪) 之前不输出:
+#   R7/R6/R5/R4: 每周期 1 个输入，前 3 个输入只填历史
+#   R3: 每周期 2 个输入，跳过前 2 个块;  R2: 4 个输入，跳过第 0 块;  R1: 8 个输入，跳过第 0 块
+REC_LEVELS = {
+    7: {'block': 1, 'first': 3},
+    6: {'block': 1, 'first': 3},
+    5: {'block': 1, 'first': 3},
+    4: {'block': 1, 'first': 3},
+    3: {'block': 2, 'first': 2},
+    2: {'block': 4, 'first': 1},
+    1: {'block': 8, 'first': 1},
+}
+
+
+def rec_input_range(level, n):
+    """根据输入长度 n 计算某一级重构的第一个输入位置 n0 和参与计算的输入点数"""
+    cfg = REC_LEVELS[level]
+    block = cfg['block']
+    n0 = cfg['first'] * block
+    n_in = (n // block) * block - n0
+    return n0, max(n_in, 0)
+
+
+def upsample_by2(data, g, n0, n_in, out=None, chunk=CHUNK_SIZE):
+    """
+    2 倍插值 FIR: out[2m+e] = sum_k g[2k+e] * data[n0 + m - k],  m = 0 .. n_in-1, e = 0/1
+    等价于先插零上采样再与 g 卷积，只计算非零项
+    """
+    x = np.ascontiguousarray(data, dtype=np.float64)
+    g = np.asarray(g, dtype=np.float64)
+    taps = len(g) // 2
+    if out is None:
+        out = np.empty(2 * n_in, dtype=np.float64)
+    if n_in <= 0:
+        return out
+    if n0 < taps - 1 or n0 + n_in > len(x):
+        raise ValueError(f"输入范围越界: n0={n0}, n_in={n_in}, len={len(x)}")
+
+    pair = out.reshape(n_in, 2)
+    step = x.strides[0]
+    for m0 in range(0, n_in, chunk):
+        m1 = min(m0 + chunk, n_in)
+        start = n0 + m0 - (taps - 1)
+        win = np.lib.stride_tricks.as_strided(
+            x[start:], shape=(m1 - m0, taps), strides=(step, step), writeable=False)
+        for e in range(2):
+            p = win[:, ::-1] * g[e::2]
+            np.add(p[:, 0] + p[:, 1], p[:, 2] + p[:, 3], out=pair[m0:m1, e])
+    return out
+
+
+def rec_level(data, g, level):
+    """第 level 级重构，一次向量化调用"""
+    n0, n_in = rec_input_range(level, len(data))
+    return upsample_by2(data, g, n0, n_in)
+
+
+def rec_L1(data, g):
+    return rec_level(data, g, 1)
+
+def rec_L2(data, g):
+    return rec_level(data, g, 2)
+
+def rec_L3(data, g):
+    return rec_level(data, g, 3)
+
+def rec_L4(data, g):
+    return rec_level(data, g, 4)
+
+def rec_L5(data, g):
+    return rec_level(data, g, 5)
+
+def rec_L6(data, g):
+    return rec_level(data, g, 6)
+
+def rec_L7(data, g):
+    return rec_level(data, g, 7)
+
+
+def rec_cascade(a7, g=h_rec, levels=7):
+    """
+    从 a{levels} 依次重构到 baseline (浮点)，返回列表 [r{levels-1}, ..., r1, baseline]
+    """
+    res = []
+    x = a7
+    for level in range(levels, 0, -1):
+        x = rec_level(x, g, level)
+        res.append(x)
+    return res
+
+
+# ==========================================
+# 6. 分块流式级联 (内存与数据总长度无关)
+# ==========================================
+
+class _DecStage:
+    """
+    一级分解的流式状态: 只保留尚未消费的输入 (7 点历史 + 不足一个块的尾巴)
+    g 不为 None 时同时计算细节系数, 最近一次 push 的细节段保存在 self.detail
+    """
+
+    def __init__(self, level, h, phase=None, dtype=np.float64, g=None):
+        self.block = DEC_LEVELS[level]['block']
+        self.h = h
+        self.g = g
+        self.detail = None
+        self.dtype = dtype
+        self.t_next, _ = dec_output_range(level, 0, phase)
+        self.base = 0
+        self.buf = np.empty(0, dtype=dtype)
+
+    def push(self, x):
+        buf = np.concatenate((self.buf, np.asarray(x, dtype=self.dtype)))
+        n_avail = (self.base + len(buf)) // self.block * self.block
+        n_out = max((n_avail - self.t_next + 1) // 2, 0)
+        if self.g is None:
+            y = decimate_by2(buf, self.h, self.t_next - self.base, n_out, dtype=self.dtype)
+        else:
+            y, self.detail = decimate_by2_bands(buf, self.h, self.g, self.t_next - self.base, n_out,
+                                                dtype=self.dtype)
+        self.t_next += 2 * n_out
+        keep = min(self.t_next - (len(self.h) - 1), self.base + len(buf))
+        self.buf = buf[keep - self.base:]
+        self.base = keep
+        return y
+
+
+class _RecStage:
+    """一级重构的流式状态: 保留 3 点历史 + 不足一个块的尾巴"""
+
+    def __init__(self, level, g):
+        self.block = REC_LEVELS[level]['block']
+        self.g = g
+        self.n_next = self.block * REC_LEVELS[level]['first']
+        self.base = 0
+        self.buf = np.empty(0)
+
+    def push(self, x):
+        buf = np.concatenate((self.buf, x))
+        n_avail = (self.base + len(buf)) // self.block * self.block
+        n_in = max(n_avail - self.n_next, 0)
+        y = upsample_by2(buf, self.g, self.n_next - self.base, n_in)
+        self.n_next += n_in
+        keep = min(self.n_next - (len(self.g) // 2 - 1), self.base + len(buf))
+        self.buf = buf[keep - self.base:]
+        self.base = keep
+        return y
+
+
+def dec_stream(chunks, h=h_dec, levels=7, phases=None, dtype=np.float64, g=None):
+    """
+    对输入块序列逐块运行 L1~L{levels} 分解, 每个输入块产出 [a1段, ..., a{levels}段]
+    各段首尾相接后与 dec_cascade 的结果逐位一致
+    phases: {level: phase}, 覆盖 L5~L7 的默认相位
+    dtype: 计算精度 (见 GOLDEN_DTYPES)
+    g: 高通系数 (如 g_dec), 给出时每块产出 [a1段, ..., a{levels}段, d1段, ..., d{levels}段]
+    """
+    phases = phases or {}
+    dec = [_DecStage(level, h, phases.get(level), dtype, g) for level in range(1, levels + 1)]
+    for x in chunks:
+        y = np.asarray(x, dtype=dtype).ravel()
+        out = []
+        for stage in dec:
+            y = stage.push(y)
+            out.append(y)
+        if g is not None:
+            out += [stage.detail for stage in dec]
+        yield out
+
+
+def _fir_cols(x, h, t0, n_out, out, tmp):
+    """
+    与 _fir_tree 逐位相同的 8 抽头乘加, 按抽头计算: p_j = x[t0 - j + 2m] * h[j] 为步长 2 的一维向量,
+    再按 ((p0+p1)+(p2+p3)) + ((p4+p5)+(p6+p7)) 原地相加; tmp 为 (taps, >= n_out) 的预分配临时数组
+    每个临时向量都要被读写多次, 只有在数据停留在缓存中 (dec_segmented 的小段) 时才比 _fir_tree 快
+    """
+    p = tmp[:, :n_out]
+    for j in range(len(h)):
+        np.multiply(x[t0 - j:t0 - j + 2 * n_out - 1:2], h[j], out=p[j])
+    while len(p) > 2:
+        np.add(p[0::2], p[1::2], out=p[:len(p) // 2])
+        p = p[:len(p) // 2]
+    np.add(p[0], p[1], out=out)
+
+
+class _SegStage:
+    """
+    dec_segmented 的一级: 预分配的输入缓冲区, 开头保留上一段留下的历史 (7 点 + 不足一个块的尾巴),
+    与 RTL 中的 x_hist 相同; 每段输入拷入历史之后, 输出直接写入调用方给出的数组, 不做拼接
+    """
+
+    def __init__(self, level, h, phase=None, dtype=np.float64, capacity=SEGMENT_SIZE, g=None):
+        self.block = DEC_LEVELS[level]['block']
+        self.h = np.asarray(h, dtype=dtype)
+        self.g = None if g is None else np.asarray(g, dtype=dtype)
+        self.dtype = dtype
+        self.t_next, _ = dec_output_range(level, 0, phase)
+        self.base = 0
+        self.n = 0
+        self.buf = np.empty(capacity + len(h) + self.block, dtype=dtype)
+        self.tmp = np.empty((len(h), len(self.buf) // 2 + 1), dtype=dtype)
+
+    def push(self, x, out, min_batch=0, detail=None):
+        """
+        送入一段输入, 输出写入 out 的开头 (g 不为 None 时细节系数写入 detail 的开头), 返回输出点数
+        缓冲区中的点数不足 min_batch 时只缓存不计算 (减少深层级别的小调用次数)
+        """
+        k = len(x)
+        if self.n + k > len(self.buf):
+            self.buf = np.concatenate((self.buf[:self.n], np.empty(k, dtype=self.dtype)))
+            self.tmp = np.empty((len(self.h), len(self.buf) // 2 + 1), dtype=self.dtype)
+        self.buf[self.n:self.n + k] = x
+        self.n += k
+        if self.n < min_batch:
+            return 0
+        n_avail = (self.base + self.n) // self.block * self.block
+        n_out = max((n_avail - self.t_next + 1) // 2, 0)
+        if n_out > 0:
+            _fir_cols(self.buf, self.h, self.t_next - self.base, n_out, out[:n_out], self.tmp)
+            if self.g is not None:
+                _fir_cols(self.buf, self.g, self.t_next - self.base, n_out, detail[:n_out], self.tmp)
+        self.t_next += 2 * n_out
+        keep = min(self.t_next - (len(self.h) - 1), self.base + self.n) - self.base
+        rest = self.n - keep
+        self.buf[:rest] = self.buf[keep:self.n]
+        self.n, self.base = rest, self.base + keep
+        return n_out
+
+
+def dec_segmented(chunks, h=h_dec, levels=7, phases=None, dtype=np.float64, g=None, segment=SEGMENT_SIZE,
+                  min_batch=SEGMENT_MIN_BATCH):
+    """
+    与 dec_stream 接口相同、结果逐位一致的分段后端 (每个输入块产出 [a1段, ..., a{levels}段], 给出 g 时后接 d1~d{levels})
+    每个输入块再切成 segment 点的小段, 每一小段连续通过 L1~L{levels} 后再处理下一小段:
+    各级的输入/输出和临时数组都只有 segment 量级, 一直停留在 L2/L3 缓存中,
+    级间只传递缓冲区开头的少量历史点, 而不是让每一级各自扫过整块数据;
+    乘加按抽头拆成一维向量运算 (_fir_cols), 临时向量在缓存中反复读写
+    segment: 每小段的输入点数, 按缓存大小调整 (L1 的临时数组约 segment * 4 * 8 字节)
+    min_batch: 后面的级别攒够这么多输入点再计算, 避免 L5~L7 每段只有几个点时的调用开销
+    """
+    phases = phases or {}
+    taps = len(h)
+    stages = [_SegStage(level, h, phases.get(level), dtype, (segment >> (level - 1)) + min_batch, g)
+              for level in range(1, levels + 1)]
+    for x in chunks:
+        x = np.asarray(x, dtype=dtype).ravel()
+        # 每级输出点数的上界 (输入加上缓冲区中的历史)
+        outs, bound = [], len(x)
+        for stage in stages:
+            bound = (bound + taps + stage.block) // 2 + 1
+            outs.append(np.empty(bound, dtype=dtype))
+        details = [np.empty(len(o), dtype=dtype) for o in outs] if g is not None else [None] * levels
+        pos = [0] * levels
+        for s0 in range(0, len(x) + 1, segment):
+            # 最后一轮 (空输入) 把各级缓存的数据全部算完, 使每个输入块的输出与 dec_stream 相同
+            last = s0 + segment > len(x)
+            y = x[s0:s0 + segment]
+            for i, stage in enumerate(stages):
+                d = None if details[i] is None else details[i][pos[i]:]
+                k = stage.push(y, outs[i][pos[i]:], 0 if last else min_batch, d)
+                y = outs[i][pos[i]:pos[i] + k]
+                pos[i] += k
+        out = [o[:p] for o, p in zip(outs, pos)]
+        if g is not None:
+            out += [d[:p] for d, p in zip(details, pos)]
+        yield out
+
+
+def dec_parallel(chunks, h=h_dec, levels=7, phases=None, dtype=np.float64, g=None, **kw):
+    """多线程/多进程分片计算的后端, 见 parallel_cascade.dec_parallel_stream (jobs, shard, pool, batch 通过 kw 传入)"""
+    # parallel_cascade 依赖本模块, 只在这里导入
+    from parallel_cascade import dec_parallel_stream
+    yield from dec_parallel_stream(chunks, h, levels, phases, dtype, g, **kw)
+
+
+def _up_cols(x, g, n0, n_in, out, tmp):
+    """
+    与 upsample_by2 逐位相同的插值乘加, 按抽头计算: p_j = x[n0 - j + m] * g[2j + e], 再按 (p0+p1) + (p2+p3) 相加,
+    偶/奇结果分别写入 out[0::2] / out[1::2]; tmp 为 (taps/2, >= n_in) 的预分配临时数组 (见 _fir_cols)
+    """
+    p = tmp[:, :n_in]
+    for e in range(2):
+        for j in range(len(p)):
+            np.multiply(x[n0 - j:n0 - j + n_in], g[2 * j + e], out=p[j])
+        np.add(p[0], p[1], out=p[0])
+        np.add(p[2], p[3], out=p[2])
+        np.add(p[0], p[2], out=out[e::2])
+
+
+class _SegRecStage:
+    """rec_segmented 的一级: 与 _SegStage 相同的预分配缓冲区, 开头保留 3 点历史 + 不足一个块的尾巴 (见 _RecStage)"""
+
+    def __init__(self, level, g, capacity=REC_SEGMENT_SIZE):
+        self.block = REC_LEVELS[level]['block']
+        self.g = np.asarray(g, dtype=np.float64)
+        self.n_next = self.block * REC_LEVELS[level]['first']
+        self.base = 0
+        self.n = 0
+        self.buf = np.empty(capacity + len(g) + self.block)
+        self.tmp = np.empty((len(g) // 2, len(self.buf)))
+
+    def push(self, x, out):
+        """送入一段输入, 输出写入 out 的开头, 返回输出点数"""
+        k = len(x)
+        if self.n + k > len(self.buf):
+            self.buf = np.concatenate((self.buf[:self.n], np.empty(k)))
+            self.tmp = np.empty((len(self.g) // 2, len(self.buf)))
+        self.buf[self.n:self.n + k] = x
+        self.n += k
+        n_avail = (self.base + self.n) // self.block * self.block
+        n_in = max(n_avail - self.n_next, 0)
+        if n_in > 0:
+            _up_cols(self.buf, self.g, self.n_next - self.base, n_in, out[:2 * n_in], self.tmp)
+        self.n_next += n_in
+        keep = min(self.n_next - (len(self.g) // 2 - 1), self.base + self.n) - self.base
+        rest = self.n - keep
+        self.buf[:rest] = self.buf[keep:self.n]
+        self.n, self.base = rest, self.base + keep
+        return 2 * n_in
+
+
+def rec_segmented(chunks, g=h_rec, levels=7, segment=REC_SEGMENT_SIZE):
+    """
+    重构的分段后端: 对 a{levels} 的块序列逐块运行 R{levels}~R1, 每个输入块产出 [r{levels-1}段, ..., r1段, baseline段]
+    各段首尾相接后与 rec_cascade 的结果逐位一致
+    与 dec_segmented 相同, 每个输入块再切成 segment 点的小段连续通过各级, R1 的输出 (segment * 2^levels 点)
+    和各级临时数组都停留在缓存中, 比逐级扫过整块数据的 rec_cascade 快数倍
+    """
+    stages = [_SegRecStage(level, g, (segment << (levels - level)) + 2 * len(g)) for level in range(levels, 0, -1)]
+    for x in chunks:
+        x = np.asarray(x, dtype=np.float64).ravel()
+        # 每级输出点数的上界 (输入加上缓冲区中的历史)
+        outs, bound = [], len(x)
+        for stage in stages:
+            bound = 2 * (bound + len(g) + stage.block)
+            outs.append(np.empty(bound))
+        pos = [0] * levels
+        for s0 in range(0, len(x), segment):
+            y = x[s0:s0 + segment]
+            for i, stage in enumerate(stages):
+                k = stage.push(y, outs[i][pos[i]:])
+                y = outs[i][pos[i]:pos[i] + k]
+                pos[i] += k
+        yield [o[:p] for o, p in zip(outs, pos)]
+
+
+# dec_stream 的可选后端 (命令行 --backend 的取值), 输出逐位一致
+DEC_BACKENDS = {'direct': dec_stream, 'segmented': dec_segmented, 'parallel': dec_parallel}
+
+
+def level_stream(chunks, level, h=h_dec, dtype=np.float64):
+    """只取第 level 级的输出段 (a{level}), 供 stream_compare 作为 golden 输入"""
+    for out in dec_stream(chunks, h, level, dtype=dtype):
+        yield out[level - 1]
+
+
+def baseline_stream(chunks, h=h_dec, g=h_rec, levels=7, phases=None):
+    """
+    对输入块序列逐块运行 L1~L{levels} 分解 + 重构，逐块产出浮点 baseline
+    每级只保存少量历史，总内存与数据长度无关
+    phases: {level: phase}, 覆盖 L5~L7 的默认相位
+    """
+    phases = phases or {}
+    dec = [_DecStage(level, h, phases.get(level)) for level in range(1, levels + 1)]
+    rec = [_RecStage(level, g) for level in range(levels, 0, -1)]
+    for x in chunks:
+        y = np.asarray(x, dtype=np.float64)
+        for stage in dec:
+            y = stage.push(y)
+        for stage in rec:
+            y = stage.push(y)
+        yield y
+
+
+# ==========================================
+# 7. 顶层流水线时序 (wavelet_baseline_removal_top)
+# ==========================================
+
+# 顶层 din 延迟线的级数 (文件头的 TOTAL_DELAY), din_aligned 再晚一级输出寄存器
+TOTAL_DELAY = 154
+
+# 各级的物理延迟 (周期) 以及串行输出时偶/奇两个结果的间隔
+STAGE_TIMING = {
+    'L1': {'phys': 3}, 'L2': {'phys': 3}, 'L3': {'phys': 3}, 'L4': {'phys': 3},
+    'L5': {'phys': 3}, 'L6': {'phys': 3}, 'L7': {'phys': 3},
+    'R7': {'phys': 5, 'spacing': 4},
+    'R6': {'phys': 5, 'spacing': 2},
+    'R5': {'phys': 5, 'spacing': 1},
+    'R4': {'phys': 3}, 'R3': {'phys': 3}, 'R2': {'phys': 3}, 'R1': {'phys': 3},
+}
+
+STAGES = ['L1', 'L2', 'L3', 'L4', 'L5', 'L6', 'L7', 'R7', 'R6', 'R5', 'R4', 'R3', 'R2', 'R1']
+
+# 计算 top_latency 时模拟的连续输入周期数 (足够 L7 收到第一个输出所需的输入)
+LATENCY_CYCLES = 512
+
+
+def stage_cycles(name, in_cyc, phase=None, timing=None):
+    """
+    由输入有效周期 in_cyc (升序) 计算输出有效周期
+    分解级: L1~L4 第 first 个输入起每个输入一次输出; L5~L7 从第 t0 个输入起每 2 个输入一次
+    重构级: 第 first 个输入起每个输入一次输出, R7~R5 再拆成偶/奇两个周期
+    """
+    t = (timing or STAGE_TIMING)[name]
+    level = int(name[1])
+    in_cyc = np.asarray(in_cyc, dtype=np.int64)
+    if name[0] == 'L':
+        cfg = DEC_LEVELS[level]
+        if cfg['block'] > 1:
+            return in_cyc[cfg['first']:] + t['phys']
+        t0, _ = dec_output_range(level, 0, phase)
+        return in_cyc[t0::2] + t['phys']
+    out = in_cyc[REC_LEVELS[level]['first']:] + t['phys']
+    if 'spacing' in t:
+        out = np.stack([out, out + t['spacing']], axis=1).ravel()
+    return out
+
+
+def top_latency(phases=None, timing=None):
+    """
+    连续 din_valid 时第一个 baseline_valid 相对第一个 din_valid 的周期数 (默认相位为 160, L5/L7 相位为 0 时为 155)
+    只按 stage_cycles 逐级推算有效周期, 不计算数据; baseline_valid 比 R1 的 dout_valid 晚一拍
+    """
+    phases = phases or {}
+    cyc = np.arange(LATENCY_CYCLES, dtype=np.int64)
+    for name in STAGES:
+        cyc = stage_cycles(name, cyc, phases.get(int(name[1])), timing)
+    return int(cyc[0]) + 1
+
+
+# ==========================================
+# 8. 顶层基线去除 (wavelet_baseline_removal_top)
+# ==========================================
+
+DATA_WIDTH = 16
+DATA_OUTPUT = DATA_WIDTH + 1
+
+
+def baseline_to_int(b):
+    """
+    浮点 baseline -> DATA_WIDTH 位有符号整数
+    与 reconstruct_L1 的截断相同: 向下取整 (算术右移) 后只保留低 DATA_WIDTH 位
+    """
+    # int64 -> int16 按补码只保留低 16 位 (= DATA_WIDTH)
+    return np.floor(b).astype(np.int64).astype(np.int16)
+
+
+def baseline_removal(x, h=h_dec, g=h_rec, chunk_blocks=1 << 16, return_baseline=False, phases=None):
+    """
+    wavelet_baseline_removal_top 的参考模型 (连续 din_valid)
+    x: int16 采样序列 (可为 np.memmap)，按 16 路一拍排列
+    返回 signal_no_baseline (DATA_OUTPUT=17 位有符号，用 int32 存放)，每个 baseline_valid 周期 16 点
+    顶层用 din_aligned (din 经过 TOTAL_DELAY 级延迟线和一级输出寄存器) 减 baseline:
+    第 c 个周期输出 = x 第 c - TOTAL_DELAY - 1 块 - 第 c - latency 个 baseline 块, latency 为第一个
+    baseline_valid 的周期 (top_latency, 默认相位为 160), 即输出第 i 点 = x[i + shift] - baseline[i],
+    shift = 16 * (latency - TOTAL_DELAY - 1) (只有 L5/L7 相位为 0 时为 0)
+    输出共 (输入周期数 - latency) 块, 与 cycle_model.simulate(drain=0) 的 signal_no_baseline 逐点相同
+    """
+    n = len(x) // 16 * 16
+    latency = top_latency(phases)
+    shift = 16 * (latency - TOTAL_DELAY - 1)
+    n_out = max(n - 16 * latency, 0)
+    step = chunk_blocks * 16
+    out = np.empty(n_out, dtype=np.int32)
+    base = np.empty(n_out, dtype=np.int16) if return_baseline else None
+    chunks = (x[i:i + step] for i in range(0, n, step))
+
+    n_done = 0
+    for b in baseline_stream(chunks, h, g, phases=phases):
+        b_int = baseline_to_int(b[:n_out - n_done])
+        k = len(b_int)
+        np.subtract(x[shift + n_done:shift + n_done + k], b_int, out=out[n_done:n_done + k], dtype=np.int32)
+        if return_baseline:
+            base[n_done:n_done + k] = b_int
+        n_done += k
+
+    if return_baseline:
+        return out[:n_done], base[:n_done]
+    return out[:n_done]
@@ -0,0 +1,15 @@
+#decompose / 顶层 testbench 的输入激励形式 (x_gen 写出的 x_input_16bit), 供 x_gen 与各扫描/检查脚本共用
+#   均匀噪声 (-2, 2) + 幅度 amplitude、周期 128 个采样的正弦 + 1000 的直流, 截断为 int16
+#随机数发生器由调用方给出 (x_gen 为 RandomState, 扫描脚本为 Generator), 这里只取其 uniform 方法
+import numpy as np
+
+
+def stimulus(uniform, n, amplitude=10000):
+    """
+    uniform: 随机数发生器的 uniform 方法, 按 uniform(-2, 2, len(n)) 调用
+    n: 采样序号数组 (分块生成时为该块内各采样的全局序号, 正弦的相位由它决定)
+    返回与 n 等长的 int16 数组
+    """
+    n = np.asarray(n)
+    data = uniform(-2, 2, len(n)) + amplitude * np.sin(2 * np.pi * n / 128) + 1000
+    return data.astype(np.int16)
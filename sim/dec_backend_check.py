@@ -0,0 +1,110 @@
+#分解级联几种后端的对照与调优: direct (dec_stream, 每级各自扫过整个输入块),
+#segmented (dec_segmented, 每小段在缓存中连续通过 7 级, 级间只带少量历史) 与
+#parallel (DEC_BACKENDS 的 'parallel', 即 parallel_cascade.dec_parallel_stream: 输入分片后多线程/多进程计算再拼接)
+#
+#用法:
+#   python dec_backend_check.py [--cycles 1000000] [--input x_input_16bit.txt] [--model f64|f32] [--detail]
+#                               [--segment 4096 16384 65536] [--min-batch 16384] [--chunk-rows 16384]
+#                               [--jobs 1 2 4 8] [--pool thread|process] [--shard 1048576] [--batch 4194304]
+#对每个段长 / 并行数: 检查各级输出与 direct 逐位一致, 并报告耗时和吞吐 (M 采样/s); 任一不一致时返回 1
+#重构同样对照: 以 direct 的 a7 为输入, rec_segmented (--rec-segment, 单位为 a7 点数) 与逐级 rec_cascade 逐位比较,
+#吞吐按对应的输入采样数计算
+#段长按 L2/L3 缓存调整: L1 的临时数组约 段长 x 32 字节 (float64)
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from wavelet_model import (h_dec, g_dec, h_rec, dec_stream, dec_segmented, dec_parallel, rec_cascade, rec_segmented,
+                           GOLDEN_DTYPES, SEGMENT_SIZE, SEGMENT_MIN_BATCH, REC_SEGMENT_SIZE)
+from parallel_cascade import PARALLEL_BATCH
+from tb_io import load_tb_file
+from seed_sweep import gen_stimulus
+
+LEVELS = 7
+
+
+def run_backend(backend, x, chunk, **kw):
+    """逐块运行后端, 返回 (每个输出的拼接结果, 耗时)"""
+    chunks = (x[i:i + chunk] for i in range(0, len(x), chunk))
+    t = time.perf_counter()
+    parts = None
+    for out in backend(chunks, **kw):
+        parts = [[] for _ in out] if parts is None else parts
+        for p, y in zip(parts, out):
+            p.append(y)
+    dt = time.perf_counter() - t
+    return [np.concatenate(p) for p in parts or []], dt
+
+
+def first_diff(ref, res):
+    """返回第一个不一致的 (输出序号, 位置), 全部一致时为 None"""
+    for k, (a, b) in enumerate(zip(ref, res)):
+        if len(a) != len(b):
+            return k, min(len(a), len(b))
+        bad = np.flatnonzero(a != b)
+        if len(bad):
+            return k, int(bad[0])
+    return None
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="分解级联 direct / segmented 后端对照")
+    parser.add_argument('--cycles', type=int, default=1000000)
+    parser.add_argument('--amplitude', type=float, default=30000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--input', default=None, help="x_input_16bit.txt 或 .trc, 不指定时随机生成")
+    parser.add_argument('--model', default='f64', choices=sorted(GOLDEN_DTYPES))
+    parser.add_argument('--detail', action='store_true', help="同时计算细节系数 d1~d7")
+    parser.add_argument('--segment', type=int, nargs='*', default=[1 << 12, SEGMENT_SIZE, 1 << 16])
+    parser.add_argument('--min-batch', type=int, default=SEGMENT_MIN_BATCH)
+    parser.add_argument('--chunk-rows', type=int, default=1 << 14, help="每个输入块的行数 (每行 16 个采样)")
+    parser.add_argument('--jobs', type=int, nargs='*', default=[], help="并行计算的线程/进程数, 不指定时不运行")
+    parser.add_argument('--pool', default='thread', choices=['thread', 'process'])
+    parser.add_argument('--shard', type=int, default=None, help="并行计算每片的输入点数, 默认每个线程/进程约 4 片")
+    parser.add_argument('--batch', type=int, default=PARALLEL_BATCH, help="并行计算每批的输入点数")
+    parser.add_argument('--rec-segment', type=int, nargs='*', default=[1 << 8, REC_SEGMENT_SIZE, 1 << 12])
+    args = parser.parse_args()
+
+    if args.input:
+        x = np.asarray(load_tb_file(args.input, dtype=np.int16)).ravel()
+    else:
+        x = gen_stimulus(np.random.default_rng(args.seed), args.cycles, args.amplitude)
+    kw = {'h': h_dec, 'levels': LEVELS, 'dtype': GOLDEN_DTYPES[args.model], 'g': g_dec if args.detail else None}
+    chunk = args.chunk_rows * 16
+
+    ref, t_ref = run_backend(dec_stream, x, chunk, **kw)
+    names = [f'a{l}' for l in range(1, LEVELS + 1)] + ([f'd{l}' for l in range(1, LEVELS + 1)] if args.detail else [])
+    print(f"[INFO] {len(x)} 个采样, golden {args.model}{' + 细节系数' if args.detail else ''}")
+    print(f"{'Backend':<22} {'Time (s)':>9} {'MSa/s':>8} {'Speedup':>8}  Result")
+    print(f"{'direct':<22} {t_ref:>9.3f} {len(x) / t_ref / 1e6:>8.1f} {1.0:>8.2f}")
+    runs = [(f'segmented {seg}', run_backend, (dec_segmented, x, chunk), {'segment': seg, 'min_batch': args.min_batch})
+            for seg in args.segment]
+    runs += [(f'{args.pool} x{j}', run_backend, (dec_parallel, x, chunk),
+              {'jobs': j, 'pool': args.pool, 'shard': args.shard, 'batch': args.batch}) for j in args.jobs]
+    n_bad = 0
+    for name, fn, fn_args, fn_kw in runs:
+        res, dt = fn(*fn_args, **fn_kw, **kw)
+        d = first_diff(ref, res)
+        status = "逐位一致" if d is None else f"不一致: {names[d[0]]} 第 {d[1]} 点"
+        n_bad += d is not None
+        print(f"{name:<22} {dt:>9.3f} {len(x) / dt / 1e6:>8.1f} {t_ref / dt:>8.2f}  {status}")
+
+    # 重构 R7~R1
+    a7 = ref[LEVELS - 1]
+    t = time.perf_counter()
+    rec_ref = rec_cascade(a7, h_rec, LEVELS)
+    t_rec = time.perf_counter() - t
+    rec_names = [f'r{l}' for l in range(LEVELS - 1, 0, -1)] + ['baseline']
+    print(f"{'rec_cascade':<22} {t_rec:>9.3f} {len(x) / t_rec / 1e6:>8.1f} {1.0:>8.2f}")
+    for seg in args.rec_segment:
+        res, dt = run_backend(rec_segmented, a7, max(chunk >> LEVELS, 1), g=h_rec, levels=LEVELS, segment=seg)
+        d = first_diff(rec_ref, res)
+        status = "逐位一致" if d is None else f"不一致: {rec_names[d[0]]} 第 {d[1]} 点"
+        n_bad += d is not None
+        print(f"{'rec_segmented ' + str(seg):<22} {dt:>9.3f} {len(x) / dt / 1e6:>8.1f} {t_rec / dt:>8.2f}  {status}")
+    sys.exit(1 if n_bad else 0)
@@ -0,0 +1,248 @@
+#多级分解的一次性验证入口: 输入只解析一次, a1~a7 只计算一次, 同时检查目录中所有 aN_out_ieee754 输出
+#目录中有 dN_out_ieee754 (细节系数) 输出时, d1~d7 与 a1~a7 在同一次遍历中计算 (wavelet_model.decimate_by2_bands) 并一起检查
+#替代分别运行 decompose_L12 ~ decompose_L16_verification.py (每个脚本都要重新读取输入并重算上游各级)
+#
+#用法:
+#   python decompose_verification.py [输出目录] [--input x_input_16bit.txt] [--model f64|f32]
+#                                    [--backend direct|segmented|parallel] [--segment 16384] [--golden-jobs N] [--pool thread|process]
+#                                    [--atol 1e-4] [--max-ulp N] [--budget N]
+#输出目录默认为 tb_decompose_L16, 输入默认为 tb_decompose_L1.v/x_input_16bit.txt (也可以是 .trc 二进制 trace)
+#输入和各级输出都按块流式读取, 内存占用与仿真长度无关
+#golden 结果按 (输入内容, 系数, 模型版本) 缓存在磁盘上 (见 common/golden_cache.py), 重复验证时只需解析和比较;
+#--no-cache 关闭缓存, --cache-dir / --cache-mb 指定缓存目录和容量
+#--align: 比较前先用输入开头的一段自动搜索每级的 lag 和抽取相位 (common/align.py), 再按找到的偏移流式比较
+#--backend segmented: golden 按 --segment 点的小段在缓存中连续通过 7 级 (wavelet_model.dec_segmented), 结果与 direct 逐位一致,
+#             长时间采集 (10^9 点) 时更快; 各后端的对照和段长调优见 dec_backend_check.py
+#--backend parallel: golden 按批切成对齐的分片, 用 --golden-jobs 个线程/进程 (--pool) 并行计算后拼接
+#             (common/parallel_cascade.py), 结果同样与 direct 逐位一致; --jobs 仍是比较各级输出的线程数
+#--model f32: golden 每次乘法/加法后按 float32 舍入, 加法树与 RTL 相同 (与 fp32_model 的 rounding='rne' 逐位一致)
+#             配合 --max-ulp 0 / 1 做逐位或 1 ULP 比较, 此时不再检查 atol (除非显式指定 --atol)
+#             注意 numpy 的 float32 为 IEEE 就近偶数舍入; 现有 fp32_add_sub 对阶移出的位直接丢弃、结果截断,
+#             抵消时与 RNE 可差上千 ULP, 与该 RTL 逐位一致的参考是 common/fp32_model.py (rounding='rtl')
+import argparse
+import functools
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from wavelet_model import h_dec, g_dec, dec_stream, GOLDEN_DTYPES, DEC_BACKENDS, SEGMENT_SIZE
+from tb_io import iter_tb_file
+from stream_compare import StreamCompare
+from golden_cache import GoldenCache, cached_dec_stream
+from align import discover_alignment, dec_level_offset, default_phase, format_alignment
+
+# 每次处理的输入行数 (每行 16 个采样)
+CHUNK_ROWS = 1 << 14
+# 自动对齐时使用的输入行数
+ALIGN_ROWS = 1 << 14
+
+_DUMP_RE = re.compile(r'^([ad])([1-7])_out_ieee754\.(txt|trc)$')
+
+
+def find_dumps(out_dir, band='a'):
+    """找出目录中的 a1~a7 (band='d' 时为 d1~d7) 输出文件, 返回 {level: path}"""
+    dumps = {}
+    for path in sorted(glob.glob(os.path.join(out_dir, f'{band}*_out_ieee754.*'))):
+        m = _DUMP_RE.match(os.path.basename(path))
+        if m and m.group(1) == band and os.path.getsize(path):
+            dumps.setdefault(int(m.group(2)), path)
+    return dumps
+
+
+class _LevelCheck:
+    """单个级别: Verilog 输出的分块读取 + 流式比较; index 为该输出在 dec_stream 每段结果中的位置"""
+
+    def __init__(self, level, path, chunk_rows, lag=0, index=None, **kw):
+        self.level = level
+        self.index = level - 1 if index is None else index
+        self.path = path
+        self.dut = iter_tb_file(path, invalid=0, chunk_rows=chunk_rows)
+        self.cmp = StreamCompare(**kw)
+        self.dut_done = False
+        # lag > 0: DUT 缺少开头 lag 个点, 丢弃 golden 的前 lag 个点; lag < 0 反之
+        self.skip_golden = max(lag, 0)
+        self.skip_dut = max(-lag, 0)
+
+    @staticmethod
+    def _skip(x, n):
+        k = min(n, len(x))
+        return x[k:], n - k
+
+    def step(self, golden):
+        """送入一段 golden, 然后读取足够的 Verilog 输出与之配对"""
+        golden, self.skip_golden = self._skip(golden.ravel(), self.skip_golden)
+        self.cmp.feed(golden=golden)
+        while not self.dut_done and not self.cmp.stopped and self.cmp.pending_dut < self.cmp.pending_golden:
+            y = next(self.dut, None)
+            if y is None:
+                self.dut_done = True
+            else:
+                y, self.skip_dut = self._skip(y.ravel(), self.skip_dut)
+                self.cmp.feed(dut=y)
+
+    @property
+    def finished(self):
+        return self.cmp.stopped or (self.dut_done and self.cmp.pending_dut == 0)
+
+
+def _read_prefix(path, n, chunk_rows=CHUNK_ROWS):
+    """读取文件开头至少 n 个点 (不足时返回全部)"""
+    parts, got = [], 0
+    for x in iter_tb_file(path, invalid=0, chunk_rows=chunk_rows):
+        parts.append(x.ravel())
+        got += parts[-1].size
+        if got >= n:
+            break
+    return np.concatenate(parts)[:n] if parts else np.empty(0)
+
+
+def discover_levels(input_path, dumps, h=h_dec, align_rows=ALIGN_ROWS):
+    """
+    用输入开头 align_rows 行, 逐级搜索 dumps 中各级的抽取相位和 lag
+    上游按将要使用的相位计算 (L1~L4 的抽取起点固定, 只有 L5~L7 的相位可以调整)
+    返回 ({level: 对齐结果}, {level: phase})
+    """
+    x = _read_prefix(input_path, align_rows * 16).astype(np.float64)
+    results, phases = {}, {}
+    upstream = x
+    for lv in range(1, max(dumps) + 1):
+        p = default_phase(lv)
+        if lv in dumps:
+            dut = _read_prefix(dumps[lv], max(len(upstream) // 2, 1))
+            r = discover_alignment(upstream, dut, lv, h)
+            results[lv] = r
+            if lv >= 5:
+                p = r['phase']
+        if lv >= 5:
+            phases[lv] = p
+            upstream = dec_level_offset(upstream, h, lv, p)
+        else:
+            upstream = dec_level_offset(upstream, h, lv, 0)
+    return results, phases
+
+
+def verify_levels(input_path, dumps, h=h_dec, chunk_rows=CHUNK_ROWS, jobs=None, cache=None,
+                  lags=None, phases=None, dtype=np.float64, details=None, g=g_dec, backend=dec_stream, **kw):
+    """
+    一次遍历输入, 同时检查 dumps 中的所有级别
+    dumps: {level: path}; cache: GoldenCache 或 None (不缓存)
+    lags: {level: lag}, phases: {level: phase} (来自 discover_levels, 默认不偏移/默认相位)
+    dtype: golden 的计算精度 (见 wavelet_model.GOLDEN_DTYPES)
+    details: {level: path}, 细节系数 dN 的输出 (lag 与同级的 aN 相同), g 为高通系数
+    backend: golden 的计算后端 (wavelet_model.DEC_BACKENDS 之一)
+    其余关键字参数传给 StreamCompare (atol, max_ulp, n_records, budget)
+    返回 {'a1': StreamCompare, ..., 'd1': ...}
+    """
+    lags = lags or {}
+    details = details or {}
+    levels = max(list(dumps) + list(details))
+    checks = {f'a{lv}': _LevelCheck(lv, p, chunk_rows, lags.get(lv, 0), **kw) for lv, p in sorted(dumps.items())}
+    for lv, p in sorted(details.items()):
+        checks[f'd{lv}'] = _LevelCheck(lv, p, chunk_rows, lags.get(lv, 0), index=levels + lv - 1, **kw)
+    g = g if details else None
+    jobs = jobs or min(len(checks), os.cpu_count() or 1)
+    if cache is not None:
+        golden = cached_dec_stream(input_path, h, levels, cache, chunk_rows, phases=phases, dtype=dtype, g=g,
+                                   backend=backend)
+    else:
+        chunks = (x.ravel() for x in iter_tb_file(input_path, invalid=0, chunk_rows=chunk_rows))
+        golden = backend(chunks, h, levels, phases, dtype, g)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for out in golden:
+            active = [c for c in checks.values() if not c.finished]
+            if not active:
+                break
+            list(pool.map(lambda c: c.step(out[c.index]), active))
+    # 提前结束时 cached_dec_stream 在关闭时把剩余输入算完写入缓存
+    golden.close()
+    return {name: c.cmp for name, c in checks.items()}
+
+
+def print_summary(results):
+    print("=" * 72)
+    print(f"{'Level':<6} {'Samples':>10} {'Max Abs Err':>14} {'MSE':>14} {'Mismatch':>9}  Result")
+    print("-" * 72)
+    for name, c in results.items():
+        if c.count == 0:
+            status = "⚠️ EMPTY"
+        elif c.passed:
+            status = "✅ PASS"
+        else:
+            status = "❌ FAIL"
+        print(f"{name:<6} {c.count:>10} {c.max_err:>14.6e} {c.mse:>14.6e} {c.mismatches:>9}  {status}")
+    print("=" * 72)
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="一次计算 a1~a7, 检查目录中所有 aN_out_ieee754 输出")
+    parser.add_argument('out_dir', nargs='?', default=os.path.join(SIM_DIR, 'tb_decompose_L16'))
+    parser.add_argument('--input', default=os.path.join(SIM_DIR, 'tb_decompose_L1.v', 'x_input_16bit.txt'))
+    parser.add_argument('--model', default='f64', choices=sorted(GOLDEN_DTYPES),
+                        help="golden 计算精度: f64 (默认) / f32 (与 RTL 相同的 float32 舍入和加法树)")
+    parser.add_argument('--backend', default='direct', choices=sorted(DEC_BACKENDS))
+    parser.add_argument('--segment', type=int, default=SEGMENT_SIZE, help="segmented 后端每小段的输入点数")
+    parser.add_argument('--golden-jobs', type=int, default=None, help="parallel 后端的线程/进程数 (默认 CPU 核数)")
+    parser.add_argument('--pool', default='thread', choices=['thread', 'process'], help="parallel 后端的并行方式")
+    parser.add_argument('--atol', type=float, default=None, help="默认 1e-4; f32 且指定 --max-ulp 时默认不检查")
+    parser.add_argument('--max-ulp', type=int, default=None)
+    parser.add_argument('--records', type=int, default=10)
+    parser.add_argument('--budget', type=int, default=None, help="每级不匹配点数达到该值后停止")
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--no-cache', action='store_true', help="不使用 golden 缓存")
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--cache-mb', type=float, default=None)
+    parser.add_argument('--align', action='store_true', help="比较前自动搜索各级 lag 和抽取相位")
+    parser.add_argument('--align-rows', type=int, default=ALIGN_ROWS)
+    args = parser.parse_args()
+    atol = args.atol
+    if atol is None and not (args.model == 'f32' and args.max_ulp is not None):
+        atol = 1e-4
+
+    print(f"--- 开始处理 (golden: {args.model}) ---")
+    dumps = find_dumps(args.out_dir)
+    details = find_dumps(args.out_dir, 'd')
+    if not dumps and not details:
+        print(f"Error: {args.out_dir} 中没有 aN_out_ieee754 / dN_out_ieee754 输出文件")
+        sys.exit(2)
+    if not os.path.exists(args.input):
+        print(f"Error: 找不到输入文件 {args.input}")
+        sys.exit(2)
+    for lv, p in sorted(dumps.items()):
+        print(f"a{lv}: {p}")
+    for lv, p in sorted(details.items()):
+        print(f"d{lv}: {p}")
+
+    lags, phases = {}, None
+    if args.align and dumps:
+        print("--- 自动对齐 ---")
+        found, phases = discover_levels(args.input, dumps, align_rows=args.align_rows)
+        for lv, r in sorted(found.items()):
+            print(format_alignment(lv, r))
+            if lv < 5 and r['phase'] != 0:
+                print(f"⚠️ a{lv} 的抽取相位与模型相反, 只能按 lag 对齐, 请检查 RTL")
+        lags = {lv: r['lag'] for lv, r in found.items()}
+
+    backend = DEC_BACKENDS[args.backend]
+    if args.backend == 'segmented':
+        backend = functools.partial(backend, segment=args.segment)
+    elif args.backend == 'parallel':
+        backend = functools.partial(backend, jobs=args.golden_jobs, pool=args.pool)
+
+    cache = None
+    if not args.no_cache:
+        cache = GoldenCache(args.cache_dir, None if args.cache_mb is None else args.cache_mb * (1 << 20))
+    results = verify_levels(args.input, dumps, atol=atol, max_ulp=args.max_ulp,
+                            n_records=args.records, budget=args.budget, jobs=args.jobs, cache=cache,
+                            lags=lags, phases=phases, dtype=GOLDEN_DTYPES[args.model], details=details,
+                            backend=backend)
+    for name, c in results.items():
+        print(c.report(name))
+    print_summary(results)
+    sys.exit(0 if all(c.passed for c in results.values()) else 1)
@@ -0,0 +1,95 @@
+#baseline 通路的等效周期时变滤波器 (common/equiv_filter.py): 推导、缓存, 并与逐级级联模型对照
+#
+#用法:
+#   python equiv_baseline.py [--cycles 100000] [--amplitude 10000] [--input x_input_16bit.txt] [--phase 5=0 --phase 7=0]
+#                            [--save-response K.npz] [--no-cache] [--atol 1e-6] [--probe 1000]
+#输出: 等效冲激响应的大小 (周期 x 抽头数), b[i] 用到的最新输入 x[i + lead], 各相位的直流增益 (应为 1)
+#对照: 同一输入分别用 baseline_stream (14 级级联) 与 equiv_baseline 计算, 报告浮点 baseline 的最大差值、
+#      截断为整数后不一致的点数和两者耗时; 另外在 --probe 个随机位置直接用 K 做点积, 检查 K 本身
+#      任一浮点差值超过 --atol 时返回 1
+#--save-response: 把 K、lead、period 保存为 npz, 供其他工具直接使用
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from wavelet_model import baseline_stream, baseline_to_int
+from equiv_filter import equivalent_response, equiv_baseline
+from golden_cache import GoldenCache
+from tb_io import load_tb_file
+from seed_sweep import gen_stimulus
+from top_cycle_model import parse_phases
+
+
+def timed(fn, *args, **kw):
+    t = time.perf_counter()
+    res = fn(*args, **kw)
+    return res, time.perf_counter() - t
+
+
+def probe_response(K, lead, x, b_ref, n_probe, rng):
+    """在 n_probe 个随机位置用 b[i] = K[i % P] . x[i + lead - n] 直接计算, 返回与 b_ref 的最大差值"""
+    P, L = K.shape
+    lo, hi = max(L - 1 - lead, 0), min(len(b_ref), len(x) - lead)
+    if hi <= lo or n_probe <= 0:
+        return 0.0
+    i = rng.integers(lo, hi, n_probe)
+    idx = i[:, None] + lead - np.arange(L)
+    v = np.einsum('ij,ij->i', K[i % P], np.asarray(x, dtype=np.float64)[idx])
+    return float(np.abs(v - b_ref[i]).max())
+
+
+def cascade_baseline(x, phases=None, chunk=1 << 20):
+    chunks = (x[i:i + chunk] for i in range(0, len(x), chunk))
+    parts = list(baseline_stream(chunks, phases=phases))
+    return np.concatenate(parts) if parts else np.empty(0)
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="baseline 等效周期时变滤波器")
+    parser.add_argument('--cycles', type=int, default=100000)
+    parser.add_argument('--amplitude', type=float, default=10000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--input', default=None, help="x_input_16bit.txt 或 .trc, 不指定时随机生成")
+    parser.add_argument('--phase', action='append', default=[], help="覆盖 L5~L7 的抽取相位, 如 5=0")
+    parser.add_argument('--save-response', default=None)
+    parser.add_argument('--no-cache', action='store_true', help="不使用 golden 缓存")
+    parser.add_argument('--cache-dir', default=None)
+    parser.add_argument('--atol', type=float, default=1e-6, help="浮点 baseline 允许的最大差值")
+    parser.add_argument('--probe', type=int, default=1000, help="直接用 K 计算的随机位置数")
+    args = parser.parse_args()
+
+    phases = parse_phases(args.phase)
+    cache = None if args.no_cache else GoldenCache(args.cache_dir)
+    (eq, K), dt = timed(equivalent_response, phases=phases, cache=cache)
+    dc = K.sum(axis=1)
+    print(f"[INFO] 等效冲激响应 {K.shape[0]} 相位 x {K.shape[1]} 抽头 ({dt * 1e3:.1f} ms), lead = {eq.lead} "
+          f"(A = {eq.A}, C = {eq.C}), 直流增益 {dc.min():.12f} ~ {dc.max():.12f}")
+    if args.save_response:
+        np.savez(args.save_response, K=K, lead=eq.lead, period=eq.period)
+        print(f"[INFO] 已写入 {args.save_response}")
+
+    if args.input:
+        x = np.asarray(load_tb_file(args.input, dtype=np.int16)).ravel()
+    else:
+        x = gen_stimulus(np.random.default_rng(args.seed), args.cycles, args.amplitude)
+
+    b_ref, t_ref = timed(cascade_baseline, x, phases)
+    b_eq, t_eq = timed(equiv_baseline, x, eq)
+    n = min(len(b_ref), len(b_eq))
+    err = np.abs(b_ref[:n] - b_eq[:n])
+    bad = np.flatnonzero(baseline_to_int(b_ref[:n]) != baseline_to_int(b_eq[:n]))
+    print(f"[INFO] {len(x)} 个采样: 级联 {t_ref:.3f} s, 等效滤波器 {t_eq:.3f} s ({t_ref / max(t_eq, 1e-9):.1f} 倍)")
+    print(f"[INFO] baseline 长度: 级联 {len(b_ref)}, 等效滤波器 {len(b_eq)}, 比较前 {n} 点")
+    print(f"[INFO] 最大浮点差值 {err.max() if n else 0.0:.3e}"
+          + (f" (at {int(np.argmax(err))})" if n else "")
+          + f", 整数 baseline 不一致 {len(bad)} 点" + (f", 第一个在 {bad[0]}" if len(bad) else ""))
+    e_probe = probe_response(K, eq.lead, x, b_ref, args.probe, np.random.default_rng(args.seed))
+    print(f"[INFO] K 直接点积 ({args.probe} 个随机位置) 最大差值 {e_probe:.3e}")
+    ok = n > 0 and err.max() <= args.atol and e_probe <= args.atol
+    print("[PASS] 逐级模型与等效滤波器一致" if ok else "[FAIL] 逐级模型与等效滤波器不一致")
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,123 @@
+#定点 (Q2.23 / 48 位, common/fixed_model.py) 与 FP32 (common/fp32_model.py)、float64 (common/wavelet_model.py) 三种实现的逐级比较
+#用于评估定点版本与 FP32 版本的精度差别, 以及在给定位宽下各级实际用到的位数 (资源裁剪的依据)
+#
+#用法:
+#   python fixed_point_compare.py [--cycles 100000] [--amplitude 30000] [--input x_input_16bit.txt]
+#                                 [--coef-width 25] [--coef-frac 23] [--internal-width 48] [--internal-frac 23]
+#                                 [--rounding trunc|round] [--overflow wrap|saturate] [--fp32-cycles 20000] [--json out.json]
+#每级报告: 定点 vs float64、定点 vs FP32、FP32 vs float64 的最大误差 / RMS / 最大误差位置, 以及定点值的峰值位数
+#FP32 逐位仿真较慢, 只对前 --fp32-cycles 个周期计算 (0 关闭)
+#baseline: 定点的 16 位 baseline 与 float64 baseline (同样向下取整) 不一致的点数、最大差值和第一个不一致的位置
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from wavelet_model import h_dec, dec_cascade, rec_cascade, baseline_to_int
+from fp32_model import dec_cascade_fp32
+from fixed_model import (fixed_config, dec_cascade_fixed, rec_cascade_fixed, quantize_coefs, read_q_coefs,
+                         to_float, peak_bits)
+from tb_io import load_tb_file
+from seed_sweep import gen_stimulus
+
+LEVELS = 7
+
+
+def diff_stats(a, b):
+    """两个等长 (取较短长度) 浮点序列的误差统计"""
+    n = min(len(a), len(b))
+    if not n:
+        return {'count': 0, 'max_err': 0.0, 'rms': 0.0, 'argmax': None}
+    e = np.abs(np.asarray(a[:n], dtype=np.float64) - np.asarray(b[:n], dtype=np.float64))
+    i = int(np.argmax(e))
+    return {'count': n, 'max_err': float(e[i]), 'rms': float(np.sqrt(np.mean(e * e))), 'argmax': i}
+
+
+def compare(x, cfg, fp32_samples):
+    """返回 {'levels': [...], 'baseline': {...}}"""
+    golden = dec_cascade(x, h_dec, LEVELS)
+    fixed = dec_cascade_fixed(x, cfg, h_dec, LEVELS)
+    fp32 = dec_cascade_fp32(x[:fp32_samples], h_dec, LEVELS) if fp32_samples else [np.empty(0)] * LEVELS
+    levels = []
+    for lv in range(LEVELS):
+        fx = to_float(fixed[lv], cfg)
+        levels.append({'level': lv + 1,
+                       'fixed_vs_f64': diff_stats(fx, golden[lv]),
+                       'fixed_vs_fp32': diff_stats(fx, fp32[lv]),
+                       'fp32_vs_f64': diff_stats(fp32[lv], golden[lv]),
+                       'peak_bits': peak_bits(fixed[lv])})
+
+    b_fixed = rec_cascade_fixed(fixed[-1], cfg, h_dec, LEVELS)[-1]
+    b_gold = baseline_to_int(rec_cascade(golden[-1], levels=LEVELS)[-1]).astype(np.int64)
+    n = min(len(b_fixed), len(b_gold))
+    d = np.abs(b_fixed[:n] - b_gold[:n])
+    bad = np.flatnonzero(d)
+    baseline = {'count': n, 'mismatches': len(bad), 'max_diff': int(d.max()) if n else 0,
+                'first': int(bad[0]) if len(bad) else None}
+    return {'levels': levels, 'baseline': baseline}
+
+
+def _fmt(s):
+    """误差统计的 max / rms 两列, 未计算时显示 '-'"""
+    if not s['count']:
+        return f"{'-':>12} {'-':>10}"
+    return f"{s['max_err']:>12.4e} {s['rms']:>10.3e}"
+
+
+def print_report(res, cfg):
+    print("=" * 110)
+    print(f"{'Level':<6} {'Fix-F64 max':>12} {'rms':>10} {'@':>9}  {'Fix-FP32 max':>12} {'rms':>10}  "
+          f"{'FP32-F64 max':>12} {'rms':>10}  {'Bits':>5}/{cfg['internal_width']}")
+    print("-" * 110)
+    for r in res['levels']:
+        a, b, c = r['fixed_vs_f64'], r['fixed_vs_fp32'], r['fp32_vs_f64']
+        at = a['argmax'] if a['argmax'] is not None else '-'
+        print(f"a{r['level']:<5} {_fmt(a)} {at:>9}  {_fmt(b)}  {_fmt(c)}  {r['peak_bits']:>5}")
+    print("=" * 110)
+    b = res['baseline']
+    print(f"baseline (Q16.0): {b['count']} 点, 定点与 float64 不一致 {b['mismatches']} 点 "
+          f"({b['mismatches'] / max(b['count'], 1):.3%}), 最大差值 {b['max_diff']} LSB"
+          + (f", 第一个在 {b['first']}" if b['first'] is not None else ""))
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="定点 / FP32 / float64 三种实现的逐级比较")
+    parser.add_argument('--cycles', type=int, default=100000)
+    parser.add_argument('--amplitude', type=float, default=30000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--input', default=None, help="x_input_16bit.txt 或 .trc, 不指定时随机生成")
+    parser.add_argument('--coef-width', type=int, default=25)
+    parser.add_argument('--coef-frac', type=int, default=23)
+    parser.add_argument('--internal-width', type=int, default=48)
+    parser.add_argument('--internal-frac', type=int, default=23)
+    parser.add_argument('--rounding', default='trunc', choices=['trunc', 'round'])
+    parser.add_argument('--overflow', default='wrap', choices=['wrap', 'saturate'])
+    parser.add_argument('--fp32-cycles', type=int, default=20000, help="FP32 仿真的周期数, 0 不计算")
+    parser.add_argument('--json', default=None)
+    args = parser.parse_args()
+
+    cfg = fixed_config(coef_width=args.coef_width, coef_frac=args.coef_frac, internal_width=args.internal_width,
+                       internal_frac=args.internal_frac, rounding=args.rounding, overflow=args.overflow)
+    hq = quantize_coefs(h_dec, cfg['coef_width'], cfg['coef_frac'])
+    if (cfg['coef_width'], cfg['coef_frac']) == (25, 23) and not np.array_equal(hq, read_q_coefs()):
+        print("[WARN] 量化后的系数与 wavelet_baseline_removal_top.v 中的 Q2.23 常数不一致")
+
+    if args.input:
+        x = np.asarray(load_tb_file(args.input, dtype=np.int16)).ravel()
+    else:
+        x = gen_stimulus(np.random.default_rng(args.seed), args.cycles, args.amplitude)
+
+    t = time.perf_counter()
+    res = compare(x, cfg, 16 * args.fp32_cycles)
+    print(f"--- {len(x)} 个采样, 耗时 {time.perf_counter() - t:.2f} s, 定点参数: "
+          + ", ".join(f"{k}={v}" for k, v in cfg.items()) + " ---")
+    print_report(res, cfg)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': cfg, 'samples': len(x), **res}, f, indent=1)
+        print(f"结果已写入 {args.json}")
@@ -0,0 +1,79 @@
+#FP32 运算单元测试向量的覆盖率收集/合并/报告 (覆盖点定义见 common/fp32_coverage.py)
+#
+#用法:
+#   python fp32_coverage_report.py collect add  tb_adder/tb_fp32_data_input.txt [--db cov.json]
+#   python fp32_coverage_report.py collect mult tb_multi/tb_fp32_data_input.txt [--db cov.json]
+#   python fp32_coverage_report.py merge  all.json cov_a.json cov_b.json ...
+#   python fp32_coverage_report.py report cov.json
+#   python fp32_coverage_report.py suggest cov.json --unit add
+#suggest 输出可直接传给 tb_fp32_data_gen.py --weights 的分层比例, 使新生成的激励集中在未命中的桶上
+import argparse
+import os
+import sys
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from fp32_coverage import CoverageDB, UNITS, sample_file, suggest_weights
+
+DEFAULT_DB = 'fp32_coverage.json'
+
+
+def cmd_collect(args):
+    db = CoverageDB.load(args.db)
+    for path in args.files:
+        counts, n = sample_file(path, args.unit)
+        db.add(args.unit, counts, n, source=os.path.abspath(path))
+        print(f"{path}: {n} 个样本")
+    db.save(args.db)
+    print(db.report(args.unit))
+
+
+def cmd_merge(args):
+    db = CoverageDB()
+    for path in args.inputs:
+        db.merge(CoverageDB.load(path))
+    db.save(args.output)
+    for unit in UNITS:
+        if unit in db.units:
+            print(db.report(unit, show_holes=False))
+
+
+def cmd_report(args):
+    db = CoverageDB.load(args.db)
+    for unit in ([args.unit] if args.unit else UNITS):
+        if unit in db.units:
+            print(db.report(unit))
+
+
+def cmd_suggest(args):
+    w = suggest_weights(CoverageDB.load(args.db), args.unit)
+    print(",".join(f"{k}={v:g}" for k, v in w.items()))
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="FP32 加减法/乘法测试向量覆盖率")
+    sub = parser.add_subparsers(dest='cmd', required=True)
+
+    p = sub.add_parser('collect', help="统计向量文件并累加到覆盖率库")
+    p.add_argument('unit', choices=UNITS)
+    p.add_argument('files', nargs='+')
+    p.add_argument('--db', default=DEFAULT_DB)
+    p.set_defaults(func=cmd_collect)
+
+    p = sub.add_parser('merge', help="合并多个覆盖率库")
+    p.add_argument('output')
+    p.add_argument('inputs', nargs='+')
+    p.set_defaults(func=cmd_merge)
+
+    p = sub.add_parser('report', help="打印覆盖率与未命中的桶")
+    p.add_argument('db')
+    p.add_argument('--unit', choices=UNITS, default=None)
+    p.set_defaults(func=cmd_report)
+
+    p = sub.add_parser('suggest', help="按未命中的桶给出激励分层比例")
+    p.add_argument('db')
+    p.add_argument('--unit', choices=UNITS, default='add')
+    p.set_defaults(func=cmd_suggest)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,89 @@
+#golden 缓存 (common/golden_cache.py) 的回归检查: 提前结束的验证也要留下完整可用的缓存
+#
+#用法:
+#   python golden_cache_check.py [--cycles 20000] [--chunk-rows 2048] [--backend direct]
+#步骤: 随机输入写成 x_input_16bit 格式, DUT 输出用 golden 加偏移 (不匹配预算很快用完) 和只保留开头一段
+#      (DUT 输出较短) 两种方式构造, 分别在空缓存上运行 decompose_verification.verify_levels;
+#      两种情况都应提前结束, 且结束后缓存中 a1~a7 齐全并与完整的 dec_stream 输出逐位相同, 再次运行时直接命中
+#任一检查失败时返回 1
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from wavelet_model import h_dec, dec_stream, DEC_BACKENDS
+from golden_cache import GoldenCache, hash_file, level_key
+from ieee754_codec import format_words
+from seed_sweep import gen_stimulus
+from decompose_verification import verify_levels
+
+LEVELS = 7
+
+
+def write_dump(path, y):
+    with open(path, 'wb') as f:
+        f.write(format_words(np.asarray(y, dtype=np.float32), 'b'))
+
+
+def check_cache(cache, input_path, ref):
+    """缓存中各级都存在且与 ref 逐位相同"""
+    digest = hash_file(input_path)
+    for lv in range(1, LEVELS + 1):
+        a = cache.get(level_key(digest, h_dec, lv))
+        if a is None:
+            return f"a{lv} 不在缓存中"
+        if not np.array_equal(np.asarray(a), ref[lv - 1]):
+            return f"a{lv} 缓存 {len(a)} 点与完整输出 {len(ref[lv - 1])} 点不一致"
+    return ""
+
+
+def inodes(cache):
+    return {p: os.stat(p).st_ino for _, _, p in cache.entries()}
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="提前结束的验证是否留下可用的 golden 缓存")
+    parser.add_argument('--cycles', type=int, default=20000)
+    parser.add_argument('--chunk-rows', type=int, default=2048)
+    parser.add_argument('--backend', default='direct', choices=sorted(DEC_BACKENDS))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    x = gen_stimulus(np.random.default_rng(args.seed), args.cycles)
+    ref = [np.concatenate(o) for o in zip(*dec_stream([x], h_dec, LEVELS))]
+    backend = DEC_BACKENDS[args.backend]
+
+    n_bad = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, 'x_input_16bit.txt')
+        with open(input_path, 'wb') as f:
+            f.write(format_words(x, 'h', 4, lanes=16))
+
+        cases = {
+            '预算用完': ({lv: ref[lv - 1] + 1.0 for lv in range(1, LEVELS + 1)}, {'budget': 10}),
+            'DUT 输出较短': ({lv: ref[lv - 1][:len(ref[lv - 1]) // 8] for lv in range(1, LEVELS + 1)}, {}),
+        }
+        for i, (name, (dut, kw)) in enumerate(cases.items()):
+            dumps = {}
+            for lv, y in dut.items():
+                dumps[lv] = os.path.join(tmp, f'a{lv}_out_ieee754.txt')
+                write_dump(dumps[lv], y)
+            cache = GoldenCache(os.path.join(tmp, f'cache{i}'))
+            results = verify_levels(input_path, dumps, chunk_rows=args.chunk_rows, cache=cache, backend=backend,
+                                    g=None, **kw)
+            early = all(c.stopped or c.count < len(ref[int(k[1:]) - 1]) for k, c in results.items())
+            msg = "" if early else "没有提前结束"
+            msg = msg or check_cache(cache, input_path, ref)
+            # 再次运行应直接命中 (缓存文件没有重写)
+            before = inodes(cache)
+            verify_levels(input_path, dumps, chunk_rows=args.chunk_rows, cache=cache, backend=backend, g=None, **kw)
+            if not msg and inodes(cache) != before:
+                msg = "再次运行时缓存文件发生变化"
+            ok = not msg
+            n_bad += not ok
+            print(f"[{'PASS' if ok else 'FAIL'}] {name:<12} {msg}")
+    sys.exit(1 if n_bad else 0)
@@ -0,0 +1,144 @@
+#多种子回归扫描: 对大量 (种子, 幅度, 周期数) 组合生成 x_gen 形式的激励,
+#分别计算 float64 golden 级联与 FP32 逐位仿真级联 (common/fp32_model.py), 统计每级误差并合并成一张表
+#
+#用法:
+#   python seed_sweep.py [--seeds 200] [--amplitudes 1000 10000 30000] [--cycles 1000 4000] [--jobs N]
+#                        [--entropy 11232] [--rounding rtl] [--atol 1e-4] [--json sweep.json]
+#随机数: 由 np.random.SeedSequence(entropy) spawn 出 --seeds 个互相独立的子序列, 第 k 个种子在所有幅度/周期组合下
+#使用同一个子序列, 结果只取决于 (entropy, k), 与进程数和调度顺序无关
+#每个任务在子进程中完成, 只返回每级的统计量 (不返回数组), 因此扫描规模随核数线性扩展
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from wavelet_model import h_dec, dec_cascade
+from fp32_model import dec_cascade_fp32
+from stream_compare import StreamCompare, ULP_BINS
+from x_stimulus import stimulus
+
+LEVELS = 7
+
+
+def gen_stimulus(rng, num_test_cycles=1000, amplitude=10000):
+    """与 x_gen 相同形式的激励 (见 x_stimulus), rng 为 np.random.Generator"""
+    return stimulus(rng.uniform, np.arange(num_test_cycles * 16), amplitude)
+
+
+def run_config(task):
+    """
+    子进程中运行一个组合, task = (seed_index, seed_seq, amplitude, cycles, rounding, atol)
+    返回 {'config': ..., 'levels': {level: 统计量}}
+    """
+    k, ss, amplitude, cycles, rounding, atol = task
+    x = gen_stimulus(np.random.default_rng(ss), cycles, amplitude)
+    golden = dec_cascade(x, h_dec, LEVELS)
+    fp32 = dec_cascade_fp32(x, h_dec, LEVELS, rounding)
+    levels = {}
+    for lv, (g, d) in enumerate(zip(golden, fp32), 1):
+        cmp = StreamCompare(atol=atol, n_records=0)
+        cmp.feed(golden=g, dut=d)
+        s = cmp.summary()
+        levels[lv] = {'count': s['count'], 'mismatches': s['mismatches'], 'max_err': s['max_abs_err'],
+                      'sum_sq': cmp.sum_sq, 'ulp_hist': s['ulp_hist']}
+    return {'config': {'seed': k, 'amplitude': amplitude, 'cycles': cycles}, 'levels': levels}
+
+
+class SweepTable:
+    """合并各组合的每级统计: 总点数/不匹配数/MSE/ULP 直方图, 以及最大误差出现在哪个组合"""
+
+    def __init__(self):
+        self.levels = {}
+        self.configs = 0
+
+    def add(self, result):
+        self.configs += 1
+        for lv, s in result['levels'].items():
+            t = self.levels.setdefault(lv, {'count': 0, 'mismatches': 0, 'max_err': 0.0, 'sum_sq': 0.0,
+                                            'ulp_hist': np.zeros(ULP_BINS, dtype=np.int64),
+                                            'worst': None, 'failed_configs': 0})
+            t['count'] += s['count']
+            t['mismatches'] += s['mismatches']
+            t['sum_sq'] += s['sum_sq']
+            t['ulp_hist'][:len(s['ulp_hist'])] += s['ulp_hist']
+            if s['mismatches']:
+                t['failed_configs'] += 1
+            if t['worst'] is None or s['max_err'] > t['max_err']:
+                t['max_err'] = s['max_err']
+                t['worst'] = result['config']
+
+    def rows(self):
+        """每级一行的 dict, max_ulp 为 ULP 直方图最高非空桶的上界"""
+        rows = []
+        for lv, t in sorted(self.levels.items()):
+            nz = np.flatnonzero(t['ulp_hist'])
+            top = int(nz[-1]) if nz.size else 0
+            rows.append({'level': lv, 'count': t['count'], 'mismatches': t['mismatches'],
+                         'failed_configs': t['failed_configs'], 'max_err': t['max_err'],
+                         'mse': t['sum_sq'] / t['count'] if t['count'] else 0.0,
+                         'max_ulp': (1 << top) - 1, 'ulp_hist': t['ulp_hist'][:top + 1].tolist(),
+                         'worst': t['worst']})
+        return rows
+
+    def print(self):
+        print("=" * 96)
+        print(f"{'Level':<6} {'Samples':>12} {'Max Abs Err':>14} {'MSE':>14} {'Max ULP':>9} "
+              f"{'Mismatch':>10} {'Fail Cfg':>9}  Worst (seed/amp/cycles)")
+        print("-" * 96)
+        for r in self.rows():
+            w = r['worst']
+            print(f"a{r['level']:<5} {r['count']:>12} {r['max_err']:>14.6e} {r['mse']:>14.6e} "
+                  f"{'<=' + str(r['max_ulp']):>9} {r['mismatches']:>10} {r['failed_configs']:>9}  "
+                  f"{w['seed']}/{w['amplitude']:g}/{w['cycles']}")
+        print("=" * 96)
+
+
+def make_tasks(entropy, n_seeds, amplitudes, cycles, rounding, atol):
+    seeds = np.random.SeedSequence(entropy).spawn(n_seeds)
+    return [(k, seeds[k], a, c, rounding, atol)
+            for k, a, c in itertools.product(range(n_seeds), amplitudes, cycles)]
+
+
+def sweep(tasks, jobs=None):
+    """在进程池中运行全部任务, 按任务顺序合并, 返回 SweepTable"""
+    table = SweepTable()
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        for t in tasks:
+            table.add(run_config(t))
+        return table
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        chunk = max(1, len(tasks) // (4 * jobs))
+        for res in pool.map(run_config, tasks, chunksize=chunk):
+            table.add(res)
+    return table
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="多种子/幅度/周期数扫描 golden 与 FP32 仿真级联的误差")
+    parser.add_argument('--seeds', type=int, default=200)
+    parser.add_argument('--amplitudes', type=float, nargs='+', default=[1000, 10000, 30000])
+    parser.add_argument('--cycles', type=int, nargs='+', default=[1000])
+    parser.add_argument('--entropy', type=int, default=11232, help="根 SeedSequence 的熵")
+    parser.add_argument('--rounding', default='rtl', choices=['rtl', 'rne', 'trunc'])
+    parser.add_argument('--atol', type=float, default=1e-4)
+    parser.add_argument('--jobs', type=int, default=None)
+    parser.add_argument('--json', default=None, help="把合并后的表写入 json 文件")
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.entropy, args.seeds, args.amplitudes, args.cycles, args.rounding, args.atol)
+    print(f"--- {len(tasks)} 个组合 ({args.seeds} 种子 x {len(args.amplitudes)} 幅度 x {len(args.cycles)} 周期数), "
+          f"rounding={args.rounding} ---")
+    table = sweep(tasks, args.jobs)
+    table.print()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'entropy': args.entropy, 'rounding': args.rounding, 'atol': args.atol,
+                       'configs': table.configs, 'levels': table.rows()}, f, indent=1)
+        print(f"结果已写入 {args.json}")
@@ -0,0 +1,50 @@
+#流式比较 (common/stream_compare.py) 的回归检查: 用手工构造的小数组检查 NaN/Inf 与预算的处理
+#
+#用法:
+#   python stream_compare_check.py [--chunk 3]
+#每个用例给出 golden / dut 以及期望的不匹配点数和 NaN/Inf 桶的点数, 按 --chunk 分段送入 compare_streams
+#任一用例与期望不一致时返回 1
+import argparse
+import os
+import sys
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from stream_compare import compare_streams, ULP_NAN_BIN
+
+inf, nan = np.inf, np.nan
+
+# (名称, golden, dut, StreamCompare 参数, 期望的不匹配点数, 期望的 NaN/Inf 桶点数)
+CASES = [
+    ('相同的 ±Inf', [1, inf, -inf, 2], [1, inf, -inf, 2], {}, 0, 0),
+    ('相同的 ±Inf (只按 ulp)', [1, inf, -inf, 2], [1, inf, -inf, 2], {'atol': None, 'max_ulp': 0}, 0, 0),
+    ('Inf 符号不同', [1, inf, 2], [1, -inf, 2], {}, 1, 1),
+    ('Inf 与有限值', [inf, 3, 4], [1e30, 3, 4], {}, 1, 1),
+    ('都是 NaN', [nan, 1, nan], [nan, 1, nan], {}, 0, 0),
+    ('只有一边是 NaN', [nan, 1, 2], [0, 1, nan], {}, 2, 2),
+    ('有限值误差', [1, 2, 3], [1, 2.5, 3], {}, 1, 0),
+    ('预算', [0, 1, 2, 3, 4, 5], [9, 9, 9, 9, 9, 9], {'budget': 2}, 2, 0),
+]
+
+
+def chunks(x, size):
+    x = np.asarray(x, dtype=np.float64)
+    return (x[i:i + size] for i in range(0, len(x), size))
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="StreamCompare 的 NaN/Inf 回归检查")
+    parser.add_argument('--chunk', type=int, default=3)
+    args = parser.parse_args()
+
+    n_bad = 0
+    for name, golden, dut, kw, mis, special in CASES:
+        cmp = compare_streams(chunks(golden, args.chunk), chunks(dut, args.chunk), **kw)
+        got = (cmp.mismatches, int(cmp.ulp_hist[ULP_NAN_BIN]))
+        ok = got == (mis, special) and np.isfinite(cmp.max_err)
+        n_bad += not ok
+        msg = "" if ok else f"不匹配 {got[0]} (期望 {mis}), NaN/Inf 桶 {got[1]} (期望 {special}), 最大误差 {cmp.max_err}"
+        print(f"[{'PASS' if ok else 'FAIL'}] {name:<24} {msg}")
+    sys.exit(1 if n_bad else 0)
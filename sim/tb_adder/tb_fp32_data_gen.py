@@ -4,55 +4,29 @@ IEEE 754 单精度浮点数数据生成脚本
 输出为32位二进制形式，每行一个数据
 """
 
-import struct
-import random
-import math
+import os
+import sys
 
-def float_to_ieee754_binary(f):
-    """将Python float转换为IEEE 754 32位二进制字符串"""
-    # 使用struct打包为32位浮点数，然后转换为32位无符号整数
-    packed = struct.pack('>f', f)  # Big-endian
-    ieee754_int = struct.unpack('>I', packed)[0]
-    # 转换为32位二进制字符串
-    return format(ieee754_int, '032b')
+import numpy as np
 
-def generate_random_float():
-    """
-    生成一个随机的单精度浮点数
-    覆盖不同的范围和精度
-    """
-    range_type = random.randint(0, 4)
-    
-    if range_type == 0:
-        # 很小的数字（接近零，非规范化范围）
-        return random.uniform(-1e-35, 1e-35)
-    elif range_type == 1:
-        # 正常的小范围数字
-        return random.uniform(-100, 100)
-    elif range_type == 2:
-        # 中等范围数字
-        return random.uniform(-1e6, 1e6)
-    elif range_type == 3:
-        # 很大的数字
-        return random.uniform(-1e30, 1e30)
-    else:
-        # 非常大的数字（接近单精度限制）
-        return random.uniform(-3e38, 3e38)
+# 共用的激励生成位于 sim/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from fp32_stimulus import iter_pairs, write_pairs, parse_weights, strata_counts, STRATA
+from ieee754_codec import format_words
 
-def generate_test_data(num_data, output_file, seed=42):
+
+def generate_test_data(num_data, output_file, seed=42, weights=None):
     """
-    生成指定数量的测试数据
+    生成指定数量的测试数据 (两行为一对操作数)
     
     参数:
         num_data: 生成的数据总数
         output_file: 输出文件路径
         seed: 随机种子，用于重现性测试
+        weights: 各分层的比例 (见 fp32_stimulus.DEFAULT_WEIGHTS)，None 使用默认值
     """
     test_cases = []
     
-    # 固定随机种子以保证可重复
-    random.seed(seed)
-    
     # 1. 特殊测试用例（固定）
     special_cases = [
         # 零
@@ -104,53 +78,54 @@ def generate_test_data(num_data, output_file, seed=42):
     
     # 添加特殊用例
     test_cases.extend(special_cases)
+    special_bits = np.array(test_cases, dtype=np.float32).view(np.uint32)[:num_data]
     
-    # 2. 填充随机数据到目标数量
-    num_random = num_data - len(test_cases)
-    
-    if num_random > 0:
-        print(f"生成 {len(special_cases)} 个特殊测试用例")
-        print(f"生成 {num_random} 个随机测试数据")
-        
-        for _ in range(num_random):
-            random_value = generate_random_float()
-            test_cases.append(random_value)
-    else:
-        print(f"生成 {len(test_cases)} 个特殊测试用例（超出目标数量，只保留前 {num_data} 个）")
-        test_cases = test_cases[:num_data]
-    
-    # 写入文件
-    with open(output_file, 'w') as f:
-        for value in test_cases:
-            binary = float_to_ieee754_binary(value)
-            f.write(binary + '\n')
+    # 2. 随机数据按操作数对分块生成并写入，内存占用与数据量无关
+    num_random = num_data - len(special_bits)
+    num_pairs = (num_random + 1) // 2 if num_random > 0 else 0
+    print(f"生成 {len(special_bits)} 个特殊测试用例")
+    print(f"生成 {max(num_random, 0)} 个随机测试数据 ({num_pairs} 对, 按位分层)")
+
+    counts = dict.fromkeys(STRATA, 0)
+    head = special_bits
+    written = len(special_bits)
+    with open(output_file, 'wb') as f:
+        f.write(format_words(special_bits, 'b'))
+        for a, b, tags in iter_pairs(num_pairs, seed, weights):
+            for k, c in strata_counts(tags).items():
+                counts[k] += c
+            left = num_data - written
+            n = min(len(a), left // 2)
+            write_pairs(f, a[:n], b[:n])
+            if n < len(a) and left % 2:                 # 总数为奇数时最后一对只写 a
+                f.write(format_words(a[n:n + 1], 'b'))
+            k = min(2 * len(a), left)
+            if len(head) < 20:
+                head = np.concatenate([head, np.stack([a[:10], b[:10]], axis=1).ravel()[:k]])
+            written += k
     
-    print(f"已生成 {len(test_cases)} 个测试数据，写入到 {output_file}")
+    print(f"已生成 {written} 个测试数据，写入到 {output_file}")
+    print("分层统计 (对): " + ", ".join(f"{k}={c}" for k, c in counts.items() if c))
     
     # 打印前20个数据以供验证
     print("\n前20个数据:")
-    for i, value in enumerate(test_cases[:20]):
-        binary = float_to_ieee754_binary(value)
-        print(f"{i+1:3d}. {value:15.6e} -> {binary}")
+    for i, bits in enumerate(head[:20]):
+        value = float(np.array(bits, dtype=np.uint32).view(np.float32))
+        print(f"{i+1:3d}. {value:15.6e} -> {int(bits):032b}")
 
 if __name__ == '__main__':
-    import os
-    import sys
+    import argparse
     
     # 获取脚本所在目录
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_file = os.path.join(script_dir, 'tb_fp32_data_input.txt')
     
-    # 从命令行参数获取数据个数，默认为200
-    if len(sys.argv) > 1:
-        try:
-            num_data = int(sys.argv[1])
-        except ValueError:
-            print(f"[ERROR] 输入参数必须为整数，收到: {sys.argv[1]}")
-            sys.exit(1)
-    else:
-        num_data = 10000
+    parser = argparse.ArgumentParser(description="生成 fp32_add_sub 测试数据 (每行一个 32 位二进制字)")
+    parser.add_argument('num_data', nargs='?', type=int, default=10000, help="数据个数 (行数)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--weights', default=None, help="分层比例, 例如 random=0.3,cancel=0.2,special=0.1")
+    parser.add_argument('--output', default=os.path.join(script_dir, 'tb_fp32_data_input.txt'))
+    args = parser.parse_args()
     
-    print(f"[INFO] 目标数据个数: {num_data}")
-    generate_test_data(num_data, output_file)
-
+    print(f"[INFO] 目标数据个数: {args.num_data}")
+    weights = parse_weights(args.weights) if args.weights else None
+    generate_test_data(args.num_data, args.output, args.seed, weights)
@@ -1,23 +1,25 @@
-import struct
 import pywt
 import os
+import sys
+
+# IEEE 754 编码位于 sim/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from ieee754_codec import float32_to_hex
+
 
 def float_to_ieee754_hex(f):
-    """将 Python float 转换为 IEEE 754 32位十六进制字符串"""
-    # 使用 struct 将 float 打包为 4 字节，再解包为无符号整数
-    packed = struct.pack('>f', f)
-    ieee754_int = struct.unpack('>I', packed)[0]
-    # 返回 8 位十六进制字符串（例如：3f800000）
-    return f"{ieee754_int:08x}"
+    """将 float 数组转换为 IEEE 754 32位十六进制字符串列表（例如：3f800000）"""
+    return float32_to_hex(f).astype(str).tolist()
 
-def generate_verilog_coeffs_fp32(file_path="./coef_params_fp32.vh"):
+def generate_verilog_coeffs_fp32(file_path="./coef_params_fp32.vh", with_detail=False):
     """
     生成 sym4 小波系数并写入为 FP32 格式的 Verilog 参数文件
+    with_detail: 同时写入分解高通系数 DEC_HI_0~DEC_HI_7 (细节系数 d1~d7 使用, 与 wavelet_model.g_dec 一致)
     """
     # 1. 获取 sym4 系数
     wavelet = pywt.Wavelet('sym4')
     h_dec_float = wavelet.dec_lo  # 分解低通
-    g_dec_float = wavelet.dec_hi  # 分解高通 (如果你也需要高通的话)
+    g_dec_float = wavelet.dec_hi  # 分解高通 (with_detail=True 时写入)
     
     # 确保输出目录存在
     output_dir = os.path.dirname(file_path)
@@ -34,8 +36,7 @@ def generate_verilog_coeffs_fp32(file_path="./coef_params_fp32.vh"):
         # 写入分解低通系数 (DEC_LO)
         # -------------------------------------------------
         f.write("// Decomposition Low-pass Coefficients (FP32)\n")
-        for i, val in enumerate(h_dec_float):
-            hex_val = float_to_ieee754_hex(val)
+        for i, (val, hex_val) in enumerate(zip(h_dec_float, float_to_ieee754_hex(h_dec_float))):
             # 在 Verilog 中，FP32 通常定义为 32'h...
             line = f"parameter DEC_H{i} = 32'h{hex_val}; // Float: {val:.8f}\n"
             f.write(line)
@@ -43,13 +44,13 @@ def generate_verilog_coeffs_fp32(file_path="./coef_params_fp32.vh"):
         f.write("\n")
 
         # -------------------------------------------------
-        # # 写入分解高通系数 (DEC_HI)
-        # # -------------------------------------------------
-        # f.write("// Decomposition High-pass Coefficients (FP32)\n")
-        # for i, val in enumerate(g_dec_float):
-        #     hex_val = float_to_ieee754_hex(val)
-        #     line = f"parameter DEC_HI_{i} = 32'h{hex_val}; // Float: {val:.8f}\n"
-        #     f.write(line)
+        # 写入分解高通系数 (DEC_HI)
+        # -------------------------------------------------
+        if with_detail:
+            f.write("// Decomposition High-pass Coefficients (FP32)\n")
+            for i, (val, hex_val) in enumerate(zip(g_dec_float, float_to_ieee754_hex(g_dec_float))):
+                line = f"parameter DEC_HI_{i} = 32'h{hex_val}; // Float: {val:.8f}\n"
+                f.write(line)
 
         # -------------------------------------------------
         # 写入重构系数 (逆序逻辑示例)
@@ -66,4 +67,5 @@ if __name__ == "__main__":
     # 建议在新设备上运行前，确认这个路径是否正确
     # 你可以根据实际路径修改，或者直接使用 "./coef_params_fp32.vh"
     target_path = "E:/project/pulse-processing/verilog_wavelet/fp32_prj/project_1/wavelet_sym4_dec_res_verilog_fp32/scr/coef_params.vh"
-    generate_verilog_coeffs_fp32(file_path=target_path)
\ No newline at end of file
+    # 加 --detail 参数时同时写入高通系数 DEC_HI_0~DEC_HI_7
+    generate_verilog_coeffs_fp32(file_path=target_path, with_detail='--detail' in sys.argv[1:])
\ No newline at end of file
@@ -1,6 +1,11 @@
 import numpy as np
-import struct
 import os
+import sys
+
+# 共用的 testbench 文件读取位于 sim/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from tb_io import load_tb_file
+from ieee754_codec import float32_to_hex
 
 # 定义系数 h (这是乘数 B)
 h_dec = np.array([
@@ -9,67 +14,6 @@ h_dec = np.array([
 ])
 
 
-#    ideal_data_input = np.array(read_data, dtype=np.int16)
-
-def hex16_to_signed_int(hex_str):
-    """将16位十六进制字符串转换为有符号整数 (补码)"""
-    try:
-        val = int(hex_str, 16)
-        if val >32768: # 如果符号位为1
-            return val - 65536
-        return val
-    except:
-        return 0
-
-def hex32_ieee_to_float(hex_str):
-    """将32位IEEE 754十六进制字符串转换为浮点数"""
-    try:
-        clean_hex = hex_str.strip().replace('0x', '')
-        if not clean_hex: return 0.0
-        return struct.unpack('!f', bytes.fromhex(clean_hex))[0]
-    except Exception as e:
-        return 0.0
-
-def float_to_ieee_hex(val):
-    """【新增】将 Python 浮点数转换为 32位 IEEE 754 Hex 字符串"""
-    try:
-        # !f: 大端单精度浮点
-        return struct.pack('!f', val).hex()
-    except:
-        return "00000000"
-    
-import struct
-
-def float_to_ieee_bin(val):
-    """
-    将 Python 浮点数转换为 32位 IEEE 754 二进制字符串
-    输入: 1.0
-    输出: '00111111100000000000000000000000'
-    """
-    try:
-        # 1. struct.pack('!f', val): 将浮点数打包成 4 字节的大端字节流 (IEEE 754 单精度)
-        # 2. struct.unpack('!I', ...)[0]: 将这 4 个字节重新解释为无符号整数
-        #    这样做是因为 Python 的 bin() 函数只能处理整数
-        int_val = struct.unpack('!I', struct.pack('!f', val))[0]
-        
-        # 3. f"{int_val:032b}": 将整数格式化为 32 位宽度的二进制字符串，不足补 0
-        return f"{int_val:032b}"
-    except Exception as e:
-        # 出错时返回全 0 或打印错误
-        return "0" * 32
-
-# ================= 测试代码 =================
-
-def bin32_ieee_to_float(bin_str):
-    """将32位IEEE 754二进制字符串转换为Python float"""
-    try:
-        clean_bin = bin_str.strip().replace(' ', '')
-        if not clean_bin: return 0.0
-        n = int(clean_bin, 2)
-        return struct.unpack('!f', struct.pack('!I', n))[0]
-    except:
-        return 0.0
-
 def mult_verify():
     # ================= 1. 文件路径配置 =================
     # 请根据你的实际路径修改
@@ -85,17 +29,8 @@ def mult_verify():
 
     # ================= 2. 读取并解析输入数据 (x_input) =================
     print("正在读取输入数据...")
-    raw_data_flat = []
-    with open(input_file_path, 'r') as f:
-        for line in f:
-            parts = line.strip().split(",") 
-            if not line.strip(): continue
-            for p in parts:
-                if p.strip():
-                    # 这里先转回 int 再转 float，模拟 FPGA 中 signed 16bit -> float 32bit 的过程
-                    raw_data_flat.append(float(hex16_to_signed_int(p.strip())))
-    
-    data = np.array(raw_data_flat)
+    # 这里先转回 int 再转 float，模拟 FPGA 中 signed 16bit -> float 32bit 的过程
+    data = load_tb_file(input_file_path, invalid=0).ravel().astype(np.float64)
    
 
     # ================= 3. Python 黄金模型计算 =================
@@ -148,15 +83,8 @@ def mult_verify():
     # ================= 4. 读取 Verilog 输出并对比 =================
     print("正在读取 Verilog 输出并进行对比...")
     
-    verilog_results = []
-    with open(verilog_out_path, 'r') as f:
-        for line in f:
-            parts = line.strip().split()
-            if len(parts) == 0: continue
-            row_vals = [hex32_ieee_to_float(x) for x in parts]
-            verilog_results.append(row_vals)
-            
-    verilog_array = np.array(verilog_results)
+    # 每行 64 个以空格分隔的 %h, 整块解析为 float32
+    verilog_array = load_tb_file(verilog_out_path, invalid=0).astype(np.float64)
 
     # ================= 5. 误差分析 =================
     min_len = min(len(expected_array), len(verilog_array))
@@ -200,14 +128,13 @@ def mult_verify():
         
         error_indices = np.where(abs_diff > threshold)
         
-        count = 0
         limit = 20
+        rows, cols = error_indices[0][:limit], error_indices[1][:limit]
+        # 操作数一次性转为 IEEE754 Hex
+        hex_a = float32_to_hex(ops_data_slice[rows, cols]).astype(str)
+        hex_b = float32_to_hex(ops_h_slice[rows, cols]).astype(str)
         
-        for r, c in zip(error_indices[0], error_indices[1]):
-            if count >= limit:
-                print(f"... 剩余错误省略 ...")
-                break
-            
+        for r, c, hex_op_a, hex_op_b in zip(rows, cols, hex_a, hex_b):
             # 获取数值
             val_op_a = ops_data_slice[r, c]
             val_op_b = ops_h_slice[r, c]
@@ -215,17 +142,14 @@ def mult_verify():
             val_v = v_slice[r, c]
             val_diff = abs_diff[r, c]
             
-            # 转为 Hex
-            hex_op_a = float_to_ieee_hex(val_op_a)
-            hex_op_b = float_to_ieee_hex(val_op_b)
-            
             print(
                 f"({r},{c:<3})   | "
                 f"{hex_op_a:<10} | {val_op_a:<12.5f} | "
                 f"{hex_op_b:<10} | {val_op_b:<12.5f} | "
                 f"{val_py:<12.5f} | {val_v:<12.5f} | {val_diff:.2e}"
             )
-            count += 1
+        if len(error_indices[0]) > limit:
+            print(f"... 剩余错误省略 ...")
             
         print("\n调试提示：")
         print("1. 'Op A (Hex)' 是数据输入的 IEEE754 形式，请在 ModelSim/Vivado 波形中搜索此值。")
@@ -1,47 +1,90 @@
-import struct
+import argparse
 import numpy as np
 import os
+import sys
 
-def float_to_ieee754_binary(f):
-    """将Python float转换为IEEE 754 32位二进制字符串"""
-    packed = struct.pack('>f', f)  # Big-endian
-    ieee754_int = struct.unpack('>I', packed)[0]
-    return format(ieee754_int, '032b')
+# 共用的 IEEE-754 文本编解码位于 sim/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from ieee754_codec import format_words
+from tb_io import TraceWriter
+from x_stimulus import stimulus
 
-def x_gen(seed=11232, num_test_cycles=1000, amplitude=10000):
+# 默认输出到脚本所在目录 (即 sim/tb_decompose_L1.v), 可用 out_dir / --out-dir 或环境变量 X_GEN_OUT_DIR 指定
+DEFAULT_OUT_DIR = os.environ.get('X_GEN_OUT_DIR', os.path.dirname(os.path.abspath(__file__)))
+# 每次生成并写出的周期数 (每周期 16 个采样), 内存占用只与它有关
+CHUNK_CYCLES = 1 << 16
+
+OUTPUT_MODES = ('text', 'binary', 'both')
+
+
+def x_blocks(seed=11232, num_test_cycles=1000, amplitude=10000, chunk_cycles=CHUNK_CYCLES):
+    """
+    分块生成激励, 每次返回 (周期数, 16) 的 int16 数组
+    RandomState 分段取 uniform 与一次取完的序列相同, 所以结果与整段生成逐位一致
+    """
+    rs = np.random.RandomState(seed)
+    step = max(1, int(chunk_cycles)) * 16
     total_samples = num_test_cycles * 16
-    n = np.arange(total_samples)
+    for start in range(0, total_samples, step):
+        n = np.arange(start, min(start + step, total_samples))
+        yield stimulus(rs.uniform, n, amplitude).reshape(-1, 16)
 
-    np.random.seed(seed)
-    data = np.random.uniform(-2, 2, total_samples) + amplitude * np.sin(2 * np.pi * n / 128) + 1000
-    input_data = data.astype(np.int16)
 
-    # 建议使用相对路径，方便多设备同步
-    base_dir = "E:/project/pulse-processing/verilog_wavelet/fp32_prj/project_1/wavelet_sym4_dec_res_verilog_fp32/sim/tb_decompose_L1.v"
-    if not os.path.exists(base_dir):
-        os.makedirs(base_dir)
+def x_gen(seed=11232, num_test_cycles=1000, amplitude=10000, out_dir=None, mode='both',
+          chunk_cycles=CHUNK_CYCLES):
+    """
+    生成激励并写入 out_dir:
+        mode='text'   x_input_ieee754.txt (%b, int16 转 FP32) + x_input_16bit.txt (%04x)
+        mode='binary' x_input_16bit.trc (int16 trace, Python 侧验证脚本可直接读取)
+        mode='both'   以上三个文件
+    按块生成、编码并追加写入, 内存占用与 num_test_cycles 无关
+    文本文件与原来一样以文本模式写入, 换行为平台的 os.linesep (Windows 上为 CRLF)
+    返回写出的文件路径列表
+    """
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"未知的输出模式: {mode}")
+    base_dir = out_dir or DEFAULT_OUT_DIR
+    os.makedirs(base_dir, exist_ok=True)
 
     file_path = os.path.join(base_dir, "x_input_16bit.txt")
     file_path_1 = os.path.join(base_dir, "x_input_ieee754.txt")
+    file_path_trc = os.path.join(base_dir, "x_input_16bit.trc")
+
+    paths = []
+    trc = f_ieee = f_hex = None
+    try:
+        if mode in ('binary', 'both'):
+            # 0. 二进制 trace (int16, 每块 16 个数据)
+            trc = TraceWriter(file_path_trc, lanes=16, dtype=np.int16, level=0)
+            paths.append(file_path_trc)
+        if mode in ('text', 'both'):
+            # 1. IEEE 754 文件 (每16个数据一行，逗号分隔)，以 int16 的数值转为 FP32 写入
+            # 2. 16-bit Hex 文件，以 uint16 (补码) 写入
+            f_ieee = open(file_path_1, 'w')
+            f_hex = open(file_path, 'w')
+            paths += [file_path_1, file_path]
 
-      # 1. 写入 IEEE 754 文件 (每16个数据一行，逗号分隔)
-    with open(file_path_1, "w") as f:
-        for i in range(num_test_cycles):
-            chunk = input_data[i*16 : (i+1)*16]
-            # 将 16 个数据转换成二进制字符串列表
-            ieee_list = [float_to_ieee754_binary(float(x)) for x in chunk]
-            # 用逗号连接并换行
-            f.write(",".join(ieee_list) + "\n")
-    #注意，写到文件ieee754以int16的形式（补码写入）
-    # 写到16bit时，以uint16的格式写入        
-    input_data=input_data.astype(np.int16)
-    # 2. 写入 16-bit Hex 文件
-    with open(file_path, "w") as f:
-        for i in range(num_test_cycles):
-            chunk = input_data[i*16 : (i+1)*16]
-            hex_str = ",".join([f"{x & 0xFFFF:04x}" for x in chunk])
-            f.write(hex_str + "\n")
+        for block in x_blocks(seed, num_test_cycles, amplitude, chunk_cycles):
+            if trc is not None:
+                trc.write(block)
+            if f_ieee is not None:
+                f_ieee.write(format_words(block.astype(np.float32), 'b', lanes=16).tobytes().decode('ascii'))
+                f_hex.write(format_words(block, 'h', width=4, lanes=16).tobytes().decode('ascii'))
+    finally:
+        for f in (trc, f_ieee, f_hex):
+            if f is not None:
+                f.close()
+    return paths
 
 
 if __name__ == "__main__":
-    x_gen()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="生成 tb_decompose 的输入激励")
+    parser.add_argument('--out-dir', default=None, help=f"输出目录 (默认 {DEFAULT_OUT_DIR})")
+    parser.add_argument('--cycles', type=int, default=1000, help="周期数 (每周期 16 个采样)")
+    parser.add_argument('--seed', type=int, default=11232)
+    parser.add_argument('--amplitude', type=float, default=10000)
+    parser.add_argument('--mode', default='both', choices=OUTPUT_MODES)
+    parser.add_argument('--chunk-cycles', type=int, default=CHUNK_CYCLES)
+    args = parser.parse_args()
+    for p in x_gen(args.seed, args.cycles, args.amplitude, args.out_dir, args.mode, args.chunk_cycles):
+        print(p)
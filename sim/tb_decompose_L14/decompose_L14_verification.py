@@ -1,58 +1,16 @@
 #读取verilog的decompose_L1输出的FP32的数据格式，进行python的FP32解码，和python计算的结果进行对比验证
-import struct
+import os
+import sys
 import numpy as np
 import matplotlib.pyplot as plt
 
-# ==========================================
-# 1. 核心转换函数
-# ==========================================
-
-def str2num(hex_str):
-    """
-    将 16 位十六进制补码字符串 (如 'FFFF') 转换为数据(16位整数,-1)
-    """
-    try:
-        # 去除可能的前缀或空白
-        clean_hex = hex_str.strip().replace('0x', '')
-        if not clean_hex: return 0.0
-        
-        # 1. 转为无符号整数 (0 - 65535)
-        val_int = int(clean_hex, 16)
-        
-        # 2. 处理补码 (Two's Complement)
-        # 如果最高位是 1 (即大于等于 0x8000/32768)，则是负数
-        if val_int & 0x8000:
-            val_int -= 0x10000
-            
-        return val_int
-    except Exception as e:
-        print(f"Error converting input hex {hex_str}: {e}")
-        return 0.0
-
-def bin32_ieee_to_float(bin_str):
-    """
-    将 32 位 IEEE 754 二进制字符串 (如 '00111111100000000000000000000000') 
-    转换为浮点数 (1.0)
-    """
-    try:
-        # 去除空格并确保长度为 32 位
-        clean_bin = bin_str.strip().replace(' ', '')
-        
-        if not clean_bin:
-            return 0.0
-        
-        # 1. 将二进制字符串转换为无符号整数
-        # 2. '!I' 代表大端模式的 4 字节无符号整数
-        # 3. '!f' 代表大端模式的单精度浮点数
-        n = int(clean_bin, 2)
-        return struct.unpack('!f', struct.pack('!I', n))[0]
-        
-    except (ValueError, struct.error, Exception):
-        # 如果输入不是有效的二进制串或长度不对，返回 0.0 或抛出错误
-        return 0.0
+# 共用的黄金模型位于 sim/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from wavelet_model import dec_L1, dec_L2, dec_L3, dec_L4
+from tb_io import load_tb_file
 
 # ==========================================
-# 2. 配置参数与路径
+# 1. 配置参数与路径
 # ==========================================
 
 # 滤波器系数 (直接使用你提供的值)
@@ -66,191 +24,23 @@ file_input_16bit = r"E:/project/pulse-processing/verilog_wavelet/fp32_prj/projec
 file_output_ieee = r"E:/project/pulse-processing/verilog_wavelet/fp32_prj/project_1/wavelet_sym4_dec_res_verilog_fp32/sim/tb_decompose_L14/a4_out_ieee754.txt"
 
 # ==========================================
-# 3. 你的 Python 模型 (完全保持原样)
-# ==========================================
-def dec_L1(data, h):
-    block_size = 16
-    num_cycles = len(data) // block_size
-    res = []
-    
-    # 初始化历史：取第0块的最后7个点
-    x_hist = data[9:16] 
-    
-    # 从第1块开始计算
-    for i in range(1, num_cycles):
-        din = data[i*block_size : (i+1)*block_size]
-        combined = np.concatenate((x_hist, din))
-        for k in range(8):
-            start_idx = k * 2
-            window = combined[start_idx : start_idx + len(h)]
-            y = np.sum(window[::-1] * h)
-            res.append(y)
-        x_hist = din[9:16]
-    return np.array(res)
-
-def dec_L2(data, h):
-        block_size = 8
-        num_cycles = len(data) // block_size
-        res = []
-        
-        # 初始化历史：取第0块(长度8)的最后7个点 -> data[1:8]
-        x_hist = data[1:8]
-        
-        for i in range(1, num_cycles):
-            din = data[i*block_size : (i+1)*block_size]
-            combined = np.concatenate((x_hist, din))
-            for k in range(4):
-                start_idx = k * 2
-                window = combined[start_idx : start_idx + len(h)]
-                y = np.sum(window[::-1] * h)
-                res.append(y)
-            x_hist = din[1:8]
-        return np.array(res)
-
-    # --- L3 模型 (Block Size: 4 -> 2) ---
-def dec_L3(data, h):
-    block_size = 4
-    num_cycles = len(data) // block_size
-    res = []
-    x_hist = data[1:8] 
-    for i in range(2, num_cycles):
-        din = data[i*block_size : (i+1)*block_size] # 长度 4
-        
-        combined = np.concatenate((x_hist, din)) # 7 + 4 = 11
-        
-        for k in range(2): # 输出 2 点
-            start_idx = k * 2
-            window = combined[start_idx : start_idx + len(h)]
-            y = np.sum(window[::-1] * h)
-            res.append(y)
-        x_hist = combined[4:11] 
-        
-    return np.array(res)
-
-# --- L4 模型 (Block Size: 2 -> 1) ---
-def dec_L4(data, h):
-    block_size = 2
-    num_cycles = len(data) // block_size
-    res = []
-    x_hist = data[1:8] # 取前8个点中的后7个
-    
-    # i 从 4 开始 (跳过 0,1,2,3 四个块)
-    for i in range(4, num_cycles):
-        din = data[i*block_size : (i+1)*block_size] # 长度 2
-        
-        combined = np.concatenate((x_hist, din)) # 7 + 2 = 9
-        
-        for k in range(1): # 输出 1 点
-            start_idx = k * 2
-            window = combined[start_idx : start_idx + len(h)]
-            y = np.sum(window[::-1] * h)
-            res.append(y)
-            
-        # 更新历史：取 combined 的最后 7 个点
-        # combined 长度 9。取 2~8
-        x_hist = combined[2:9]
-        
-    return np.array(res)
-#L5 模型 (Block Size: 1 -> 1)
-def dec_L5(data, h):
-    block_size = 1
-    num_cycles = len(data) // block_size
-    res = []
-    x_hist = data[0:7]
-    phase=0 #记录是否应该计算输出，因为l5以后是每2个点输出1个点
-    
-    # i 从 8 开始 (跳过 0~6 7个块)
-    for i in range(7, num_cycles):
-        if phase==0:
-            phase=1
-        else:
-            phase=0
-
-            din = data[i*block_size : (i+1)*block_size] # 长度 1
-            combined = np.concatenate((x_hist, din)) # 7 + 1 = 8
-            if phase == 1:
-                for k in range(1): # 输出 1 点
-                    start_idx = k * 2
-                    window = combined[start_idx : start_idx + len(h)]
-                    y = np.sum(window[::-1] * h)
-                    res.append(y)
-            x_hist = combined[1:8]
-            
-
-        return np.array(res)
-
-    def dec_L6(data, h):
-        block_size = 1
-        num_cycles = len(data) // block_size
-        res = []
-        x_hist = data[0:7]
-        phase=0
-
-        for i in range(7, num_cycles):
-            if phase==0:
-                phase=1
-            else:
-                phase=0
-            din = data[i*block_size : (i+1)*block_size] # 长度 1
-            combined = np.concatenate((x_hist, din)) # 7 + 1 = 8
-            
-            if phase == 1:
-                for k in range(1): # 输出 1 点
-                    start_idx = k * 2
-                    window = combined[start_idx : start_idx + len(h)]
-                    y = np.sum(window[::-1] * h)
-                    res.append(y)
-            x_hist = combined[1:8]
-            
-        return np.array(res)
-
-    def dec_L7(data, h):
-        block_size = 1
-        num_cycles = len(data) // block_size
-        res = []
-        x_hist = data[0:7]
-        phase=0
-
-        for i in range(7, num_cycles):
-            if phase==0:
-                phase=1
-            else:
-                phase=0
-            din = data[i*block_size : (i+1)*block_size] # 长度 1
-            combined = np.concatenate((x_hist, din)) # 7 + 1 = 8
-            
-            if phase == 1:
-                for k in range(1): # 输出 1 点
-                    start_idx = k * 2
-                    window = combined[start_idx : start_idx + len(h)]
-                    y = np.sum(window[::-1] * h)
-                    res.append(y)
-            x_hist = combined[1:8]
-            
-        return np.array(res)
-
-# ==========================================
-# 4. 主处理流程
+# 2. 主处理流程
 # ==========================================
 if "__main__" == __name__:
     print("--- 开始处理 ---")
 
     # --- A. 读取输入文件 (16位补码) ---
-    input_data_list = []
     try:
-        with open(file_input_16bit, 'r') as f:
-            # 读取整个文件，假设数据以空格、换行或逗号分隔
-            content = f.read().replace(',', ' ').split()
-            input_data_list = [str2num(x) for x in content]
+        # 每行 16 个 %04x 补码, 整块解析为 int16 (非法字按 0 处理)
+        input_np = load_tb_file(file_input_16bit, invalid=0).ravel()
         print(f"Input data loaded from {file_input_16bit}")
-        print(f"Input sample count: {len(input_data_list)}")
-        # print(f"First 5 inputs: {input_data_list[:5]}") # 调试用
+        print(f"Input sample count: {len(input_np)}")
+        # print(f"First 5 inputs: {input_np[:5]}") # 调试用
     except FileNotFoundError:
         print(f"Error: 找不到输入文件 {file_input_16bit}")
         exit()
 
     # --- B. 运行 Python 模型 ---
-    input_np = np.array(input_data_list)
     # 运行模型生成预期结果 (Golden Reference)
     a1_fp_python = dec_L1(input_np, h_dec)
     a2_fp_python = dec_L2(a1_fp_python,h_dec)
@@ -262,24 +52,17 @@ if "__main__" == __name__:
     print(f"Python model executed. a1 output length: {len(a1_fp_python)},a2:{len(a2_fp_python)},a3:{len(a3_fp_python)},a4:{len(a4_fp_python)}")
 
     # --- C. 读取 Verilog 输出文件 (32位 IEEE 754) ---
-    verilog_data_list = []
     try:
-        with open(file_output_ieee, 'r') as f:
-            for line in f:
-                # 你的 Verilog 输出是用逗号分隔的
-                parts = line.strip().split(',')
-                vals = [bin32_ieee_to_float(x) for x in parts if x.strip()]
-                verilog_data_list.extend(vals)
+        # Verilog 输出是用逗号分隔的 %b, 整块解析为 float32 (非法字按 0 处理)
+        a4_fp_verilog = load_tb_file(file_output_ieee, invalid=0).ravel().astype(np.float64)
         print(f"Verilog output loaded from {file_output_ieee}")
-        print(f"Verilog output count: {len(verilog_data_list)}")
+        print(f"Verilog output count: {len(a4_fp_verilog)}")
     except FileNotFoundError:
         print(f"Error: 找不到输出文件 {file_output_ieee}")
         exit()
 
-    a4_fp_verilog = np.array(verilog_data_list)
-
     # ==========================================
-    # 5. 对比与绘图
+    # 3. 对比与绘图
     # ==========================================
 
     # 对齐数据长度 (取交集长度)
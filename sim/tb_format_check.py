@@ -0,0 +1,85 @@
+#testbench 文本格式的回归检查: 按各 testbench 实际写出的几种排版生成合成文件, 用 tb_io.load_tb_file 读回比较
+#
+#用法:
+#   python tb_format_check.py [--rows 300] [--lanes 64] [--chunk-rows 7]
+#覆盖的排版:
+#   逗号分隔 %b / %04x (x_gen, decompose testbench 的 aN_out_ieee754.txt)
+#   行尾空格: "%h " 逐个写出后再写 "\n", 每行以空格结尾 (decompose_L1.v 的 mult_out.txt), 其中一个字为 x (invalid=0)
+#   以上每种再分别用 '\r\n' 换行、末尾多余空行、最后一行没有换行
+#另外把同一数据写成二进制 trace (.trc), 检查 dtype='raw' 时 trace 与文本返回相同的位模式 (int16 不做符号扩展)
+#--chunk-rows 取小值使分块边界落在文件中间; 任一排版读回不一致时返回 1
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from tb_io import load_tb_file, TraceWriter
+from ieee754_codec import words_to_chars
+
+
+def layouts(words, fmt, width):
+    """返回 [(名称, 文本, 是否含一个 x 字)], words 为 (行数, 每行个数) 的位模式"""
+    chars = words_to_chars(words, fmt, width)
+    tokens = np.ascontiguousarray(chars).view(f'S{width}')[:, 0].astype(str).reshape(words.shape)
+    comma = [','.join(r) for r in tokens]
+    space = [''.join(t + ' ' for t in r) for r in tokens]
+    bad = tokens.copy()
+    bad[len(bad) // 2, 1] = 'x' * width
+    space_x = [''.join(t + ' ' for t in r) for r in bad]
+    out = []
+    for name, lines, has_x in (('comma', comma, False), ('行尾空格', space, False), ('行尾空格 + x', space_x, True)):
+        out.append((name, '\n'.join(lines) + '\n', has_x))
+        out.append((name + ' CRLF', '\r\n'.join(lines) + '\r\n', has_x))
+        out.append((name + ' 末尾空行', '\n'.join(lines) + '\n\n \n', has_x))
+        out.append((name + ' 无末尾换行', '\n'.join(lines), has_x))
+    return out
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="testbench 文本格式回归检查")
+    parser.add_argument('--rows', type=int, default=300)
+    parser.add_argument('--lanes', type=int, default=64)
+    parser.add_argument('--chunk-rows', type=int, default=7)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    cases = [
+        ('f32 %h', rng.standard_normal((args.rows, args.lanes)).astype(np.float32), 'h', 8),
+        ('f32 %b', rng.standard_normal((args.rows, args.lanes)).astype(np.float32), 'b', 32),
+        ('int16 %04x', rng.integers(-32768, 32768, (args.rows, args.lanes)).astype(np.int16), 'h', 4),
+    ]
+    n_bad = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tb.txt')
+        for case, data, fmt, width in cases:
+            words = data.view(np.uint32 if data.dtype == np.float32 else np.uint16).astype(np.uint32)
+            for name, text, has_x in layouts(words, fmt, width):
+                with open(path, 'w', newline='') as f:
+                    f.write(text)
+                expect = data.copy()
+                if has_x:
+                    expect[args.rows // 2, 1] = 0
+                try:
+                    got = load_tb_file(path, invalid=0 if has_x else None, chunk_rows=args.chunk_rows)
+                    ok = got.shape == expect.shape and np.array_equal(got.view(np.uint8), expect.view(np.uint8))
+                    msg = "" if ok else f"读回 {got.shape} 与写入 {expect.shape} 不一致"
+                except ValueError as e:
+                    ok, msg = False, str(e)
+                n_bad += not ok
+                print(f"[{'PASS' if ok else 'FAIL'}] {case:<11} {name:<20} {msg}")
+
+            # trace 与文本的 'raw' 位模式
+            trc = os.path.join(tmp, 'tb.trc')
+            with TraceWriter(trc, args.lanes, data.dtype) as w:
+                w.write(data)
+            with open(path, 'w', newline='') as f:
+                f.write(layouts(words, fmt, width)[0][1])
+            ok = np.array_equal(load_tb_file(trc, dtype='raw'), load_tb_file(path, dtype='raw'))
+            n_bad += not ok
+            print(f"[{'PASS' if ok else 'FAIL'}] {case:<11} {'trace raw':<20} {'' if ok else '位模式与文本不一致'}")
+    sys.exit(1 if n_bad else 0)
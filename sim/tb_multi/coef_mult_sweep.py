@@ -0,0 +1,187 @@
+#以 sym4 系数为一个操作数的乘法器穷举/稠密扫描
+#小波数据通路中每个 fp32_mult 的一个操作数总是 coef_params.vh 中的 DEC_H0~DEC_H7 (重构的 REC_H 是同一组值),
+#另一个操作数在 L1 为 int16 采样, 在后面各级为有界的 float。这里只覆盖设计实际会遇到的操作数:
+#   int16   全部 65536 个 int16 值 x 8 个系数 (524288 个乘积, 穷举)
+#   levels  各级输出的取值范围 |x| <= 32768 * (sum|h|)^7 内, 每个二进制指数段取 per_binade 个尾数
+#           (等间距 + 舍入边界模式), 两种符号, 以及 ±0
+#   binade  指定指数段的全部 2^23 个尾数 (--binade E, 可重复)
+#
+#用法:
+#   python coef_mult_sweep.py model [--set int16 levels]           用 fp32_softfloat (与硬件逐位一致) 检查全部乘积
+#   python coef_mult_sweep.py gen   [--set int16] [--input FILE]    写出 tb_mult.v 格式的输入文件 (每行一个 %b, 两行为一对)
+#   python coef_mult_sweep.py check [--input FILE] [--output FILE]  检查硬件仿真输出, 按系数统计
+#gen 默认写到 coef_sweep_input.txt, 不覆盖仓库中 tb_mult.v 使用的 tb_fp32_data_input.txt;
+#仿真扫描时把它复制为 (或在仿真目录中链接为) tb_fp32_data_input.txt, check 的 --input 仍指向 coef_sweep_input.txt
+import argparse
+import os
+import sys
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SCRIPT_DIR, '..', 'common'))
+from fp32_model import read_coef_params
+from fp32_softfloat import fp32_mult
+from fp32_check import classify, format_counts, expected_bits, N_CLASSES, FIRST_FAIL
+from fp32_stimulus import write_pairs, pack
+from stream_compare import float32_ordered
+from wavelet_model import h_dec
+from tb_fp32_mult_verification import load_vectors, reference_mult
+
+DEFAULT_INPUT = os.path.join(SCRIPT_DIR, 'coef_sweep_input.txt')
+DEFAULT_OUTPUT = os.path.join(SCRIPT_DIR, 'tb_fp32_mult_result_output.txt')
+
+PER_BINADE = 4096
+# levels 集合的最小指数段 (更小的值乘以系数后仍远离下溢, 行为与相邻指数段相同)
+MIN_EXP = -24
+# 每次计算的乘积数
+CHUNK = 1 << 20
+
+
+# ==========================================
+# 1. 操作数集合
+# ==========================================
+
+def level_bound(levels=7):
+    """第 levels 级输出的幅度上界: 每级乘以 sum|h|"""
+    return 32768.0 * np.sum(np.abs(h_dec)) ** levels
+
+
+def int16_operands():
+    """全部 int16 值 (转为 FP32 位模式, 与 decompose_L1 的输入相同)"""
+    return np.arange(-32768, 32768, dtype=np.int64).astype(np.float32).view(np.uint32)
+
+
+def _mantissas(per_binade):
+    """等间距的 per_binade 个尾数, 加上全 0 / 全 1 / 最低位 / 半程等舍入边界模式"""
+    step = max(1, (1 << 23) // per_binade)
+    edges = [0, 1, 2, 3, 0x3FFFFF, 0x400000, 0x400001, 0x7FFFFE, 0x7FFFFF]
+    return np.unique(np.concatenate([np.arange(0, 1 << 23, step), edges])).astype(np.uint32)
+
+
+def level_operands(per_binade=PER_BINADE, min_exp=MIN_EXP, levels=7):
+    """各级输出取值范围内的稠密采样 (两种符号, 含 ±0)"""
+    max_exp = int(np.floor(np.log2(level_bound(levels))))
+    exps = np.arange(min_exp, max_exp + 1) + 127
+    m = _mantissas(per_binade)
+    e, mm = np.meshgrid(exps, m, indexing='ij')
+    pos = pack(0, e.ravel(), mm.ravel())
+    return np.concatenate([[0x00000000, 0x80000000], pos, pos | np.uint32(0x80000000)]).astype(np.uint32)
+
+
+def binade_operands(exp):
+    """指数段 2^exp 的全部尾数 (两种符号)"""
+    pos = pack(0, exp + 127, np.arange(1 << 23, dtype=np.uint32))
+    return np.concatenate([pos, pos | np.uint32(0x80000000)])
+
+
+def build_operands(sets, per_binade=PER_BINADE, binades=()):
+    parts = []
+    if 'int16' in sets:
+        parts.append(int16_operands())
+    if 'levels' in sets:
+        parts.append(level_operands(per_binade))
+    for e in binades:
+        parts.append(binade_operands(e))
+    return np.unique(np.concatenate(parts)) if parts else np.empty(0, dtype=np.uint32)
+
+
+def iter_products(x, coefs, chunk=CHUNK):
+    """按块给出 (x, coef, coef 序号), 每块覆盖 x 的一段与全部系数的组合"""
+    step = max(1, chunk // len(coefs))
+    for start in range(0, len(x), step):
+        xs = x[start:start + step]
+        yield (np.repeat(xs, len(coefs)), np.tile(coefs, len(xs)),
+               np.tile(np.arange(len(coefs)), len(xs)))
+
+
+# ==========================================
+# 2. 检查
+# ==========================================
+
+class CoefStats:
+    """按系数统计分类计数, 以及与 IEEE RNE 结果的最大 ULP 距离"""
+
+    def __init__(self, n_coefs):
+        self.counts = np.zeros((n_coefs, N_CLASSES), dtype=np.int64)
+        self.max_ulp = np.zeros(n_coefs, dtype=np.int64)
+        self.fails = []
+
+    def add(self, a, b, k, hw, n_keep=20):
+        ref = reference_mult(a, b)
+        code, _ = classify(ref, hw)
+        np.add.at(self.counts, (k, code), 1)
+        with np.errstate(invalid='ignore'):
+            ulp = np.abs(float32_ordered(hw.view(np.float32)) - float32_ordered(expected_bits(ref).view(np.float32)))
+        ulp = np.where(np.isnan(ref), 0, ulp)
+        np.maximum.at(self.max_ulp, k, ulp)
+        for i in np.flatnonzero(code >= FIRST_FAIL)[:max(0, n_keep - len(self.fails))]:
+            self.fails.append((int(a[i]), int(b[i]), int(expected_bits(ref[i])), int(hw[i])))
+
+    def report(self, coefs):
+        lines = [f"{'Coef':<8} {'Value':>14} {'Products':>10} {'Exact':>10} {'Tol':>8} {'Fail':>6} {'Max ULP':>8}"]
+        for i, c in enumerate(coefs):
+            row = self.counts[i]
+            total = int(row.sum())
+            if not total:
+                continue
+            value = float(np.array(c, dtype=np.uint32).view(np.float32))
+            lines.append(f"DEC_H{i:<3} {value:>14.8f} {total:>10} {int(row[0]):>10} "
+                         f"{int(row[1:FIRST_FAIL].sum()):>8} {int(row[FIRST_FAIL:].sum()):>6} {int(self.max_ulp[i]):>8}")
+        lines.append(format_counts(self.counts.sum(axis=0)))
+        for a, b, e, h in self.fails:
+            lines.append(f"  FAIL A={a:08x} B={b:08x} Expected={e:08x} Hardware={h:08x}")
+        return "\n".join(lines)
+
+
+def run_model(x, coefs):
+    """用 fp32_softfloat (rounding='rtl', 与硬件逐位一致) 计算全部乘积并检查"""
+    stats = CoefStats(len(coefs))
+    for a, b, k in iter_products(x, coefs):
+        stats.add(a, b, k, fp32_mult(a, b))
+    return stats
+
+
+def run_check(input_file, output_file, coefs):
+    """检查硬件仿真输出; 第二个操作数不是系数的向量不参与统计"""
+    a, b, hw = load_vectors(input_file, output_file)
+    order = np.argsort(coefs)
+    pos = np.clip(np.searchsorted(coefs[order], b), 0, len(coefs) - 1)
+    k = order[pos]
+    ok = coefs[k] == b
+    stats = CoefStats(len(coefs))
+    for s in range(0, len(a), CHUNK):
+        m = ok[s:s + CHUNK]
+        stats.add(a[s:s + CHUNK][m], b[s:s + CHUNK][m], k[s:s + CHUNK][m], hw[s:s + CHUNK][m])
+    return stats, int((~ok).sum())
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="以 DEC_H0~DEC_H7 为操作数的乘法器扫描")
+    parser.add_argument('mode', choices=['model', 'gen', 'check'])
+    parser.add_argument('--set', nargs='+', default=['int16', 'levels'], choices=['int16', 'levels'])
+    parser.add_argument('--per-binade', type=int, default=PER_BINADE)
+    parser.add_argument('--binade', type=int, action='append', default=[], help="穷举该指数段的全部尾数 (可重复)")
+    parser.add_argument('--input', default=DEFAULT_INPUT)
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="check 模式读取的硬件输出")
+    args = parser.parse_args()
+
+    coefs = read_coef_params()
+    if args.mode == 'check':
+        stats, skipped = run_check(args.input, args.output, coefs)
+        if skipped:
+            print(f"[INFO] {skipped} 个向量的第二个操作数不是系数, 已跳过")
+        print(stats.report(coefs))
+        sys.exit(0 if stats.counts[:, FIRST_FAIL:].sum() == 0 else 1)
+
+    x = build_operands(args.set, args.per_binade, args.binade)
+    print(f"[INFO] 操作数 {len(x)} 个 x 系数 {len(coefs)} 个 = {len(x) * len(coefs)} 个乘积")
+    if args.mode == 'gen':
+        with open(args.input, 'wb') as f:
+            for a, b, _ in iter_products(x, coefs):
+                write_pairs(f, a, b)
+        print(f"[INFO] 已写入 {args.input} (tb_mult.v 读取 tb_fp32_data_input.txt, 仿真前复制或链接为该文件名)")
+    else:
+        stats = run_model(x, coefs)
+        print(stats.report(coefs))
+        sys.exit(0 if stats.counts[:, FIRST_FAIL:].sum() == 0 else 1)
@@ -1,18 +1,23 @@
-import struct
-import random
+import argparse
 import os
+import sys
 
-def float_to_bin32(f):
-    """将 Python float 转换为 32 位二进制字符串"""
-    # '!f' 表示大端序单精度浮点数
-    return format(struct.unpack('!I', struct.pack('!f', f))[0], '032b')
+import numpy as np
 
-def generate_fp32_data(num_pairs, filename='E:/project/pulse-processing/verilog_wavelet/fp32_prj/project_1/wavelet_sym4_dec_res_verilog_fp32/sim/tb_multi/tb_fp32_data_input.txt'):
+# 共用的激励生成位于 sim/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from fp32_stimulus import iter_pairs, write_pairs, parse_weights, strata_counts, STRATA
+
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tb_fp32_data_input.txt')
+
+
+def generate_fp32_data(num_pairs, filename=DEFAULT_OUTPUT, seed=None, weights=None):
     """
     产生指定对数的 FP32 数据
     每对数据占用两行，总行数为 2 * num_pairs
+    seed: None 时每次不同; weights: 各分层的比例 (见 fp32_stimulus.DEFAULT_WEIGHTS)
     """
-    
+
     # 定义一些特殊的测试点，确保覆盖边界逻辑
     special_values = [
       2962.0,0.80374,
@@ -21,33 +26,36 @@ def generate_fp32_data(num_pairs, filename='E:/project/pulse-processing/verilog_
       -246.0,-0.0126
     ]
 
-    count = 0
-    with open(filename, 'w') as f:
-        # 1. 首先写入特殊值组合（覆盖边界）
-        for i in range(len(special_values)):
-            for j in range(i, len(special_values)):
-                if count >= num_pairs: break
-                f.write(float_to_bin32(special_values[i]) + '\n')
-                f.write(float_to_bin32(special_values[j]) + '\n')
-                count += 1
-
-        # 2. 剩余部分产生随机数据
-        while count < num_pairs:
-            # 随机产生不同数量级的数
-            # 这样可以同时测试对阶（加法）和指数累加（乘法）
-            exp_a = random.uniform(-18, 18)
-            exp_b = random.uniform(-18, 18)
-            val_a = random.uniform(-1, 1) * (10**exp_a)
-            val_b = random.uniform(-1, 1) * (10**exp_b)
-
-            f.write(float_to_bin32(val_a) + '\n')
-            f.write(float_to_bin32(val_b) + '\n')
-            count += 1
+    # 1. 首先写入特殊值组合（覆盖边界）
+    sv = np.array(special_values, dtype=np.float32).view(np.uint32)
+    i, j = np.triu_indices(len(sv))
+    a0, b0 = sv[i][:num_pairs], sv[j][:num_pairs]
+
+    counts = dict.fromkeys(STRATA, 0)
+    with open(filename, 'wb') as f:
+        write_pairs(f, a0, b0)
+        count = len(a0)
+
+        # 2. 剩余部分按位分层随机生成
+        # 同时覆盖对阶（加法）、指数累加的上溢/下溢（乘法）、舍入边界和特殊值
+        for a, b, tags in iter_pairs(num_pairs - count, seed, weights):
+            write_pairs(f, a, b)
+            count += len(a)
+            for k, c in strata_counts(tags).items():
+                counts[k] += c
 
     print(f"[SUCCESS] 已生成 {num_pairs} 对测试数据 (共 {count*2} 行)")
+    print("[INFO] 分层统计: " + ", ".join(f"{k}={c}" for k, c in counts.items() if c))
     print(f"[INFO] 文件路径: {os.path.abspath(filename)}")
 
 if __name__ == "__main__":
     # 设置你想要产生的数据对数
-    NUM_DATA_PAIRS = 1000 
-    generate_fp32_data(NUM_DATA_PAIRS)
\ No newline at end of file
+    NUM_DATA_PAIRS = 1000
+    parser = argparse.ArgumentParser(description="生成 fp32_mult 测试数据 (两行为一对)")
+    parser.add_argument('num_pairs', nargs='?', type=int, default=NUM_DATA_PAIRS)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--weights', default=None, help="分层比例, 例如 random=0.3,range=0.3,special=0.1")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    generate_fp32_data(args.num_pairs, args.output, args.seed,
+                       parse_weights(args.weights) if args.weights else None)
@@ -1,63 +1,49 @@
-import struct
 import os
-import math
-
-def ieee754_bin_to_float(bin_str):
-    """将32位二进制字符串转换为Python float"""
-    bin_str = bin_str.strip()
-    if len(bin_str) < 32: return 0.0
-    ieee754_int = int(bin_str, 2)
-    return struct.unpack('!f', struct.pack('!I', ieee754_int))[0]
-
-def ieee754_hex_to_float(hex_str):
-    """将32位十六进制字符串转换为Python float"""
-    try:
-        hex_clean = hex_str.strip().replace('0x', '')
-        ieee754_int = int(hex_clean, 16)
-        return struct.unpack('!f', struct.pack('!I', ieee754_int))[0]
-    except Exception as e:
-        return float('nan')
-
-def float_to_ieee754_hex(f):
-    """将float转换为8位十六进制字符串，处理溢出和特殊值"""
-    if math.isnan(f): 
-        return "7fc00000"
-    try:
-        # 使用单精度打包以模拟硬件溢出
-        return format(struct.unpack('!I', struct.pack('!f', f))[0], '08x')
-    except OverflowError:
-        return "7f800000" if f > 0 else "ff800000"
-
-def compare_results(py_val, hw_hex):
-    """验证逻辑：优先二进制匹配，其次容差匹配"""
-    hw_hex_clean = hw_hex.lower().strip().replace('0x', '').zfill(8)
-    hw_val = ieee754_hex_to_float(hw_hex_clean)
-    
-    # 1. 优先二进制完全匹配 (处理 Inf, NaN, 以及硬件舍入一致的情况)
-    py_hex = float_to_ieee754_hex(py_val)
-    if py_hex == hw_hex_clean:
-        return True, "Exact binary match"
-
-    # 2. 处理特殊值不匹配的情况
-    if math.isnan(py_val) or math.isnan(hw_val):
-        if math.isnan(py_val) and math.isnan(hw_val): return True, "Both NaN"
-        return False, "NaN mismatch"
-    
-    if math.isinf(py_val) or math.isinf(hw_val):
-        if math.isinf(py_val) and math.isinf(hw_val):
-            return (py_val > 0) == (hw_val > 0), "Inf sign mismatch"
-        return False, "Inf mismatch"
-
-    # 3. 数值误差匹配 (由于硬件可能采用了不同的舍入策略，如 Round to Zero vs Nearest)
-    abs_diff = abs(py_val - hw_val)
-    if py_val != 0:
-        rel_error = abs_diff / abs(py_val)
-        if rel_error < 1e-6: # FP32 允许约 1ppm 的相对误差
-            return True, f"Match (RelErr: {rel_error:.2e})"
-    elif abs_diff < 1e-9:
-        return True, "Zero match"
-
-    return False, f"Mismatch: Py={py_val:.7e} ({py_hex}), HW={hw_val:.7e} ({hw_hex_clean})"
+import sys
+
+import numpy as np
+
+# 共用的文本解析与结果分类位于 sim/common
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'common'))
+from tb_io import load_tb_file
+from fp32_softfloat import CANONICAL_NAN
+from fp32_check import (classify, class_counts, format_counts, expected_bits, bits_to_float,
+                        N_CLASSES, FIRST_FAIL, NAN_MISMATCH, INF_SIGN_MISMATCH, INF_MISMATCH)
+
+# 每次分类的测试数, 控制临时数组大小
+CHUNK_TESTS = 1 << 20
+
+
+def load_vectors(input_file, output_file):
+    """
+    读取输入 (每行一个 32 位二进制字, 两行为一组) 和硬件输出 (每行一个 %h 乘积)
+    返回等长的 (a, b, hw) 三个 uint32 数组
+    """
+    words = load_tb_file(input_file, fmt='b', width=32, dtype='raw').ravel()
+    n_pairs = len(words) // 2
+    # 无法解析的硬件输出 (x/z) 当作 NaN, 与原先 ieee754_hex_to_float 返回 nan 相同
+    hw = load_tb_file(output_file, fmt='h', width=8, dtype='raw', invalid=CANONICAL_NAN).ravel()
+    n = min(n_pairs, len(hw))
+    return words[0:2 * n:2], words[1:2 * n:2], hw[:n]
+
+
+def reference_mult(a, b):
+    """a, b 的 float64 精确乘积 (两个 float32 之积在 float64 中没有舍入)"""
+    with np.errstate(invalid='ignore', over='ignore'):
+        return bits_to_float(a).astype(np.float64) * bits_to_float(b).astype(np.float64)
+
+
+def fail_message(code, py_val, hw_bits):
+    if code == NAN_MISMATCH:
+        return "NaN mismatch"
+    if code == INF_SIGN_MISMATCH:
+        return "Inf sign mismatch"
+    if code == INF_MISMATCH:
+        return "Inf mismatch"
+    hw_val = float(bits_to_float(hw_bits))
+    return (f"Mismatch: Py={py_val:.7e} ({int(expected_bits(py_val)):08x}), "
+            f"HW={hw_val:.7e} ({int(hw_bits):08x})")
+
 
 def main():
     # --- 路径配置 ---
@@ -70,53 +56,37 @@ def main():
         print(f"[ERROR] 找不到文件！\n输入: {input_file}\n输出: {output_file}")
         return
 
-    # 1. 读取输入 (两行为一组)
-    with open(input_file, 'r') as f:
-        raw_lines = [line.strip() for line in f if len(line.strip()) >= 32]
-    
-    input_pairs = []
-    for i in range(0, len(raw_lines) - 1, 2):
-        input_pairs.append((raw_lines[i], raw_lines[i+1]))
-
-    # 2. 读取硬件结果
-    with open(output_file, 'r') as f:
-        hw_results = [line.strip() for line in f if line.strip() and not line.startswith('//')]
-
-    print(f"[INFO] 待处理输入对数: {len(input_pairs)}")
-    print(f"[INFO] 硬件输出行数: {len(hw_results)}")
-
-    # 3. 开始对比
-    passed_count = 0
-    total_tests = min(len(input_pairs), len(hw_results))
-    
+    # 1. 读取输入与硬件结果
+    a, b, hw = load_vectors(input_file, output_file)
+    total_tests = len(hw)
+    print(f"[INFO] 待处理输入对数: {len(a)}")
+    print(f"[INFO] 硬件输出行数: {len(hw)}")
+
+    # 2. 分块计算乘积并分类, 只保留失败的测试
+    counts = np.zeros(N_CLASSES, dtype=np.int64)
+    fails = []
+    for t0 in range(0, total_tests, CHUNK_TESTS):
+        t1 = min(t0 + CHUNK_TESTS, total_tests)
+        ref = reference_mult(a[t0:t1], b[t0:t1])
+        code, _ = classify(ref, hw[t0:t1])
+        counts += class_counts(code)
+        for k in np.flatnonzero(code >= FIRST_FAIL):
+            fails.append((t0 + int(k), int(code[k]), float(ref[k])))
+    passed_count = total_tests - len(fails)
+
+    # 3. 报告: 分类统计 + 失败用例的详细信息 (通过的用例不再逐条列出)
     with open(report_file, 'w') as report:
         report.write("FP32 Multiplier Verification Report\n")
         report.write("="*60 + "\n")
-        report.write(f"Total test cases: {total_tests}\n\n")
-
-        for i in range(total_tests):
-            bin_a, bin_b = input_pairs[i]
-            hw_hex = hw_results[i]
-            
-            # Python 参考计算
-            val_a = ieee754_bin_to_float(bin_a)
-            val_b = ieee754_bin_to_float(bin_b)
-            py_res = val_a * val_b
-            
-            is_ok, msg = compare_results(py_res, hw_hex)
-            
-            if is_ok:
-                passed_count += 1
-                res_tag = "[PASS]"
-            else:
-                res_tag = "[FAIL]"
-
-            report.write(f"{res_tag} Case {i+1:05d}: {msg}\n")
-            if not is_ok:
-                report.write(f"      A: {bin_a} ({val_a:.7e})\n")
-                report.write(f"      B: {bin_b} ({val_b:.7e})\n")
-                report.write(f"      Expected Hex: {float_to_ieee754_hex(py_res)}\n")
-                report.write(f"      Hardware Hex: {hw_hex}\n")
+        report.write(f"Total test cases: {total_tests}, Passed: {passed_count}, Failed: {len(fails)}\n")
+        report.write(format_counts(counts) + "\n\n")
+        for i, code, py_val in fails:
+            val_a, val_b = float(bits_to_float(a[i])), float(bits_to_float(b[i]))
+            report.write(f"[FAIL] Case {i+1:05d}: {fail_message(code, py_val, hw[i])}\n")
+            report.write(f"      A: {int(a[i]):032b} ({val_a:.7e})\n")
+            report.write(f"      B: {int(b[i]):032b} ({val_b:.7e})\n")
+            report.write(f"      Expected Hex: {int(expected_bits(py_val)):08x}\n")
+            report.write(f"      Hardware Hex: {int(hw[i]):08x}\n")
 
     # 4. 结果统计
     if total_tests > 0:
@@ -126,9 +96,10 @@ def main():
         print(f"Passed:       {passed_count}")
         print(f"Failed:       {total_tests - passed_count}")
         print(f"Pass Rate:    {pass_rate:.2f}%")
+        print(format_counts(counts))
         print(f"Detailed report saved to: {report_file}")
     else:
         print("[WARNING] No data was processed. Check your input/output files.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,114 @@
+#wavelet_baseline_removal_top 的逐时钟期望 trace (模型见 common/cycle_model.py)
+#
+#用法:
+#   python top_cycle_model.py [--cycles 100000] [--input x_input_16bit.txt] [--idle 0.0] [--phase 5=0 --phase 7=0]
+#                             [--trace valid_model.txt] [--compare valid_dut.txt] [--save top_model.npz]
+#--idle p: 每个周期以概率 p 拉低 din_valid (默认连续输入), 检查非连续输入下各级 valid 的行为
+#--trace:  每周期一行 16 位 %b: din_valid, L1~L7, R7~R1 的 dout_valid, baseline_valid (与 testbench 逐拍打印的顺序相同)
+#--compare: 读取 testbench 按同样格式打印的 valid trace, 报告每一列第一个不一致的周期
+#--save:   把每级的有效周期与数据保存为 npz, 供逐周期比较数据
+#--no-data: 只计算 valid 时序, 不计算各级数据 (约 1000 万周期/秒); 带数据时单核约 100 万周期/秒 (见 cycle_model)
+#启动时打印各级相对第一个 din_valid 的延迟与文件头中延迟表的差值, 延迟回退会直接体现在这张表上
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(SIM_DIR, 'common'))
+from cycle_model import simulate, compare_valid, TRACE_COLUMNS
+from ieee754_codec import format_words
+from tb_io import load_tb_file
+from seed_sweep import gen_stimulus
+
+
+def parse_phases(items):
+    """['5=0', '7=0'] -> {5: 0, 7: 0}"""
+    phases = {}
+    for item in items:
+        level, _, phase = item.partition('=')
+        phases[int(level)] = int(phase)
+    return phases
+
+
+def valid_pattern(n_cycles, idle, rng):
+    if idle <= 0:
+        return np.ones(n_cycles, dtype=bool)
+    return rng.random(n_cycles) >= idle
+
+
+def print_latency(res):
+    print(f"{'Stage':<6} {'Model':>7} {'Header':>7} {'Diff':>6} {'Valid':>10}")
+    for name, lat, ref, diff in res.latency_table():
+        n = len(res.cycles(name))
+        print(f"{name:<6} {'-' if lat is None else lat:>7} {ref:>7} {'-' if diff is None else f'{diff:+d}':>6} {n:>10}")
+
+
+def save_npz(path, res):
+    arrays = {'din': res.din, 'top': res.top, 'baseline': res.baseline,
+              'signal_no_baseline': res.signal_no_baseline}
+    for name, (cyc, data) in res.stages.items():
+        arrays[f'{name}_cycles'] = cyc
+        arrays[f'{name}_data'] = data
+    np.savez(path, n_cycles=res.n_cycles, **arrays)
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser(description="wavelet_baseline_removal_top 逐时钟模型")
+    parser.add_argument('--cycles', type=int, default=100000, help="din 周期数 (使用 --input 时取文件行数)")
+    parser.add_argument('--input', default=None, help="x_input_16bit.txt 或 .trc, 不指定时随机生成")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--amplitude', type=float, default=10000)
+    parser.add_argument('--idle', type=float, default=0.0, help="din_valid 为 0 的概率")
+    parser.add_argument('--phase', action='append', default=[], help="覆盖 L5~L7 的抽取相位, 如 5=0")
+    parser.add_argument('--trace', default=None)
+    parser.add_argument('--compare', default=None)
+    parser.add_argument('--save', default=None)
+    parser.add_argument('--no-data', action='store_true', help="只计算 valid 时序")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.input:
+        x = np.asarray(load_tb_file(args.input, dtype=np.int16)).ravel()
+    else:
+        x = gen_stimulus(rng, args.cycles, args.amplitude)
+    n_blocks = len(x) // 16
+    din_valid = valid_pattern(n_blocks, args.idle, rng)
+    # 无效周期不消耗输入, 补足周期数使全部输入都能送入
+    while din_valid.sum() < n_blocks:
+        din_valid = np.concatenate([din_valid, valid_pattern(n_blocks - int(din_valid.sum()), args.idle, rng)])
+
+    t = time.perf_counter()
+    res = simulate(din_valid, x, phases=parse_phases(args.phase), data=not args.no_data)
+    dt = time.perf_counter() - t
+    print(f"[INFO] {res.n_cycles} 个周期, {len(res.din)} 个输入块, 耗时 {dt:.3f} s "
+          f"({res.n_cycles / max(dt, 1e-9) / 1e6:.1f} M 周期/s)")
+    print_latency(res)
+
+    words = res.valid_words()
+    if args.trace:
+        with open(args.trace, 'wb') as f:
+            f.write(format_words(words, 'b', len(TRACE_COLUMNS)))
+        print(f"[INFO] valid trace 已写入 {args.trace}")
+    if args.save:
+        save_npz(args.save, res)
+        print(f"[INFO] 各级数据已写入 {args.save}")
+    if args.compare:
+        dut = load_tb_file(args.compare, fmt='b', width=len(TRACE_COLUMNS), dtype='raw').ravel()
+        n_cmp, diffs = compare_valid(words, dut)
+        if n_cmp < len(words):
+            print(f"[INFO] testbench trace 只有 {len(dut)} 个周期, 比较前 {n_cmp} 个 (模型 {len(words)} 个)")
+        n_bad = 0
+        for name, (n, first) in diffs.items():
+            n_bad += n
+            if n:
+                print(f"[FAIL] {name}: {n} 个周期不一致, 第一个在周期 {first}")
+        if not n_cmp:
+            print("[FAIL] testbench trace 为空")
+        elif not n_bad:
+            print(f"[PASS] {n_cmp} 个周期的 valid 时序逐周期一致")
+        else:
+            print(f"[FAIL] 共 {n_bad} 处不一致")
+        sys.exit(0 if n_cmp and not n_bad else 1)